@@ -0,0 +1,79 @@
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from src.benchmarks import AIR_MODES, run_suite, compare
+
+
+def _int_list(text):
+    return [int(s) for s in text.split(",") if s.strip()]
+
+
+def _str_list(text):
+    return [s.strip() for s in text.split(",") if s.strip()]
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="시뮬레이션 / 턴 파이프라인 벤치마크 (오프라인, 스텁 LLM)")
+    ap.add_argument("--sizes", type=_int_list, default=[1, 10, 100, 1000],
+                    help="객체 수 목록 (기본 1,10,100,1000)")
+    ap.add_argument("--kinds", type=_str_list, default=["balls", "boxes"],
+                    help="장면 종류: balls,boxes,mixed")
+    ap.add_argument("--air", type=_str_list, default=list(AIR_MODES),
+                    help="공기 조건: " + ",".join(AIR_MODES))
+    ap.add_argument("--duration", type=float, default=1.0, help="시뮬레이션 시간(초)")
+    ap.add_argument("--turns", type=int, default=3, help="턴 파이프라인 측정 횟수 (0이면 시뮬레이션만)")
+    ap.add_argument("--repeats", type=int, default=1, help="시뮬레이션 반복 (최솟값 사용)")
+    ap.add_argument("--out", help="결과 JSON 저장 경로 (기본: 표준 출력)")
+    ap.add_argument("--baseline", default="benchmarks/baseline.json", help="기준값 JSON 경로")
+    ap.add_argument("--save-baseline", action="store_true", help="이번 결과를 기준값으로 저장")
+    ap.add_argument("--no-compare", action="store_true", help="측정만 하고 기준값과 비교하지 않음")
+    ap.add_argument("--tolerance", type=float, default=0.25,
+                    help="허용 성능 저하 비율 (기본 0.25 = 25%%)")
+    ap.add_argument("--min-delta-ms", type=float, default=1.0,
+                    help="이보다 작은 지연 차이는 잡음으로 무시 (기본 1 ms)")
+    args = ap.parse_args(argv)
+
+    unknown = [a for a in args.air if a not in AIR_MODES]
+    if unknown:
+        raise SystemExit(f"[ERROR] 알 수 없는 공기 조건: {unknown}")
+
+    log = lambda msg: print(msg, file=sys.stderr)
+    results = run_suite(args.sizes, args.kinds, args.air, duration=args.duration,
+                        turns=args.turns, repeats=args.repeats, log=log)
+
+    text = json.dumps(results, ensure_ascii=False, indent=2)
+    if args.out:
+        Path(args.out).write_text(text, encoding="utf-8")
+        log(f"[INFO] 결과 저장 완료: {args.out}")
+    else:
+        print(text)
+
+    baseline_path = Path(args.baseline)
+    if args.save_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(text, encoding="utf-8")
+        log(f"[INFO] 기준값 저장 완료: {baseline_path}")
+        return 0
+
+    if args.no_compare:
+        return 0
+    if not baseline_path.exists():
+        log(f"[ERROR] 기준값 파일이 없어 비교할 수 없습니다: {baseline_path} "
+            f"(--save-baseline으로 생성하거나 --no-compare로 측정만)")
+        return 2
+
+    regressions = compare(results, json.loads(baseline_path.read_text(encoding="utf-8")), args.tolerance,
+                          args.min_delta_ms)
+    for r in regressions:
+        log(f"[REGRESSION] {r}")
+    if regressions:
+        log(f"[ERROR] 성능 저하 {len(regressions)}건 (허용 {args.tolerance:.0%})")
+        return 1
+    log("[INFO] 기준값 대비 성능 저하 없음")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
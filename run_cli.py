@@ -1,97 +1,473 @@
-import json
-from src.llm_parser import natural_language_to_world, sanitize_world_state, map_action_to_physics
-from src.memory_engine import WorldMemory
-from src.types import World
-from src.physics_pybullet import run_simulation_pybullet
-from src.reporting import summarize
+from src import startup  # 가장 먼저: 시작 시간 측정 기준점
 
+with startup.timed("imports"):
+    import argparse
+    import asyncio
+    import json
+    import shutil
+    import sys
+    import tempfile
+    from pathlib import Path
+    from pydantic import ValidationError
+    from src.llm_parser import natural_language_to_world
+    from src.llm_cache import LLMResponseCache
+    from src.context_encoder import ContextEncoder
+    from src.fast_path import FastPathMatcher
+    from src.memory_engine import WorldMemory, diff_states
+    from src.snapshots import Timeline
+    from src.reporting import summarize
+    from src.turn_pipeline import prepare_world, merge_into_memory, commit_result
+    from src.tracing import Tracer, get_tracer, set_tracer
+    from src.types import Environment, conform_environment
 
-def main():
-    print("===== 3D 대화형 물리 시뮬레이션 =====")
-    memory = WorldMemory()
+_LAZY = {}
+
+
+def run_simulation(*args, **kwargs):
+    """시뮬레이션 엔진은 첫 시뮬레이션 때 import (시작 시간 단축, PyBullet은 실제로 쓸 때만 로드)"""
+    if "physics" not in _LAZY:
+        with startup.timed("physics backend"):
+            from src.simulation import run_simulation as run
+            _LAZY["physics"] = run
+    return _LAZY["physics"](*args, **kwargs)
+
+
+def _dump(log, title, state):
+    log(title)
+    log(json.dumps(state, ensure_ascii=False, indent=2))
+
+
+def _timeline_command(prompt, timeline, log=print):
+    """되감기/분기 명령이면 처리하고 레코드 반환, 아니면 None
+
+    rewind N | 되감기 N        : 활성 분기를 turn N 시점으로 (새 턴으로 기록)
+    fork NAME [N] | 분기 NAME [N] : turn N(기본 현재)에서 새 분기를 만들고 전환
+    switch NAME | 전환 NAME     : 다른 분기로 전환 (main = 처음 메모리)
+    branches | 분기목록         : 분기와 보관 중인 스냅샷 턴 목록
+    """
+    words = prompt.split()
+    cmd = words[0].lower() if words else ""
+    if cmd not in ("rewind", "되감기", "fork", "분기", "switch", "전환", "branches", "분기목록"):
+        return None
+    if timeline is None:
+        log("[WARN] 스냅샷이 꺼져 있습니다 (--snapshots 0).")
+        return {"prompt": prompt, "ok": False, "error": "snapshots disabled"}
+
+    try:
+        if cmd in ("branches", "분기목록"):
+            for name, mem in timeline.branches.items():
+                mark = "*" if name == timeline.branch else " "
+                log(f"[INFO] {mark} {name}: turn {mem.turn}, 스냅샷 {timeline.ring.turns(name)}")
+            return {"turn": timeline.memory.turn, "prompt": prompt, "ok": True,
+                    "branches": {n: m.turn for n, m in timeline.branches.items()}}
+        if cmd in ("rewind", "되감기"):
+            if len(words) != 2:
+                raise ValueError("사용법: rewind N")
+            restored = timeline.rewind(int(words[1]))
+            log(f"[INFO] turn {words[1]} 시점으로 되감았습니다 (turn {timeline.memory.turn}, "
+                f"물리 {'복원' if restored else '다음 턴에 재구성'}).")
+        elif cmd in ("fork", "분기"):
+            if len(words) not in (2, 3):
+                raise ValueError("사용법: fork NAME [N]")
+            restored = timeline.fork(words[1], int(words[2]) if len(words) == 3 else None)
+            log(f"[INFO] 분기 '{words[1]}' 생성 (turn {timeline.memory.turn}, "
+                f"물리 {'복원' if restored else '다음 턴에 재구성'}).")
+        else:
+            if len(words) != 2:
+                raise ValueError("사용법: switch NAME")
+            timeline.switch(words[1])
+            log(f"[INFO] 분기 '{words[1]}'로 전환 (turn {timeline.memory.turn}).")
+    except (KeyError, ValueError) as e:
+        log(f"[ERROR] {e.args[0] if e.args else e}")
+        return {"turn": timeline.memory.turn, "prompt": prompt, "ok": False, "error": str(e)}
+    record = {"turn": timeline.memory.turn, "prompt": prompt, "ok": True, "branch": timeline.branch}
+    if cmd not in ("switch", "전환"):  # 전환은 메모리를 바꾸지 않음
+        record["delta"] = timeline.memory.last_delta
+    return record
+
+
+def run_turn(prompt, memory, *, cache=None, encoder=None, fast_path=None, tracer=None,
+             sim_kwargs=None, verbose=True, log=print, timeline=None):
+    """명령 한 턴 실행 (LLM → 정제 → 메모리 → 시뮬 → 결과 반영 → 요약)
+
+    반환: {"turn", "prompt", "ok", "fast_path", "delta", "summary", "steps", "sim_time", "timings_ms"}
+    verbose=False면 월드 상태 덤프(json.dumps)를 건너뛴다.
+    timeline이 주어지면 턴 끝에 물리 스냅샷을 남긴다 (되감기/분기용).
+    """
+    tracer = tracer or get_tracer()
+    tracer.begin_turn()
+    before = memory.state or {}  # apply_update/commit은 새 dict로 교체하므로 복사 불필요
+    record = {"turn": memory.turn + 1, "prompt": prompt, "ok": False, "fast_path": False}
+
+    # 0) 직전까지의 누적 월드
+    current_state = memory.state or {}
+    if verbose:
+        with tracer.span("debug_print"):
+            _dump(log, "\n[DEBUG] > 현재 메모리(World State, sim 직전):", current_state)
+
+    # 1) 자연어 → 신규 world dict 생성 (현재 상태를 컨텍스트로)
+    hits_before = fast_path.hits if fast_path is not None else 0
+    with tracer.span("llm"):
+        new_world = natural_language_to_world(prompt, world_state=current_state, cache=cache,
+                                              encoder=encoder, fast_path=fast_path)
+    if fast_path is not None and fast_path.hits > hits_before:
+        record["fast_path"] = True
+        log("[INFO] fast path로 처리 (LLM 호출 생략)")
+    elif encoder is not None and encoder.last_report is not None:
+        r = encoder.last_report
+        log(f"[INFO] 컨텍스트 토큰: {r['tokens']} (기존 {r['baseline_tokens']}, 절약 {r['saved']})")
+
+    # 2) actions를 물리 파라미터로 반영 + 3) 월드 정리
+    with tracer.span("prepare"):
+        new_world = prepare_world(new_world)
+    if verbose:
+        with tracer.span("debug_print"):
+            _dump(log, "\n[LLM] > 생성된 World JSON (정제 후):", new_world.model_dump(exclude_none=True))
+
+    # 4) 논리 월드를 메모리에 누적 (환경/객체 추가 등) + 5) Pydantic World 객체 생성
+    try:
+        world, updated = merge_into_memory(memory, new_world)
+    except ValidationError as e:
+        log(f"[ERROR] World 구조 검증 실패: {e}")
+        record["error"] = str(e)
+        tracer.end_turn(prompt=prompt, ok=False)
+        return record
+    if verbose:
+        with tracer.span("debug_print"):
+            _dump(log, "\n[MEMORY] > LLM 기준 누적된 World State (sim 전):", updated)
+
+    # 6) 실제 물리 시뮬레이션
+    with tracer.span("simulate"):
+        sim_out = run_simulation(world, **(sim_kwargs or {}))
+
+    # 7) 물리 시뮬레이션 결과를 다음 턴의 world_state로 반영
+    with tracer.span("commit"):
+        final_state = commit_result(memory, sim_out)
+    if final_state is not None and verbose:
+        with tracer.span("debug_print"):
+            _dump(log, "\n[MEMORY] > 물리 결과까지 반영된 World State (sim 후):", memory.state)
+    if timeline is not None:
+        with tracer.span("snapshot"):
+            timeline.capture(sim_out.get("physics_client"))
+
+    with tracer.span("summarize"):
+        summary = summarize(sim_out)
+
+    record.update({
+        "ok": True,
+        "delta": diff_states(before, memory.state),
+        "summary": summary,
+        "steps": sim_out.get("steps_simulated"),
+        "sim_time": sim_out.get("sim_time"),
+        "engine": sim_out.get("engine"),
+    })
+    if "verify" in sim_out:
+        record["verify"] = sim_out["verify"]
+    traced = tracer.end_turn(prompt=prompt, ok=True, objects=len(world.objects))
+    if traced is not None:
+        record["timings_ms"] = dict(traced["spans_ms"], total=traced["total_ms"])
+    return record
+
+
+def run_world_file(path, memory, *, sim_kwargs=None, tracer=None, log=print, timeline=None):
+    """월드 파일(JSON, 예: samples/initial_world.json)을 현재 월드로 삼고 그 actions까지 한 턴으로 시뮬레이션
+
+    LLM 없이 파일 그대로 검증 → 액션 반영 → 메모리 교체 → 시뮬(차원에 맞는 백엔드) → 결과 반영.
+    반환 레코드는 run_turn과 같은 모양 (prompt는 "@파일 경로").
+    """
+    tracer = tracer or get_tracer()
+    tracer.begin_turn()
+    prompt = f"@{path}"
+    before = memory.state or {}
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    try:
+        with tracer.span("prepare"):
+            world = prepare_world(data)
+    except ValidationError as e:
+        log(f"[ERROR] World 구조 검증 실패: {e}")
+        tracer.end_turn(prompt=prompt, ok=False)
+        return {"turn": memory.turn, "prompt": prompt, "ok": False, "error": str(e)}
+
+    # 파일이 곧 전체 월드 → 누적 병합 대신 통째로 교체 (액션은 저장하지 않음, 환경 변경은 반영)
+    if world._env_update:
+        world.environment = conform_environment(
+            Environment.model_validate({**world.environment.model_dump(), **world._env_update}))
+    state = world.to_state()
+    state.pop("actions", None)
+    with tracer.span("memory.write"):
+        memory.restore(state)
+
+    with tracer.span("simulate"):
+        sim_out = run_simulation(world, **(sim_kwargs or {}))
+    with tracer.span("commit"):
+        commit_result(memory, sim_out)
+    if timeline is not None:
+        with tracer.span("snapshot"):
+            timeline.capture(sim_out.get("physics_client"))
+    with tracer.span("summarize"):
+        summary = summarize(sim_out)
+
+    record = {"turn": memory.turn, "prompt": prompt, "ok": True, "fast_path": False,
+              "delta": diff_states(before, memory.state), "summary": summary,
+              "steps": sim_out.get("steps_simulated"), "sim_time": sim_out.get("sim_time"),
+              "engine": sim_out.get("engine")}
+    traced = tracer.end_turn(prompt=prompt, ok=True, objects=len(world.objects))
+    if traced is not None:
+        record["timings_ms"] = dict(traced["spans_ms"], total=traced["total_ms"])
+    return record
+
+
+def _scratch_memory(memory_path, directory) -> str:
+    """메모리 파일과 저널을 directory로 복사하고 사본 경로를 반환 (배치는 사본에서만 실행)"""
+    src = Path(memory_path)
+    dst = Path(directory) / src.name
+    for path, target in ((src, dst), (WorldMemory.journal_path_for(src), WorldMemory.journal_path_for(dst))):
+        if path.exists():
+            shutil.copyfile(path, target)
+    return str(dst)
+
+
+def run_batch(lines, memory, out, *, verbose=False, sim_kwargs=None, timeline=None, world_file=None,
+              **turn_kwargs):
+    """스크립트의 명령을 한 줄씩 헤드리스로 실행하고 턴마다 JSONL 레코드 한 줄을 out에 기록
+
+    world_file이 있으면 그 월드를 첫 턴으로 시뮬레이션한 레코드를 먼저 기록한다.
+    빈 줄과 #으로 시작하는 줄은 무시, "undo"/"되돌리기"는 되돌리기, "exit"/"종료"에서 중단.
+    timeline이 있으면 rewind/fork/switch 명령도 처리하고, 명령은 활성 분기 메모리에 적용된다.
+    물리는 DIRECT 연결 하나를 끝까지 재사용한다 (GUI / 실시간 sleep 없음).
+    """
+    import pybullet as p
+
+    log = lambda msg: print(msg, file=sys.stderr)
+    quiet = (lambda msg: None) if not verbose else log
+    cid = p.connect(p.DIRECT)
+    kwargs = dict(sim_kwargs or {}, show_gui=False, physics_client=cid)
+    done = failed = 0
+    try:
+        if world_file:
+            record = run_world_file(world_file, memory, sim_kwargs=kwargs, log=quiet, timeline=timeline)
+            done, failed = 1, 0 if record["ok"] else 1
+            out.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+            out.flush()
+        for line in lines:
+            prompt = line.strip()
+            if not prompt or prompt.startswith("#"):
+                continue
+            if prompt.lower() in ["종료", "exit"]:
+                break
+            if timeline is not None:
+                memory = timeline.memory
+            command = _timeline_command(prompt, timeline, log=quiet)
+            if command is not None:
+                record = command
+            elif prompt.lower() in ["되돌리기", "undo"]:
+                try:
+                    memory.undo()
+                    record = {"turn": memory.turn, "prompt": prompt, "ok": True, "delta": memory.last_delta}
+                except ValueError as e:
+                    log(f"[WARN] 되돌릴 수 없습니다: {e}")
+                    record = {"turn": memory.turn, "prompt": prompt, "ok": False, "error": str(e)}
+            else:
+                try:
+                    record = run_turn(prompt, memory, sim_kwargs=kwargs, verbose=verbose, log=quiet,
+                                      timeline=timeline, **turn_kwargs)
+                except Exception as e:
+                    log(f"[ERROR] 오류가 발생했습니다 ({prompt}): {e}")
+                    get_tracer().end_turn(prompt=prompt, ok=False, error=str(e))
+                    record = {"turn": memory.turn, "prompt": prompt, "ok": False, "error": str(e)}
+            done += 1
+            failed += 0 if record["ok"] else 1
+            out.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+            out.flush()  # 한 턴씩 바로 흘려보냄
+    finally:
+        p.disconnect(cid)
+    log(f"[INFO] 배치 완료: {done}턴 (실패 {failed})")
+    return failed
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="3D 대화형 물리 시뮬레이션")
+    ap.add_argument("--trajectory", type=int, default=0, metavar="N",
+                    help="N 스텝마다 궤적을 기록해 월드 상태 옆 trajectory.npz로 저장 (0이면 끔)")
+    ap.add_argument("--llm-cache", metavar="DIR", default=None,
+                    help="LLM 응답 디스크 캐시 디렉터리 (예: data/llm_cache)")
+    ap.add_argument("--replay", action="store_true",
+                    help="캐시 읽기 전용 재생 모드 (캐시에 없는 명령은 오류, API 호출 없음)")
+    ap.add_argument("--compact-context", action="store_true",
+                    help="월드 상태를 압축(반올림/기본값 생략/관련 객체만)해서 LLM에 전달")
+    ap.add_argument("--context-budget", type=int, default=1500, metavar="TOKENS",
+                    help="압축 컨텍스트 토큰 예산 (기본 1500)")
+    ap.add_argument("--context-precision", type=int, default=4, metavar="DIGITS",
+                    help="압축 컨텍스트 숫자 반올림 자릿수 (기본 4)")
+    ap.add_argument("--async", dest="use_async", action="store_true",
+                    help="다음 명령의 LLM 파싱을 현재 시뮬레이션과 겹쳐서 실행 (asyncio 파이프라인)")
+    ap.add_argument("--no-fast-path", action="store_true",
+                    help="단순 명령(던져/굴려/멈춰/진공/떨어뜨려)도 항상 LLM으로 해석")
+    ap.add_argument("--trace", metavar="FILE", default=None,
+                    help="턴마다 단계별 지연/토큰/스텝 수를 JSON lines로 추가 기록")
+    ap.add_argument("--metrics", metavar="FILE", default=None,
+                    help="누적 메트릭을 Prometheus 텍스트 형식으로 저장 (턴마다 갱신)")
+    ap.add_argument("--batch", metavar="FILE", default=None,
+                    help="명령 스크립트(한 줄에 하나, '-'는 표준 입력)를 헤드리스로 실행하고 턴마다 JSONL 출력")
+    ap.add_argument("--output", metavar="FILE", default=None,
+                    help="배치 모드 JSONL 출력 파일 (기본: 표준 출력)")
+    ap.add_argument("--verbose", action="store_true",
+                    help="배치 모드에서도 월드 상태 덤프/진행 로그를 표준 에러로 출력")
+    ap.add_argument("--memory", metavar="PATH", default="data/world_state.json",
+                    help="월드 메모리 파일 경로 (배치 세션을 분리할 때)")
+    ap.add_argument("--world", metavar="FILE", default=None,
+                    help="시작 월드 파일(JSON)로 메모리를 교체하고 그 actions를 첫 턴으로 시뮬레이션 "
+                         "(environment.dimensions가 2D면 pymunk, 3D면 PyBullet)")
+    ap.add_argument("--snapshots", type=int, default=16, metavar="N",
+                    help="턴별 물리 스냅샷을 최근 N개 보관 (rewind/fork/switch 명령용, 0이면 끔)")
+    ap.add_argument("--contacts", action="store_true",
+                    help="접촉 시작(충돌) 이벤트를 기록해 요약에 바닥/객체 충돌을 함께 표시")
+    ap.add_argument("--preview", choices=["auto", "on", "off"], default="auto",
+                    help="공만 있는 단순 장면을 NumPy 미리보기로 계산 (auto: 헤드리스일 때만, on: GUI에서도, off: 항상 PyBullet)")
+    ap.add_argument("--verify-preview", action="store_true",
+                    help="미리보기로 계산한 턴을 PyBullet으로도 돌려 위치 오차와 속도 차이를 출력")
+    ap.add_argument("--stop-at-rest", action="store_true",
+                    help="모든 물체가 --settle-time 동안 멈춰 있으면 duration 전에 시뮬레이션 종료")
+    ap.add_argument("--settle-time", type=float, default=0.5, metavar="SEC",
+                    help="--stop-at-rest 정지 판정에 필요한 연속 정지 시간(초, 기본 0.5)")
+    ap.add_argument("--adaptive-step", action="store_true",
+                    help="접촉 없는 자유 비행 구간은 큰 스텝으로 진행 (PyBullet 3D만)")
+    ap.add_argument("--rtf", type=float, default=1.0, metavar="X",
+                    help="GUI 표시 배율 (1 = 실시간, 4 = 4배속, 0 = 대기 없이 최대 속도)")
+    ap.add_argument("--fps", type=float, default=30.0,
+                    help="GUI 카메라 갱신 최대 fps (기본 30)")
+    ap.add_argument("--playback", action="store_true",
+                    help="GUI에서 먼저 최대 속도로 계산한 뒤 기록한 궤적을 재생")
+    ap.add_argument("--max-playback", type=float, default=None, metavar="SEC",
+                    help="재생 길이 상한(초). 긴 장면은 배율을 올려 이 안에 재생")
+    ap.add_argument("--profile-startup", action="store_true",
+                    help="시작/첫 사용 초기화 시간을 출력 (프롬프트 준비 시점과 종료 시점)")
+    args = ap.parse_args(argv)
+
+    cache = None
+    if args.llm_cache or args.replay:
+        cache = LLMResponseCache(args.llm_cache or "data/llm_cache", replay=args.replay)
+
+    encoder = None
+    if args.compact_context:
+        encoder = ContextEncoder(precision=args.context_precision, token_budget=args.context_budget)
+
+    fast_path = None if args.no_fast_path else FastPathMatcher()
+
+    # 꺼져 있으면 전역 tracer는 no-op (오버헤드 거의 없음). 배치 모드는 턴별 timings를 위해 항상 켬
+    tracer = set_tracer(Tracer(enabled=bool(args.trace or args.metrics or args.batch),
+                               jsonl_path=args.trace, prometheus_path=args.metrics))
+
+    # 배치 모드는 표준 출력을 JSONL 전용으로 쓰므로 안내 메시지는 표준 에러로
+    say = (lambda msg: print(msg, file=sys.stderr)) if args.batch else print
+
+    def print_stats():
+        if args.profile_startup:
+            say(startup.report())
+        if cache is not None:
+            say(f"[INFO] LLM 캐시 통계: {cache.stats()}")
+        if fast_path is not None:
+            say(f"[INFO] fast path 통계: {fast_path.stats()}")
+
+    if not args.batch:
+        print("===== 3D 대화형 물리 시뮬레이션 =====")
+    # 배치 모드는 --memory 파일의 임시 사본에서 실행하고 끝나면 사본만 지움 (저장된 상태는 그대로)
+    scratch = tempfile.TemporaryDirectory(prefix="lwm_batch_") if args.batch else None
+    memory_path = _scratch_memory(args.memory, scratch.name) if scratch is not None else args.memory
+    with startup.timed("world memory"):
+        memory = WorldMemory(memory_path)
+    timeline = None
+    if args.snapshots > 0:
+        timeline = Timeline(memory, capacity=args.snapshots)
+        timeline.capture()  # 첫 명령 전 상태 (물리 장면은 아직 없음)
+    trajectory_path = Path(args.memory).with_name("trajectory.npz") if args.trajectory else None
+    sim_kwargs = {"trajectory_decimation": args.trajectory, "trajectory_path": trajectory_path,
+                  "real_time_factor": args.rtf, "render_fps": args.fps,
+                  "playback": args.playback, "max_playback": args.max_playback,
+                  "contacts": args.contacts, "preview": args.preview, "verify_preview": args.verify_preview,
+                  "stop_at_rest": args.stop_at_rest, "settle_time": args.settle_time,
+                  "adaptive_step": args.adaptive_step}
+    turn_kwargs = {"cache": cache, "encoder": encoder, "fast_path": fast_path, "tracer": tracer}
 
     # 🔸 이건 굳이 초기화할 필요 없음 (파일에 저장된 상태를 살리고 싶으면)
     #memory.reset()
 
+    if args.profile_startup:
+        say(startup.report())
+
+    if args.batch:
+        src = sys.stdin if args.batch == "-" else open(args.batch, encoding="utf-8")
+        out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+        try:
+            failed = run_batch(src, memory, out, verbose=args.verbose, sim_kwargs=sim_kwargs,
+                               timeline=timeline, world_file=args.world, **turn_kwargs)
+        finally:
+            if src is not sys.stdin:
+                src.close()
+            if out is not sys.stdout:
+                out.close()
+        print_stats()
+        if timeline is not None:
+            timeline.ring.clear()
+        scratch.cleanup()
+        return 1 if failed else 0
+
+    if args.world:
+        record = run_world_file(args.world, memory, sim_kwargs=dict(sim_kwargs, show_gui=True),
+                                tracer=tracer, timeline=timeline)
+        if record["ok"]:
+            print(f"\n[SYSTEM] > 시작 월드 요약 ({record['engine']}):")
+            for narrative in record["summary"].values():
+                print(narrative)
+
+    if args.use_async:
+        from src.async_pipeline import AsyncTurnPipeline
+
+        pipeline = AsyncTurnPipeline(memory, cache=cache, encoder=encoder, fast_path=fast_path,
+                                     show_gui=True, sim_kwargs=sim_kwargs, tracer=tracer)
+        asyncio.run(pipeline.run())
+        print_stats()
+        print("\n[INFO] 프로그램 종료 중... 메모리 초기화 및 파일 삭제.")
+        memory.reset()
+        return
+
+    prompt = ""
     while True:
         try:
             prompt = input("\n[USER] > ").strip()
             if prompt.lower() in ["종료", "exit"]:
+                print_stats()
                 print("\n[INFO] 프로그램 종료 중... 메모리 초기화 및 파일 삭제.")
+                if timeline is not None:
+                    timeline.reset()
                 memory.reset()
                 break
-
-            # 0) 직전까지의 누적 월드
-            current_state = memory.state or {}
-            print("\n[DEBUG] > 현재 메모리(World State, sim 직전):")
-            print(json.dumps(current_state, ensure_ascii=False, indent=2))
-
-            # 1) 자연어 → 신규 world dict 생성 (현재 상태를 컨텍스트로)
-            new_world = natural_language_to_world(prompt, world_state=current_state)
-
-            # 2) actions를 물리 파라미터로 반영
-            actions = new_world.get("actions", []) or []
-            objects = new_world.get("objects", []) or []
-            obj_map = {o["id"]: o for o in objects if "id" in o}
-
-            for act in actions:
-                tid = act.get("target_id")
-                if not tid or tid not in obj_map:
-                    continue
-
-                phys = map_action_to_physics(act, obj_map[tid])
-                init = obj_map[tid].setdefault("initial_state", {})
-
-                if "velocity" in phys:
-                    init["velocity"] = phys["velocity"]
-                if "angular_velocity" in phys:
-                    init["angular_velocity"] = phys["angular_velocity"]
-
-                # 마찰/반발 등은 상위에 기록
-                for k in ("restitution", "friction", "rolling_friction"):
-                    if k in phys:
-                        obj_map[tid][k] = phys[k]
-
-            # 3) 월드 정리
-            new_world = sanitize_world_state(new_world)
-
-            print("\n[LLM] > 생성된 World JSON (정제 후):")
-            print(json.dumps(new_world, ensure_ascii=False, indent=2))
-
-            # 4) 논리 월드를 메모리에 누적 (환경/객체 추가 등)
-            updated = memory.apply_update(new_world)
-            print("\n[MEMORY] > LLM 기준 누적된 World State (sim 전):")
-            print(json.dumps(updated, ensure_ascii=False, indent=2))
-
-            # 5) Pydantic World 객체 생성
-            try:
-                world = World.model_validate(updated)
-            except Exception as e:
-                print(f"[ERROR] World 구조 검증 실패: {e}")
+            if _timeline_command(prompt, timeline) is not None:
+                continue
+            active = timeline.memory if timeline is not None else memory
+            if prompt.lower() in ["되돌리기", "undo"]:
+                try:
+                    active.undo()
+                    print(f"[INFO] 이전 턴 상태로 되돌렸습니다 (turn {active.turn}).")
+                except ValueError as e:
+                    print(f"[WARN] 되돌릴 수 없습니다: {e}")
                 continue
 
-            # 6) 실제 물리 시뮬레이션
-            sim_out = run_simulation_pybullet(world, show_gui=True)
-
-            # 7) 물리 시뮬레이션 결과를 다음 턴의 world_state로 반영
-            final_state = sim_out.get("final_state")
-            if final_state is not None:
-                memory.state = final_state   # RAM 업데이트
-                memory.save()               # 파일에도 저장
-
-                print("\n[MEMORY] > 물리 결과까지 반영된 World State (sim 후):")
-                print(json.dumps(memory.state, ensure_ascii=False, indent=2))
+            record = run_turn(prompt, active, sim_kwargs=dict(sim_kwargs, show_gui=True),
+                              timeline=timeline, **turn_kwargs)
 
             # 8) 요약 출력
-            summary = summarize(sim_out)
-            print("\n[SYSTEM] > 시나리오 요약:")
-            for obj_id, narrative in summary.items():
-                print(narrative)
+            if record["ok"]:
+                print("\n[SYSTEM] > 시나리오 요약:")
+                for obj_id, narrative in record["summary"].items():
+                    print(narrative)
 
         except Exception as e:
             print(f"\n[ERROR] 오류가 발생했습니다: {e}")
+            tracer.end_turn(prompt=prompt, ok=False, error=str(e))
             continue
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
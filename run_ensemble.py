@@ -0,0 +1,83 @@
+import argparse
+import json
+import sys
+
+import numpy as np
+
+from src.ensemble import run_ensemble
+from src.memory_engine import load_world_state
+from src.types import World
+
+
+def _parse_value(text: str):
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return text
+
+
+def _parse_grid(items):
+    """--set path=v1,v2,... → {"path": [v1, v2, ...]}  (값은 JSON으로 해석, 벡터는 ';'로 구분)"""
+    grid = {}
+    for item in items or []:
+        if "=" not in item:
+            raise SystemExit(f"[ERROR] --set 형식은 path=v1,v2 입니다: {item}")
+        path, values = item.split("=", 1)
+        sep = ";" if values.lstrip().startswith("[") else ","
+        grid[path.strip()] = [_parse_value(v.strip()) for v in values.split(sep) if v.strip()]
+    return grid
+
+
+def _parse_seeds(text):
+    """"0-9" 또는 "1,5,7" 형식"""
+    if not text:
+        return None
+    if "-" in text and "," not in text:
+        lo, hi = text.split("-", 1)
+        return list(range(int(lo), int(hi) + 1))
+    return [int(s) for s in text.split(",") if s.strip()]
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="헤드리스 앙상블 / 파라미터 스윕 실행")
+    ap.add_argument("--world", default="data/world_state.json", help="기본 World JSON 경로")
+    ap.add_argument("--set", action="append", dest="grid",
+                    help="스윕할 파라미터 (예: environment.wind.strength=0,10,50). 여러 번 지정 가능")
+    ap.add_argument("--seeds", help="난류 시드 목록 (예: 0-9 또는 1,2,3)")
+    ap.add_argument("--workers", type=int, default=None, help="워커 프로세스 수 (기본: CPU 코어 수)")
+    ap.add_argument("--out", help="원본 배열을 저장할 .npz 경로")
+    args = ap.parse_args(argv)
+
+    # 대화 중인 월드면 저널까지 반영한 최신 상태를 읽음
+    base = World.model_validate(load_world_state(args.world))
+
+    result = run_ensemble(base, grid=_parse_grid(args.grid), seeds=_parse_seeds(args.seeds),
+                          workers=args.workers)
+
+    if args.out:
+        np.savez(args.out, positions=result["positions"], velocities=result["velocities"],
+                 object_ids=np.array(result["object_ids"]))
+        print(f"[INFO] 배열 저장 완료: {args.out}", file=sys.stderr)
+
+    report = {
+        "runs": len(result["runs"]),
+        "groups": [
+            {
+                "params": g["params"],
+                "objects": {
+                    oid: {
+                        "mean": g["mean"][i].round(4).tolist(),
+                        "std": g["std"][i].round(4).tolist(),
+                        "percentiles": {str(q): v[i].round(4).tolist() for q, v in g["percentiles"].items()},
+                    }
+                    for i, oid in enumerate(result["object_ids"])
+                },
+            }
+            for g in result["groups"]
+        ],
+    }
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
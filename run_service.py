@@ -0,0 +1,81 @@
+import argparse
+import asyncio
+import json
+import signal
+import sys
+
+from src.service import SimulationService, LLMParser, StubParser
+
+
+async def _serve(service, host, port):
+    """SIGINT/SIGTERM을 받으면 서버를 멈추고 돌아옴 (워커 풀은 호출한 쪽에서 정리)"""
+    loop = asyncio.get_running_loop()
+    stop = asyncio.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except NotImplementedError:  # Windows
+            pass
+    server = asyncio.create_task(service.serve(host, port))
+    done, _ = await asyncio.wait({server, asyncio.create_task(stop.wait())},
+                                 return_when=asyncio.FIRST_COMPLETED)
+    server.cancel()
+    if server in done:
+        server.result()  # 시작 실패(포트 사용 중 등)는 그대로 올림
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="다중 세션 시뮬레이션 HTTP 서비스 (DIRECT 워커 프로세스 풀)")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8080)
+    ap.add_argument("--data-dir", default="data/sessions", help="세션별 월드 메모리 저장 디렉터리")
+    ap.add_argument("--workers", type=int, default=2, help="물리 워커 프로세스 수")
+    ap.add_argument("--queue-limit", type=int, default=8,
+                    help="워커당 대기/실행 중 턴 상한 (넘으면 503)")
+    ap.add_argument("--timeout", type=float, default=30.0, help="턴당 시뮬레이션 시간 제한(초, 넘으면 504)")
+    ap.add_argument("--max-scenes", type=int, default=64,
+                    help="워커당 유지할 세션 장면(DIRECT 연결) 수 (오래 안 쓴 것부터 닫음)")
+    ap.add_argument("--parser", choices=["llm", "stub"], default="llm",
+                    help="명령 해석기: llm(OpenAI + fast path) / stub(fast path 규칙만, 오프라인)")
+    ap.add_argument("--llm-cache", metavar="DIR", default=None, help="LLM 응답 디스크 캐시 디렉터리")
+    ap.add_argument("--initial-world", metavar="FILE", default=None,
+                    help="새 세션의 시작 월드 JSON (예: samples/initial_world.json)")
+    ap.add_argument("--preview", choices=["auto", "off"], default="auto",
+                    help="공만 있는 단순 장면은 NumPy 미리보기로 계산 (off: 항상 PyBullet)")
+    ap.add_argument("--stop-at-rest", action="store_true",
+                    help="모든 물체가 --settle-time 동안 멈춰 있으면 duration 전에 시뮬레이션 종료")
+    ap.add_argument("--settle-time", type=float, default=0.5, help="정지 판정에 필요한 연속 정지 시간(초)")
+    ap.add_argument("--adaptive-step", action="store_true", help="접촉 없는 자유 비행 구간은 큰 스텝으로 진행")
+    args = ap.parse_args(argv)
+
+    if args.parser == "stub":
+        parser = StubParser()
+    else:
+        cache = None
+        if args.llm_cache:
+            from src.llm_cache import LLMResponseCache
+            cache = LLMResponseCache(args.llm_cache)
+        parser = LLMParser(cache=cache)
+
+    initial_world = None
+    if args.initial_world:
+        with open(args.initial_world, encoding="utf-8") as f:
+            initial_world = json.load(f)
+
+    service = SimulationService(args.data_dir, workers=args.workers, queue_limit=args.queue_limit,
+                                timeout=args.timeout, parser=parser, max_scenes=args.max_scenes,
+                                initial_world=initial_world,
+                                sim_kwargs={"preview": args.preview, "stop_at_rest": args.stop_at_rest,
+                                            "settle_time": args.settle_time, "adaptive_step": args.adaptive_step})
+    try:
+        asyncio.run(_serve(service, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print("\n[INFO] 서비스 종료 중...")
+        service.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+# src/aerodynamics.py
+import numpy as np
+import pybullet as p
+
+
+class AeroStage:
+    """공기저항 + 난류를 모든 바디에 대해 NumPy로 한 번에 계산하는 단계
+
+    바디별 면적/질량은 생성 시 배열로 고정하고, 매 스텝 속도만 읽어와서
+    항력과 난류 힘을 벡터 연산으로 구한 뒤 바디당 한 번만 applyExternalForce 한다.
+    힘 공식은 기존 바디별 루프와 동일하다:
+      - 항력: F = -0.5 * rho * Cd * A * |v_rel| * v_rel   (|v_rel| > 1e-6 일 때)
+      - 난류: F = [wind_strength * 0.2 * jitter, 0, 0]     (풍향이 0이고 풍속 > 0 일 때)
+    """
+
+    SPEED_EPS = 1e-6  # 기존 루프의 "speed > 1e-6" 조건과 동일
+
+    def __init__(self, bodies, areas, masses, air_density, drag_coefficient,
+                 wind_dir, wind_strength, seed=None, physics_client=0):
+        self.cid = physics_client
+        self.bodies = list(bodies)
+        self.areas = np.asarray(areas, dtype=float)
+        self.masses = np.asarray(masses, dtype=float)
+        self.air_density = float(air_density)
+        self.drag_coefficient = float(drag_coefficient)
+
+        wind_dir = np.asarray(wind_dir, dtype=float)
+        self.wind_strength = float(wind_strength)
+        self.wind_v = self.wind_strength * wind_dir
+        self.use_turbulence = bool(np.abs(wind_dir).sum() < 1e-5 and self.wind_strength > 0)
+        self.rng = np.random.default_rng(seed)
+
+        n = len(self.bodies)
+        self.lin_vel = np.zeros((n, 3))
+        self.ang_vel = np.zeros((n, 3))
+
+        # 질량 0(정적) 바디는 외력이 의미가 없으므로 처음부터 제외
+        self.dynamic = self.masses > 0
+        # 면적 0 바디는 항력이 항상 0 → 항력 계산 대상에서 제외
+        self.drag_coef = 0.5 * self.air_density * self.drag_coefficient * self.areas
+        self.has_drag = (self.drag_coef > 0) & self.dynamic
+
+    @property
+    def active(self) -> bool:
+        """힘을 줄 일이 하나라도 있는지 (진공 + 무풍이면 단계 전체 생략)"""
+        return bool(len(self.bodies)) and (
+            (self.air_density > 0 and bool(self.has_drag.any())) or self.use_turbulence
+        )
+
+    def read_velocities(self):
+        """모든 바디의 선속도/각속도를 배열로 갱신"""
+        cid = self.cid
+        for i, b in enumerate(self.bodies):
+            lin, ang = p.getBaseVelocity(b, physicsClientId=cid)
+            self.lin_vel[i] = lin
+            self.ang_vel[i] = ang
+        return self.lin_vel, self.ang_vel
+
+    def asleep_mask(self):
+        """정지해 있고(선속도·각속도 ~0) 바람도 없어 받을 힘이 없는 바디"""
+        at_rest = (np.abs(self.lin_vel).max(axis=1) <= self.SPEED_EPS) & \
+                  (np.abs(self.ang_vel).max(axis=1) <= self.SPEED_EPS)
+        if self.use_turbulence:
+            return np.zeros(len(self.bodies), dtype=bool)  # 난류는 정지한 바디도 민다
+        return at_rest & (np.abs(self.wind_v).max() <= self.SPEED_EPS)
+
+    def compute_forces(self):
+        """현재 속도 배열 기준으로 바디별 합력 (N, 3)과 적용 대상 마스크를 반환"""
+        n = len(self.bodies)
+        forces = np.zeros((n, 3))
+
+        # --- 공기저항 ---
+        if self.air_density > 0:
+            rel_v = self.lin_vel - self.wind_v
+            speed = np.sqrt(np.einsum("ij,ij->i", rel_v, rel_v))
+            mask = self.has_drag & (speed > self.SPEED_EPS)
+            forces[mask] = -(self.drag_coef[mask] * speed[mask])[:, None] * rel_v[mask]
+
+        # --- 난류 효과 ---
+        if self.use_turbulence:
+            jitter = (self.rng.random(n) - 0.5) * 2.0
+            forces[:, 0] += self.wind_strength * 0.2 * jitter
+
+        apply = self.dynamic & ~self.asleep_mask() & np.any(forces != 0.0, axis=1)
+        return forces, apply
+
+    def apply(self, refresh: bool = True):
+        """속도를 읽고 힘을 계산해 한 번에 적용 (스텝마다 호출)
+
+        refresh=False면 이번 스텝에 이미 read_velocities()로 읽은 배열을 그대로 쓴다.
+        """
+        if not self.active:
+            return
+        if refresh:
+            self.read_velocities()
+        forces, apply = self.compute_forces()
+        cid = self.cid
+        for i in np.flatnonzero(apply):
+            p.applyExternalForce(self.bodies[i], -1, forces[i].tolist(), [0, 0, 0],
+                                 p.WORLD_FRAME, physicsClientId=cid)
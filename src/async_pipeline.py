@@ -0,0 +1,166 @@
+# src/async_pipeline.py
+"""LLM 파싱과 물리 시뮬레이션을 겹쳐서 돌리는 asyncio 턴 파이프라인
+
+- 입력은 별도 스레드에서 읽으므로 시뮬레이션이 도는 동안에도 다음 명령을 큐에 넣을 수 있다.
+- 명령이 들어오는 즉시 AsyncOpenAI로 파싱을 시작한다 (직전 턴의 시뮬레이션과 병행).
+- 물리는 전용 스레드 하나에서만 돌린다 (PyBullet 연결/GUI를 같은 스레드에 고정).
+- WorldMemory 반영은 항상 입력 순서대로 한 턴씩 이루어진다.
+
+파싱을 시작할 때 본 월드(base)가 그 사이 이전 턴의 결과로 바뀌었다면,
+LLM이 base 값을 그대로 되돌려준 필드는 최신 값으로 바꿔(rebase) 직전 턴 결과를 덮어쓰지 않는다.
+"""
+import asyncio
+import copy
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Dict, Optional
+
+from .context_encoder import ContextEncoder
+from .fast_path import FastPathMatcher
+from .llm_cache import LLMResponseCache
+from .llm_parser import natural_language_to_world_async
+from .memory_engine import WorldMemory
+from .reporting import summarize
+from .tracing import Tracer, get_tracer
+from .turn_pipeline import prepare_world, merge_into_memory, commit_result
+from .types import World
+
+EXIT_COMMANDS = ("종료", "exit")
+
+
+def _same(a: Any, b: Any) -> bool:
+    """숫자는 허용 오차 내 비교, 리스트/dict는 재귀 비교"""
+    if isinstance(a, (int, float)) and isinstance(b, (int, float)):
+        return math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-9)
+    if isinstance(a, list) and isinstance(b, list):
+        return len(a) == len(b) and all(_same(x, y) for x, y in zip(a, b))
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(_same(a[k], b[k]) for k in a)
+    return a == b
+
+
+def _rebase_fields(new: Dict, base: Dict, current: Dict):
+    for k, v in list(new.items()):
+        if k in base and k in current and _same(v, base[k]):
+            new[k] = copy.deepcopy(current[k])
+
+
+def rebase_world(new_world: Dict[str, Any], base: Dict[str, Any], current: Dict[str, Any]) -> Dict[str, Any]:
+    """LLM이 base 기준으로 만든 world를 최신 상태(current) 기준으로 옮김
+
+    LLM이 바꾸지 않은(= base와 같은) 값만 current 값으로 교체하고,
+    LLM이 실제로 바꾼 값은 그대로 둔다.
+    """
+    base_objs = {o.get("id"): o for o in base.get("objects", [])}
+    cur_objs = {o.get("id"): o for o in current.get("objects", [])}
+    for obj in new_world.get("objects", []) or []:
+        b, c = base_objs.get(obj.get("id")), cur_objs.get(obj.get("id"))
+        if b is None or c is None:
+            continue
+        _rebase_fields(obj, b, c)
+        if isinstance(obj.get("initial_state"), dict):
+            _rebase_fields(obj["initial_state"], b.get("initial_state", {}), c.get("initial_state", {}))
+
+    env = new_world.get("environment")
+    if isinstance(env, dict):
+        _rebase_fields(env, base.get("environment", {}) or {}, current.get("environment", {}) or {})
+    return new_world
+
+
+class AsyncTurnPipeline:
+    """입력 → (병행) LLM 파싱 → (순서대로) 메모리 반영 → 물리 스레드 시뮬 → 요약"""
+
+    def __init__(self, memory: WorldMemory, cache: Optional[LLMResponseCache] = None,
+                 show_gui: bool = True, sim_kwargs: Optional[Dict[str, Any]] = None,
+                 encoder: Optional[ContextEncoder] = None,
+                 fast_path: Optional[FastPathMatcher] = None, tracer: Optional[Tracer] = None):
+        self.memory = memory
+        self.tracer = tracer or get_tracer()
+        self.cache = cache
+        self.encoder = encoder
+        self.fast_path = fast_path
+        self.show_gui = show_gui
+        self.sim_kwargs = sim_kwargs or {}
+        self.version = 0  # 메모리에 결과가 반영된 턴 수
+        self._physics = ThreadPoolExecutor(max_workers=1, thread_name_prefix="physics")
+
+    async def run(self):
+        turns: asyncio.Queue = asyncio.Queue()
+        reader = asyncio.create_task(self._read_input(turns))
+        try:
+            await self._apply_loop(turns)
+        finally:
+            reader.cancel()
+            self._physics.shutdown(wait=True)
+
+    async def _read_input(self, turns: asyncio.Queue):
+        while True:
+            try:
+                prompt = (await asyncio.to_thread(input, "\n[USER] > ")).strip()
+            except EOFError:
+                prompt = "exit"
+            if not prompt:
+                continue
+            if prompt.lower() in EXIT_COMMANDS:
+                await turns.put(None)
+                return
+
+            # 지금까지 반영된 상태를 문맥으로 즉시 파싱 시작
+            base_version = self.version
+            base = copy.deepcopy(self.memory.state or {})
+            task = asyncio.create_task(self._parse(prompt, base))
+            await turns.put((prompt, base_version, base, task))
+            if turns.qsize() > 1:
+                print(f"[INFO] 대기 중인 명령: {turns.qsize()}개")
+
+    async def _parse(self, prompt: str, base: Dict[str, Any]):
+        """(World, 파싱에 걸린 초) — 파싱은 이전 턴과 겹쳐 돌므로 시간은 따로 재서 턴에 더함"""
+        t0 = time.perf_counter()
+        world = await natural_language_to_world_async(prompt, world_state=base, cache=self.cache,
+                                                      encoder=self.encoder, fast_path=self.fast_path)
+        return world, time.perf_counter() - t0
+
+    async def _apply_loop(self, turns: asyncio.Queue):
+        from .simulation import run_simulation  # 첫 시뮬레이션 때 엔진 로드 (PyBullet은 필요할 때만)
+        loop = asyncio.get_running_loop()
+        tracer = self.tracer
+        while True:
+            item = await turns.get()
+            if item is None:
+                break
+            prompt, base_version, base, task = item
+            # 턴 기록은 메모리에 반영하는 시점부터 (run_cli.run_turn과 같은 span 이름)
+            tracer.begin_turn()
+            try:
+                with tracer.span("llm.wait"):  # 파싱이 아직 안 끝나 기다린 시간
+                    new_world, parse_s = await task
+                tracer.add("llm", parse_s)
+                with tracer.span("prepare"):
+                    if base_version != self.version:
+                        # LLM이 실제로 준 필드만 dict로 꺼내 rebase 후 다시 검증 (드문 경로)
+                        draft = rebase_world(new_world.model_dump(exclude_unset=True), base,
+                                             self.memory.state or {})
+                        new_world = World.model_validate(draft)
+                    new_world = prepare_world(new_world)
+                    world, _ = merge_into_memory(self.memory, new_world)
+
+                with tracer.span("simulate"):
+                    sim_out = await loop.run_in_executor(
+                        self._physics,
+                        partial(run_simulation, world, show_gui=self.show_gui, **self.sim_kwargs),
+                    )
+                with tracer.span("commit"):
+                    commit_result(self.memory, sim_out)
+                self.version += 1
+
+                with tracer.span("summarize"):
+                    summary = summarize(sim_out)
+                print(f"\n[SYSTEM] > 시나리오 요약 ({prompt}):")
+                for obj_id, narrative in summary.items():
+                    print(narrative)
+                tracer.end_turn(prompt=prompt, ok=True, objects=len(world.objects))
+            except Exception as e:
+                print(f"\n[ERROR] 오류가 발생했습니다 ({prompt}): {e}")
+                tracer.end_turn(prompt=prompt, ok=False, error=str(e))
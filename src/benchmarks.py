@@ -0,0 +1,212 @@
+# src/benchmarks.py
+"""시뮬레이션 / 턴 파이프라인 스케일링 벤치마크
+
+생성한 장면(공/상자 1개 ~ 수천 개, 바람 없음/바람/난류)에서
+- run_simulation_pybullet 의 초당 스텝 수
+- 턴 단계별 지연 (parse → prepare → merge → simulate → commit → summarize)
+- 최대 메모리 (Python 할당 peak, 프로세스 최대 RSS)
+를 재고, 저장해 둔 기준값과 비교한다. LLM은 스텁이라 오프라인에서 돈다.
+최대 RSS는 프로세스 전체 값이라 케이스마다 새 프로세스(spawn)에서 측정한다.
+"""
+import copy
+import math
+import multiprocessing
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+from .memory_engine import WorldMemory
+from .reporting import summarize
+from .turn_pipeline import prepare_world, merge_into_memory, commit_result
+from .types import World
+
+AIR_MODES = {
+    "calm": {"direction": [0.0, 0.0, 0.0], "strength": 0.0},
+    "wind": {"direction": [1.0, 0.0, 0.0], "strength": 5.0},
+    "turbulence": {"direction": [0.0, 0.0, 0.0], "strength": 5.0},  # 풍향 0 + 풍속 > 0
+}
+STAGES = ("parse", "prepare", "merge", "simulate", "commit", "summarize")
+
+# 비교 방향: 높을수록 좋은 지표 / 낮을수록 좋은 지표
+HIGHER_IS_BETTER = ("steps_per_sec",)
+LOWER_IS_BETTER = ("turn_ms",) + tuple(f"{s}_ms" for s in STAGES)
+
+
+def make_scene(n: int, kind: str = "balls", air: str = "calm", duration: float = 1.0,
+               spacing: float = 0.6, seed: int = 0) -> Dict[str, Any]:
+    """n개 객체를 격자에 배치한 world dict (kind: balls / boxes / mixed)"""
+    rng = np.random.default_rng(seed)
+    side = max(1, math.ceil(math.sqrt(n)))
+    objects = []
+    for i in range(n):
+        if kind == "mixed":
+            obj_type = "ball" if i % 2 == 0 else "box"
+        else:
+            obj_type = "box" if kind == "boxes" else "ball"
+        x, y = (i % side - side / 2) * spacing, (i // side - side / 2) * spacing
+        vel = rng.uniform(-1.0, 1.0, 3).round(3).tolist()
+        objects.append({
+            "id": f"{obj_type}_{i + 1}",
+            "type": obj_type,
+            "initial_state": {
+                "position": [x, y, 1.0 + float(rng.uniform(0.0, 0.5))],
+                "velocity": vel,
+                "mass": 1.0,
+                "orientation": [0.0, 0.0, 0.0, 1.0],
+            },
+        })
+    return {
+        "objects": objects,
+        "environment": {
+            "gravity": [0.0, 0.0, -9.81],
+            "wind": copy.deepcopy(AIR_MODES[air]),
+            "time_step": 0.01,
+            "duration": duration,
+        },
+    }
+
+
+class StubParser:
+    """LLM 대신 쓰는 결정적 파서: 매 턴 객체 하나를 던지는 응답을 LLM처럼 전체 월드로 돌려줌"""
+
+    def __call__(self, turn: int, world_state: Dict[str, Any]) -> Dict[str, Any]:
+        draft = copy.deepcopy({k: v for k, v in world_state.items() if k != "actions"})
+        objects = draft.get("objects", [])
+        if objects:
+            target = objects[turn % len(objects)]["id"]
+            draft["actions"] = [{"type": "throw", "target_id": target,
+                                 "direction": [1.0, 0.0, 1.0], "magnitude": 1.0}]
+        return draft
+
+
+def _peak_rss_kb() -> int:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return int(rss / 1024) if sys.platform == "darwin" else int(rss)  # macOS는 바이트 단위
+
+
+def bench_simulation(world_dict: Dict[str, Any], repeats: int = 1) -> Dict[str, float]:
+    """헤드리스 시뮬레이션만 반복 측정 (매번 새 DIRECT 연결)"""
+    from .physics_pybullet import run_simulation_pybullet
+
+    best = math.inf
+    steps = 0
+    for _ in range(repeats):
+        world = World.model_validate(world_dict)  # 시뮬레이션이 모델을 제자리에서 갱신하므로 매번 새로
+        t0 = time.perf_counter()
+        out = run_simulation_pybullet(world, show_gui=False, seed=0)
+        best = min(best, time.perf_counter() - t0)
+        steps = out["steps_simulated"]
+    return {"steps": steps, "sim_seconds": best, "steps_per_sec": steps / best if best > 0 else 0.0}
+
+
+def _one_turn(turn: int, memory: WorldMemory, parser: StubParser, cid: int) -> Dict[str, float]:
+    from .physics_pybullet import run_simulation_pybullet
+
+    timings = {}
+
+    def stage(name, fn, *args, **kwargs):
+        t0 = time.perf_counter()
+        result = fn(*args, **kwargs)
+        timings[f"{name}_ms"] = (time.perf_counter() - t0) * 1000.0
+        return result
+
+    draft = stage("parse", parser, turn, memory.state)
+    new_world = stage("prepare", prepare_world, draft)
+    world, _ = stage("merge", merge_into_memory, memory, new_world)
+    sim_out = stage("simulate", run_simulation_pybullet, world, show_gui=False, seed=turn,
+                    physics_client=cid)
+    stage("commit", commit_result, memory, sim_out)
+    stage("summarize", summarize, sim_out)
+    timings["turn_ms"] = sum(timings.values())
+    return timings
+
+
+def bench_turns(world_dict: Dict[str, Any], turns: int = 3) -> Dict[str, float]:
+    """스텁 LLM으로 전체 턴을 돌려 단계별 지연(중앙값)과 Python 메모리 peak 측정
+
+    물리 연결 하나를 턴 사이에 유지해 실제 CLI처럼 장면을 재사용한다.
+    메모리는 타이밍을 왜곡하지 않도록 마지막에 한 턴을 더 돌려 따로 잰다.
+    """
+    import pybullet as p
+
+    cid = p.connect(p.DIRECT)
+    parser = StubParser()
+    with tempfile.TemporaryDirectory() as tmp:
+        memory = WorldMemory(str(Path(tmp) / "world_state.json"))
+        memory.state = copy.deepcopy(world_dict)
+        memory.save()
+        try:
+            samples = [_one_turn(t, memory, parser, cid) for t in range(turns)]
+            tracemalloc.start()
+            _one_turn(turns, memory, parser, cid)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        finally:
+            p.disconnect(cid)
+
+    result = {k: float(np.median([s[k] for s in samples])) for k in samples[0]}
+    result["python_peak_kb"] = peak / 1024.0
+    return result
+
+
+def run_case(n: int, kind: str, air: str, duration: float = 1.0, turns: int = 3,
+             repeats: int = 1) -> Dict[str, float]:
+    """케이스 하나 측정. peak_rss_kb는 이 프로세스의 최대 RSS라 run_suite는 케이스마다 새 프로세스에서 부름"""
+    bench_simulation(make_scene(1, duration=0.1))  # 워밍업 (import, 첫 연결 비용 제외)
+    world = make_scene(n, kind, air, duration)
+    metrics = {"objects": n}
+    metrics.update(bench_simulation(world, repeats))
+    if turns > 0:
+        metrics.update(bench_turns(world, turns))
+    metrics["peak_rss_kb"] = _peak_rss_kb()
+    return metrics
+
+
+def run_suite(sizes: List[int], kinds: List[str], airs: List[str], duration: float = 1.0,
+              turns: int = 3, repeats: int = 1, log=None) -> Dict[str, Any]:
+    """모든 (크기, 종류, 공기) 조합을 케이스별 새 프로세스에서 측정해 {"cases": {이름: 지표}} 반환"""
+    ctx = multiprocessing.get_context("spawn")
+    cases = {}
+    for kind in kinds:
+        for air in airs:
+            for n in sizes:
+                name = f"{kind}-{air}-{n}"
+                with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+                    metrics = pool.submit(run_case, n, kind, air, duration, turns, repeats).result()
+                cases[name] = metrics
+                if log is not None:
+                    log(f"[INFO] {name}: {metrics['steps_per_sec']:.0f} steps/s"
+                        + (f", turn {metrics['turn_ms']:.1f} ms" if "turn_ms" in metrics else ""))
+    return {
+        "meta": {"python": sys.version.split()[0], "platform": sys.platform,
+                 "duration": duration, "turns": turns, "repeats": repeats},
+        "cases": cases,
+    }
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = 0.25,
+            min_delta_ms: float = 1.0) -> List[str]:
+    """기준값 대비 tolerance(비율)보다 나빠진 지표 목록 (비어 있으면 통과)
+
+    지연 지표는 차이가 min_delta_ms 미만이면 측정 잡음으로 보고 무시한다.
+    """
+    regressions = []
+    for name, metrics in results.get("cases", {}).items():
+        base = baseline.get("cases", {}).get(name)
+        if base is None:
+            continue
+        for key in HIGHER_IS_BETTER:
+            if key in metrics and base.get(key, 0) > 0 and metrics[key] < base[key] * (1 - tolerance):
+                regressions.append(f"{name}.{key}: {metrics[key]:.1f} < 기준 {base[key]:.1f}")
+        for key in LOWER_IS_BETTER:
+            if (key in metrics and base.get(key, 0) > 0 and metrics[key] > base[key] * (1 + tolerance)
+                    and metrics[key] - base[key] >= min_delta_ms):
+                regressions.append(f"{name}.{key}: {metrics[key]:.2f} > 기준 {base[key]:.2f}")
+    return regressions
@@ -0,0 +1,167 @@
+# src/contacts.py
+"""접촉 이벤트 로그(ContactLog, PyBullet 전용)와 엔진에 무관한 요약(contact_stats)
+
+pybullet은 ContactLog가 실제로 접촉을 조회할 때만 import한다
+(pymunk 2D 실행의 요약이 PyBullet을 불러오지 않도록).
+"""
+import numpy as np
+
+
+class ContactLog:
+    """접촉 시작(충돌) 이벤트를 미리 할당한 NumPy 배열에 쌓는 이벤트 로그
+
+    - 이벤트 하나 = 바디 쌍이 접촉을 시작한 순간: 시각, 쌍(이름 인덱스), 최대 법선 충격량, 위치
+    - 접촉이 이어지는 동안은 새 이벤트를 만들지 않고 (스텝 간 중복 제거)
+      그 접촉의 최대 충격량만 갱신한다 → 바닥에 놓인 물체가 매 스텝 이벤트를 만들지 않음
+    - 움직이는 바디가 적으면 그 바디들만 getContactPoints(bodyA=...)로 조회하고,
+      정지한 바디끼리의 접촉은 직전 상태를 그대로 이어받는다 (붐비는 정지 장면에서도 스텝당 비용이 작음)
+    - 배열이 가득 차면 두 배로 늘리고, max_events를 넘는 이벤트는 버리고 개수만 센다
+
+    이름 인덱스 0은 바닥(ground), 1..n은 bodies 순서의 객체 id.
+    충격량은 스텝 동안의 법선력 합 × dt [N·s].
+    """
+
+    def __init__(self, bodies, names, ground_id=None, physics_client=0, capacity: int = 256,
+                 max_events: int = 100000, active_tol: float = 1e-3, per_body_ratio: float = 0.25):
+        self.cid = physics_client
+        self.bodies = list(bodies)
+        self.names = ["ground"] + list(names)
+        self.index = {b: i + 1 for i, b in enumerate(self.bodies)}
+        if ground_id is not None:
+            self.index[ground_id] = 0
+        self.max_events = max_events
+        self.active_tol = active_tol
+        self.per_body_ratio = per_body_ratio  # 움직이는 바디 비율이 이보다 작으면 바디별 조회
+        self.count = 0
+        self.dropped = 0
+        self._open = {}  # 접촉 중인 쌍 (a, b) → 이벤트 인덱스 (버려진 이벤트면 -1)
+        self._alloc(max(1, capacity))
+
+    def _alloc(self, capacity: int):
+        n = self.count
+        t, pair = np.empty(capacity), np.empty((capacity, 2), dtype=np.int32)
+        impulse, position = np.empty(capacity, dtype=np.float32), np.empty((capacity, 3), dtype=np.float32)
+        if n:
+            t[:n], pair[:n], impulse[:n], position[:n] = self.t[:n], self.pair[:n], self.impulse[:n], self.position[:n]
+        self.t, self.pair, self.impulse, self.position = t, pair, impulse, position
+
+    def _add(self, t: float, key, impulse: float, position) -> int:
+        if self.count >= self.max_events:
+            self.dropped += 1
+            return -1
+        if self.count == len(self.t):
+            self._alloc(len(self.t) * 2)
+        i = self.count
+        self.t[i], self.pair[i], self.impulse[i], self.position[i] = t, key, impulse, position
+        self.count += 1
+        return i
+
+    def _query(self, lin_vel=None, ang_vel=None):
+        """(접촉 점 목록, 조회한 바디 인덱스 집합 또는 None=전체) 반환"""
+        import pybullet as p
+
+        cid = self.cid
+        if lin_vel is not None and len(self.bodies):
+            moving = (np.abs(lin_vel).max(axis=1) > self.active_tol) | (np.abs(ang_vel).max(axis=1) > self.active_tol)
+            idx = np.flatnonzero(moving)
+            if len(idx) < self.per_body_ratio * len(self.bodies):
+                points = []
+                for i in idx:
+                    points.extend(p.getContactPoints(bodyA=self.bodies[i], physicsClientId=cid))
+                return points, {int(i) + 1 for i in idx}
+        return p.getContactPoints(physicsClientId=cid), None
+
+    def step(self, t: float, dt: float, lin_vel=None, ang_vel=None):
+        """stepSimulation 직후 호출. lin_vel/ang_vel(바디 순서 배열)이 있으면 움직이는 바디만 조회"""
+        points, queried = self._query(lin_vel, ang_vel)
+
+        # 쌍별로 법선력 합과 가장 센 점의 위치 (바디별 조회에서 같은 쌍이 두 번 나오면 처음 것만)
+        current = {}
+        source = {} if queried is not None else None
+        index = self.index
+        for pt in points:
+            a, b = index.get(pt[1]), index.get(pt[2])
+            if a is None or b is None:
+                continue
+            key = (a, b) if a < b else (b, a)
+            if source is not None and source.setdefault(key, pt[1]) != pt[1]:
+                continue
+            force = pt[9]
+            cur = current.get(key)
+            if cur is None:
+                current[key] = [force, force, pt[5]]
+            else:
+                cur[0] += force
+                if force > cur[1]:
+                    cur[1], cur[2] = force, pt[5]
+
+        opened = {}
+        prev, peak = self._open, self.impulse
+        for key, (force, _, position) in current.items():
+            impulse = force * dt
+            ev = prev.get(key)
+            if ev is None:
+                ev = self._add(t, key, impulse, position)
+            elif ev >= 0 and impulse > peak[ev]:
+                peak[ev] = impulse
+            opened[key] = ev
+
+        # 조회하지 않은(정지한) 바디끼리의 접촉은 그대로 유지
+        if queried is not None:
+            for key, ev in self._open.items():
+                if key not in opened and key[0] not in queried and key[1] not in queried:
+                    opened[key] = ev
+        self._open = opened
+
+    def to_dict(self):
+        """기록된 이벤트만 잘라서 반환 (복사 없이 view)"""
+        n = self.count
+        return {
+            "names": self.names,
+            "t": self.t[:n],
+            "pair": self.pair[:n],
+            "impulse": self.impulse[:n],
+            "position": self.position[:n],
+            "dropped": self.dropped,
+        }
+
+
+def contact_stats(contacts, min_impulse: float = 0.05):
+    """이벤트 로그를 객체별로 요약: 바닥 충돌 / 객체 간 충돌 횟수, 첫 충돌 시각, 최대 충격량
+
+    first_impact / max_impulse 는 모든 충돌, ground_* 는 바닥 충돌만, collision_* 는 객체 간 충돌만
+    (해당 충돌이 없으면 None).
+    min_impulse [N·s] 미만의 접촉(살짝 스침, 미끄러지며 닿음)은 충돌로 세지 않는다.
+    """
+    names = contacts["names"]
+    t = np.asarray(contacts["t"], dtype=float)
+    pair = np.asarray(contacts["pair"], dtype=int).reshape(-1, 2)
+    impulse = np.asarray(contacts["impulse"], dtype=float)
+    hits = impulse >= min_impulse
+
+    # 이벤트를 양방향(객체 → 상대)으로 펼쳐 객체별로 정렬한 뒤 구간으로 나눔 (객체 수 × 이벤트 수 반복 없음)
+    obj = np.concatenate([pair[hits, 0], pair[hits, 1]])
+    other = np.concatenate([pair[hits, 1], pair[hits, 0]])
+    t2, imp2 = np.tile(t[hits], 2), np.tile(impulse[hits], 2)
+    keep = obj > 0
+    obj, other, t2, imp2 = obj[keep], other[keep], t2[keep], imp2[keep]
+    order = np.lexsort((t2, obj))  # 객체별, 그 안에서는 시간순
+    obj, other, t2, imp2 = obj[order], other[order], t2[order], imp2[order]
+
+    stats = {}
+    ids, starts = np.unique(obj, return_index=True)
+    for j, lo, hi in zip(ids, starts, list(starts[1:]) + [len(obj)]):
+        o, tt, ii = other[lo:hi], t2[lo:hi], imp2[lo:hi]
+        ground = o == 0
+        hit_objects = ~ground
+        stats[names[j]] = {
+            "ground_hits": int(ground.sum()),
+            "collisions": [names[k] for k in dict.fromkeys(o[hit_objects].tolist())],
+            "first_impact": float(tt.min()),
+            "max_impulse": float(ii.max()),
+            "ground_first_impact": float(tt[ground].min()) if ground.any() else None,
+            "ground_max_impulse": float(ii[ground].max()) if ground.any() else None,
+            "collision_first_impact": float(tt[hit_objects].min()) if hit_objects.any() else None,
+            "collision_max_impulse": float(ii[hit_objects].max()) if hit_objects.any() else None,
+        }
+    return stats
@@ -0,0 +1,196 @@
+# src/context_encoder.py
+"""LLM 프롬프트에 넣을 월드 상태를 압축하는 컨텍스트 인코더
+
+- 숫자는 precision 자리로 반올림 (-1.28e-06 같은 잡음은 0으로)
+- sanitize_world_state 기본값과 같은 필드는 생략 (LLM 응답은 다시 sanitize 되므로 안전)
+- 명령에서 언급된 객체(id / 종류)만 전체를 보내고, 나머지는 한 줄 요약
+- token_budget을 넘지 않도록 객체를 채우고, 넘치는 객체는 요약으로 돌림
+"""
+import json
+import math
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from .startup import timed
+
+_lazy: Dict[str, Any] = {}  # tiktoken 인코딩은 처음 토큰을 셀 때 불러옴 (import 시점 X)
+
+# sanitize_world_state / types 기본값과 동일하게 유지
+ENV_DEFAULTS = {
+    "gravity": [0.0, 0.0, -9.81],
+    "wind": {"direction": [0.0, 0.0, 0.0], "strength": 0.0},
+    "temperature": 298.0,
+    "pressure": 101325.0,
+    "air_density": 1.225,
+    "drag_coefficient": 0.47,
+    "humidity": 0.5,
+    "time_step": 0.01,
+    "duration": 5.0,
+}
+INITIAL_STATE_DEFAULTS = {
+    "velocity": [0.0, 0.0, 0.0],
+    "mass": 1.0,
+    "orientation": [0.0, 0.0, 0.0, 1.0],
+}
+
+# 명령에서 객체 종류를 가리키는 단어 (한국어/영어). "공기"의 "공"은 제외
+TYPE_PATTERNS = {
+    "ball": re.compile(r"ball|sphere|공(?!기)"),
+    "sphere": re.compile(r"ball|sphere|공(?!기)"),
+    "box": re.compile(r"box|cube|상자|박스"),
+    "table": re.compile(r"table|테이블|탁자"),
+    "plane": re.compile(r"plane|floor|ground|바닥"),
+}
+
+
+def _get_encoding():
+    """선택 의존성 tiktoken의 인코딩 (첫 호출 때 import + 로드, 없으면 None)"""
+    if "encoding" not in _lazy:
+        with timed("tiktoken encoding"):
+            try:
+                import tiktoken
+                _lazy["encoding"] = tiktoken.get_encoding("o200k_base")
+            except Exception:  # ImportError 또는 인코딩 파일 다운로드 실패
+                _lazy["encoding"] = None
+    return _lazy["encoding"]
+
+
+def estimate_tokens(text: str) -> int:
+    """토큰 수 추정 (tiktoken이 없으면 ASCII 4자당 1토큰, 비ASCII 1자당 1토큰)"""
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    return math.ceil(ascii_chars / 4) + (len(text) - ascii_chars)
+
+
+def full_context_message(world_state: Dict[str, Any]) -> str:
+    """기존(압축 전) 컨텍스트 메시지 — 절약량 비교 기준"""
+    state = {k: v for k, v in world_state.items() if k != "actions"}
+    return (f"현재 월드 상태는 다음과 같습니다:\n{json.dumps(state, ensure_ascii=False, indent=2)}"
+            f"\n\n이 상태를 바탕으로 다음 명령을 처리해주세요:")
+
+
+def _round(v: Any, precision: int) -> Any:
+    if isinstance(v, bool):
+        return v
+    if isinstance(v, float):
+        r = round(v, precision)
+        return 0.0 if r == 0 else r  # -0.0 제거
+    if isinstance(v, list):
+        return [_round(x, precision) for x in v]
+    if isinstance(v, dict):
+        return {k: _round(x, precision) for k, x in v.items()}
+    return v
+
+
+def _equal(a: Any, b: Any, precision: int) -> bool:
+    return _round(a, precision) == _round(b, precision)
+
+
+def _strip_defaults(d: Dict[str, Any], defaults: Dict[str, Any], precision: int) -> Dict[str, Any]:
+    return {k: v for k, v in d.items() if not (k in defaults and _equal(v, defaults[k], precision))}
+
+
+class ContextEncoder:
+    """토큰 예산 안에서 월드 상태를 압축 문자열로 만드는 인코더"""
+
+    def __init__(self, precision: int = 4, token_budget: int = 1500):
+        self.precision = precision
+        self.token_budget = token_budget
+        self.last_report: Optional[Dict[str, int]] = None
+        self.total_saved = 0
+
+    @property
+    def signature(self) -> str:
+        """캐시 키에 넣을 설정 문자열 (설정이 바뀌면 프롬프트도 바뀌므로)"""
+        return f"ctx:p{self.precision}:b{self.token_budget}"
+
+    # --- 필드 압축 ---
+    def _compact_env(self, env: Dict[str, Any]) -> Dict[str, Any]:
+        env = _round(env or {}, self.precision)
+        out = _strip_defaults(env, ENV_DEFAULTS, self.precision)
+        wind = out.get("wind")
+        if isinstance(wind, dict) and float(wind.get("strength", 0.0) or 0.0) == 0.0:
+            out.pop("wind")  # 풍속 0이면 방향은 의미 없음
+        return out
+
+    def _compact_object(self, obj: Dict[str, Any]) -> Dict[str, Any]:
+        obj = _round(obj, self.precision)
+        init = _strip_defaults(obj.get("initial_state", {}) or {}, INITIAL_STATE_DEFAULTS, self.precision)
+        out = {k: v for k, v in obj.items() if k != "initial_state"}
+        out["initial_state"] = init
+        return out
+
+    # --- 관련 객체 선택 ---
+    @staticmethod
+    def relevant_ids(objects: List[Dict[str, Any]], user_text: str) -> List[str]:
+        """명령에서 id 또는 종류로 언급된 객체 id 목록 (원래 순서 유지)"""
+        text = user_text.lower()
+        ids = []
+        for o in objects:
+            oid = str(o.get("id", ""))
+            pattern = TYPE_PATTERNS.get(o.get("type", ""))
+            if (oid and oid.lower() in text) or (pattern is not None and pattern.search(text)):
+                ids.append(oid)
+        return ids
+
+    def _summary_line(self, objects: List[Dict[str, Any]]) -> str:
+        """상세 정보를 보내지 않은 객체들을 종류별 id + 대략적 위치로 요약"""
+        if not objects:
+            return ""
+        by_type: Dict[str, List[str]] = {}
+        for o in objects:
+            pos = (o.get("initial_state", {}) or {}).get("position", [])
+            pos_s = ",".join(f"{float(x):.1f}" for x in pos) if pos else "?"
+            by_type.setdefault(o.get("type", "?"), []).append(f"{o.get('id')}@({pos_s})")
+        parts = [f"{t} {len(ids)}개: {' '.join(ids)}" for t, ids in by_type.items()]
+        return "기타 객체(상세 생략, 변경 없으면 출력하지 않아도 됨) — " + "; ".join(parts)
+
+    def encode(self, world_state: Dict[str, Any], user_text: str) -> Tuple[str, Dict[str, int]]:
+        """압축된 컨텍스트 메시지와 토큰 보고서({"tokens", "baseline_tokens", "saved", ...})"""
+        objects = list(world_state.get("objects", []) or [])
+        # 언급된 객체가 없으면 ("그거 멈춰", "진공으로") 전부 예산 안에서 상세 전송
+        relevant = set(self.relevant_ids(objects, user_text))
+
+        head = "현재 월드 상태(생략된 필드는 기본값, 숫자는 반올림):\n"
+        tail = "\n\n이 상태를 바탕으로 다음 명령을 처리해주세요:"
+        env = self._compact_env(world_state.get("environment", {}))
+
+        # 객체별 토큰을 누적하며 예산 안에서 채움 (최소 한 개는 상세 전송)
+        used = estimate_tokens(head + json.dumps({"objects": [], "environment": env},
+                                                 ensure_ascii=False, separators=(",", ":")) + tail)
+        included, rest = [], []
+        for o in objects:
+            if relevant and o.get("id") not in relevant:
+                rest.append(o)
+                continue
+            compact = self._compact_object(o)
+            cost = estimate_tokens(json.dumps(compact, ensure_ascii=False, separators=(",", ":"))) + 1
+            if included and used + cost > self.token_budget:
+                rest.append(o)
+            else:
+                included.append(compact)
+                used += cost
+
+        body = json.dumps({"objects": included, "environment": env}, ensure_ascii=False,
+                          separators=(",", ":"))
+        summary = self._summary_line(rest)
+        message = head + body + (("\n" + summary) if summary else "") + tail
+
+        # 요약까지 예산을 넘으면 요약을 개수만으로 줄임
+        if summary and estimate_tokens(message) > self.token_budget:
+            summary = f"기타 객체 {len(rest)}개(상세 생략)"
+            message = head + body + "\n" + summary + tail
+
+        tokens = estimate_tokens(message)
+        baseline = estimate_tokens(full_context_message(world_state))
+        self.last_report = {
+            "tokens": tokens,
+            "baseline_tokens": baseline,
+            "saved": baseline - tokens,
+            "objects_sent": len(included),
+            "objects_summarized": len(rest),
+        }
+        self.total_saved += baseline - tokens
+        return message, self.last_report
@@ -0,0 +1,144 @@
+# src/ensemble.py
+"""헤드리스 앙상블 / 파라미터 스윕 실행기
+
+기본 World 하나에 파라미터 그리드와 시드 목록을 곱해 여러 시뮬레이션을 만들고,
+프로세스 풀(워커당 DIRECT PyBullet 연결 1개)로 나눠 돌린 뒤 최종 상태를 배열로 모은다.
+
+그리드 키는 world dict 안의 점(.) 경로이며, objects 구간은 객체 id로 찾는다.
+  - "environment.wind.strength": [0, 10, 50]
+  - "objects.ball_1.initial_state.mass": [0.5, 1.0, 2.0]
+  - "objects.ball_1.initial_state.speed": [5, 10]   # 속도 방향은 유지하고 크기만 변경
+"""
+import atexit
+import copy
+import itertools
+import multiprocessing as mp
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from .types import World
+
+DEFAULT_PERCENTILES = (5, 50, 95)
+
+_WORKER_CID = None  # 워커 프로세스별 DIRECT 연결
+
+
+# --- 파라미터 그리드 ---
+def expand_grid(grid: Optional[Dict[str, Sequence[Any]]]) -> List[Dict[str, Any]]:
+    """{"a": [1, 2], "b": [3]} → [{"a": 1, "b": 3}, {"a": 2, "b": 3}]"""
+    if not grid:
+        return [{}]
+    keys = list(grid)
+    return [dict(zip(keys, combo)) for combo in itertools.product(*(grid[k] for k in keys))]
+
+
+def apply_overrides(world: Dict[str, Any], overrides: Dict[str, Any]) -> Dict[str, Any]:
+    """점 경로 오버라이드를 적용한 world dict 사본을 반환"""
+    out = copy.deepcopy(world)
+    for path, value in overrides.items():
+        *parents, leaf = path.split(".")
+        node = out
+        i = 0
+        while i < len(parents):
+            key = parents[i]
+            if key == "objects" and i + 1 < len(parents):
+                obj_id = parents[i + 1]  # objects 다음 구간은 객체 id
+                node = next((o for o in node.get("objects", []) if o.get("id") == obj_id), None)
+                if node is None:
+                    raise KeyError(f"오버라이드 대상 객체가 없습니다: {obj_id} ({path})")
+                i += 2
+                continue
+            node = node.setdefault(key, {})
+            i += 1
+
+        if leaf == "speed":
+            # 속도 벡터의 방향은 유지하고 크기만 바꿈 (던지기 세기 스윕용)
+            v = np.asarray(node.get("velocity", [0.0, 0.0, 0.0]), dtype=float)
+            norm = float(np.linalg.norm(v))
+            direction = v / norm if norm > 1e-9 else np.array([1.0, 0.0, 0.0])
+            node["velocity"] = (direction * float(value)).tolist()
+        else:
+            node[leaf] = value
+    return out
+
+
+# --- 워커 ---
+def _init_worker():
+    """워커마다 DIRECT 연결을 하나 열어두고 모든 실행에서 재사용"""
+    global _WORKER_CID
+    import pybullet as p
+
+    _WORKER_CID = p.connect(p.DIRECT)
+    atexit.register(p.disconnect, _WORKER_CID)
+
+
+def _run_one(world_dict: Dict[str, Any], seed: Optional[int], object_ids: List[str]):
+    from .simulation import backend_for
+
+    world = World.model_validate(world_dict)
+    # 실행 간 재현성을 위해 장면은 매번 새로 구성 (이전 실행의 접촉 캐시 등이 남지 않도록)
+    # 2D 월드는 pymunk 백엔드 (연결 인자는 무시)
+    sim_out = backend_for(world)(world, show_gui=False, seed=seed, physics_client=_WORKER_CID,
+                                 persistent_scene=False)
+    final = {o["id"]: o["initial_state"] for o in sim_out["final_state"]["objects"]}
+    pos = np.array([final[i]["position"] for i in object_ids], dtype=float)
+    vel = np.array([final[i]["velocity"] for i in object_ids], dtype=float)
+    return pos, vel
+
+
+# --- 집계 ---
+def _stats(positions: np.ndarray, percentiles: Iterable[float]) -> Dict[str, Any]:
+    return {
+        "mean": positions.mean(axis=0),
+        "std": positions.std(axis=0),
+        "percentiles": {q: np.percentile(positions, q, axis=0) for q in percentiles},
+    }
+
+
+def run_ensemble(base_world: World, grid: Optional[Dict[str, Sequence[Any]]] = None,
+                 seeds: Optional[Sequence[Optional[int]]] = None, workers: Optional[int] = None,
+                 percentiles: Iterable[float] = DEFAULT_PERCENTILES) -> Dict[str, Any]:
+    """그리드 × 시드 조합을 프로세스 풀에서 실행하고 최종 상태를 배열로 집계
+
+    반환값:
+      - object_ids: 배열 두 번째 축의 객체 순서
+      - runs: 실행별 {"params", "seed"}
+      - positions / velocities: (실행 수, 객체 수, 3)
+      - mean / std / percentiles: 전체 실행에 대한 객체별 최종 위치 통계
+      - groups: 그리드 조합별 (시드들에 대한) 위치 통계
+    """
+    base = base_world.to_state()
+    object_ids = [o["id"] for o in base["objects"]]
+    combos = expand_grid(grid)
+    seeds = list(seeds) if seeds else [None]
+    percentiles = tuple(percentiles)
+
+    runs = [{"params": params, "seed": seed} for params in combos for seed in seeds]
+    worlds = [apply_overrides(base, r["params"]) for r in runs]
+    workers = max(1, min(workers or os.cpu_count() or 1, len(runs)))
+
+    # spawn: 부모 프로세스의 PyBullet 상태(GUI 연결 등)를 물려받지 않도록
+    ctx = mp.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=_init_worker) as pool:
+        results = list(pool.map(_run_one, worlds, [r["seed"] for r in runs],
+                                itertools.repeat(object_ids)))
+
+    positions = np.stack([r[0] for r in results]) if results else np.zeros((0, len(object_ids), 3))
+    velocities = np.stack([r[1] for r in results]) if results else np.zeros((0, len(object_ids), 3))
+
+    groups = []
+    for gi, params in enumerate(combos):
+        idx = slice(gi * len(seeds), (gi + 1) * len(seeds))
+        groups.append({"params": params, **_stats(positions[idx], percentiles)})
+
+    return {
+        "object_ids": object_ids,
+        "runs": runs,
+        "positions": positions,
+        "velocities": velocities,
+        **_stats(positions, percentiles),
+        "groups": groups,
+    }
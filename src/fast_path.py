@@ -0,0 +1,192 @@
+# src/fast_path.py
+"""단순 명령을 LLM 없이 바로 actions JSON으로 바꾸는 규칙 기반 fast path
+
+"공 앞으로 던져", "stop the box", "make it a vacuum", "drop the ball" 처럼
+map_action_to_physics의 throw / roll / stop / vacuum / drop 분기로 바로 가는 명령만 처리한다.
+의도가 하나로 정해지지 않거나, 부정문이거나, 대상 객체가 모호하거나 여럿이거나,
+객체 생성 같은 복잡한 명령이면 None을 돌려주고 호출 측이 LLM으로 넘긴다.
+"""
+import copy
+import re
+import time
+from typing import Any, Dict, List, Optional
+
+# --- 의도 (한국어/영어) ---
+INTENT_PATTERNS = {
+    "throw": re.compile(r"\b(throw|toss|hurl|launch)\b|던져|던지"),
+    "roll": re.compile(r"\broll\b|굴려|굴리"),
+    "stop": re.compile(r"\b(stop|halt|freeze)\b|멈춰|멈추|정지|세워"),
+    "vacuum": re.compile(r"\bvacuum\b|\bno air\b|remove (the )?air|진공|공기\s*(를|을)?\s*(없애|빼|제거)"),
+    "drop": re.compile(r"\b(drop|release|let go)\b|떨어뜨|떨궈|떨어트"),
+}
+
+# 객체 생성, 조건문, 질문 등은 LLM이 판단해야 함
+COMPLEX_PATTERN = re.compile(
+    r"\b(add|create|new|spawn|make (a|an|another)|delete|if|when|then)\b"
+    r"|추가|생성|만들어|새로운|삭제|만약|그리고|다음에|\?"
+)
+
+# 부정("던지지 마", "don't throw")은 의도를 뒤집으므로 LLM이 판단
+NEGATION_PATTERN = re.compile(
+    r"\b(don'?t|do not|doesn'?t|never|not|without)\b|n't\b"
+    r"|지\s*(마|말)|하지\s*않|(^|\s)(안|못)\s"
+)
+
+# 여러 객체를 한꺼번에 가리키는 말 ("drop everything", "모두 멈춰")
+MULTI_PATTERN = re.compile(r"\b(all|every(thing|one)?|each|both|them)\b|모든|전부|모두|다들|(^|\s)다\s")
+
+# --- 방향 ---
+DIRECTION_PATTERNS = [
+    (re.compile(r"\bforward\b|\bahead\b|앞"), [1.0, 0.0, 0.0]),
+    (re.compile(r"\bback(ward)?s?\b|뒤"), [-1.0, 0.0, 0.0]),
+    (re.compile(r"\bleft\b|왼"), [0.0, 1.0, 0.0]),
+    (re.compile(r"\bright\b|오른"), [0.0, -1.0, 0.0]),
+    (re.compile(r"\bup(ward)?s?\b|위로|위쪽"), [0.0, 0.0, 1.0]),
+    (re.compile(r"\bdown(ward)?s?\b|아래"), [0.0, 0.0, -1.0]),
+]
+
+# --- 세기 ---
+MAGNITUDE_PATTERNS = [
+    (re.compile(r"very hard|as hard as|아주 세게|엄청 세게|힘껏|최대한"), 3.0),
+    (re.compile(r"\bhard(er)?\b|strong(ly)?|fast|세게|강하게|빠르게"), 2.0),
+    (re.compile(r"gent(ly|le)|soft(ly)?|light(ly)?|slow(ly)?|살살|약하게|살짝|천천히"), 0.5),
+]
+NUMBER_MAGNITUDE = re.compile(r"(\d+(?:\.\d+)?)\s*(배|x\b|times\b)")
+
+# --- 대상 지칭 ---
+TYPE_PATTERNS = {
+    "ball": re.compile(r"\b(ball|sphere)s?\b|공(?!기)"),
+    "box": re.compile(r"\b(box|cube)(es|s)?\b|상자|박스"),
+    "table": re.compile(r"\btables?\b|테이블|탁자"),
+}
+
+DEFAULT_DIRECTION = {"throw": [1.0, 0.0, 0.0], "roll": [1.0, 0.0, 0.0]}
+MAX_TEXT_LENGTH = 80
+
+
+class FastPathMatcher:
+    """현재 월드 상태를 보고 단순 명령을 직접 actions JSON으로 변환
+
+    match()가 dict를 반환하면 LLM 응답과 같은 모양의 world draft (objects / environment / actions),
+    None이면 확신이 없다는 뜻이다.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.hit_seconds = 0.0
+        self.last_target: Optional[str] = None
+
+    # --- 해석 ---
+    @staticmethod
+    def _intent(text: str) -> Optional[str]:
+        found = [name for name, pat in INTENT_PATTERNS.items() if pat.search(text)]
+        return found[0] if len(found) == 1 else None
+
+    @staticmethod
+    def _direction(text: str, intent: str) -> Optional[List[float]]:
+        vec = [0.0, 0.0, 0.0]
+        hit = False
+        for pat, d in DIRECTION_PATTERNS:
+            if pat.search(text):
+                vec = [a + b for a, b in zip(vec, d)]
+                hit = True
+        if not hit:
+            return DEFAULT_DIRECTION.get(intent, [0.0, 0.0, 0.0])
+        norm = sum(v * v for v in vec) ** 0.5
+        return [v / norm for v in vec] if norm > 0 else None  # "앞뒤로" 같은 상쇄는 모호
+
+    @staticmethod
+    def _magnitude(text: str) -> float:
+        m = NUMBER_MAGNITUDE.search(text)
+        if m:
+            return float(m.group(1))
+        for pat, mag in MAGNITUDE_PATTERNS:
+            if pat.search(text):
+                return mag
+        return 1.0
+
+    def _target(self, text: str, objects: List[Dict[str, Any]]) -> Optional[str]:
+        movable = [o for o in objects if o.get("type") != "plane" and "id" in o]
+
+        # 1) id를 직접 언급 (영숫자 경계로 비교: id "b"가 "ball" 안에서 잡히지 않도록, 한국어 조사는 허용)
+        named, rest = [], text
+        for o in movable:
+            pat = re.compile(r"(?<![a-z0-9_])" + re.escape(str(o["id"]).lower()) + r"(?![a-z0-9_])")
+            if pat.search(rest):
+                named.append(o["id"])
+                rest = pat.sub(" ", rest)
+        kinds = [obj_type for obj_type, pat in TYPE_PATTERNS.items() if pat.search(rest)]
+
+        # 여러 객체를 가리키면 ("공을 상자에 던져", "drop everything") 확신할 수 없음
+        if MULTI_PATTERN.search(text) or len(named) + len(kinds) > 1:
+            return None
+        if named:
+            return named[0]
+
+        # 2) 종류로 언급 → 그 종류가 하나뿐일 때만 확신
+        if kinds:
+            obj_type = kinds[0]
+            same = [o["id"] for o in movable if o.get("type") == obj_type or
+                    (obj_type == "ball" and o.get("type") == "sphere")]
+            if len(same) == 1:
+                return same[0]
+            if self.last_target in same:
+                return self.last_target  # 여러 개면 직전에 다룬 것
+            return None
+
+        # 3) 대명사("그거", "it") 또는 생략 → 직전 대상, 없으면 움직일 객체가 하나뿐일 때
+        ids = [o["id"] for o in movable]
+        if self.last_target in ids:
+            return self.last_target
+        return ids[0] if len(ids) == 1 else None
+
+    def match(self, user_text: str, world_state: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        t0 = time.perf_counter()
+        draft = self._match(user_text, world_state or {})
+        if draft is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.hit_seconds += time.perf_counter() - t0
+        return draft
+
+    def _match(self, user_text: str, world_state: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        text = user_text.strip().lower()
+        if not text or len(text) > MAX_TEXT_LENGTH or COMPLEX_PATTERN.search(text):
+            return None
+        intent = self._intent(text)
+        if intent is None or NEGATION_PATTERN.search(text):
+            return None
+
+        objects = world_state.get("objects", []) or []
+        environment = copy.deepcopy(world_state.get("environment", {}) or {})
+        action: Dict[str, Any] = {"type": intent}
+        touched: List[Dict[str, Any]] = []  # 메모리는 id 기준 병합이므로 바뀌는 객체만 돌려줌
+
+        if intent == "vacuum":
+            # map_action_to_physics의 vacuum 분기(_env_update)와 동일한 값
+            environment.update({"air_density": 0.0, "drag_coefficient": 0.0,
+                                "wind": {"direction": [0.0, 0.0, 0.0], "strength": 0.0}})
+        else:
+            target = self._target(text, objects)
+            direction = self._direction(text, intent)
+            if target is None or direction is None:
+                return None
+            if str(environment.get("dimensions", "3D")).upper() == "2D":
+                # 2D(옆에서 본 x–z 평면)에는 y축이 없으므로 왼쪽/오른쪽은 -x/+x
+                direction = [direction[0] - direction[1], 0.0, direction[2]]
+            action.update({"target_id": target, "direction": direction, "magnitude": self._magnitude(text)})
+            touched = [copy.deepcopy(next(o for o in objects if o.get("id") == target))]
+            self.last_target = target
+
+        return {"objects": touched, "environment": environment, "actions": [action]}
+
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / total) if total else 0.0,
+            "mean_hit_ms": (self.hit_seconds / self.hits * 1000.0) if self.hits else 0.0,
+        }
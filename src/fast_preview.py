@@ -0,0 +1,443 @@
+# src/fast_preview.py
+"""공만 있는 단순 탄도 장면용 NumPy 미리보기 (PyBullet 없이)
+
+run_simulation_pybullet 과 같은 힘 모델을 공마다 구간(비행 → 충돌 → 미끄러짐/구름 → 정지)으로 나눠 적분한다.
+  - 힘: 중력 + 공기저항 F = -0.5 * rho * Cd * A * |v - wind| * (v - wind)  (AeroStage와 동일)
+    + PyBullet(btMultiBody) 기본 감쇠 a = -k v (1 + |v|), α = -k ω (1 + |ω|), k = 0.04
+    AeroStage는 힘을 월드 원점([0,0,0], WORLD_FRAME)에 가하므로 토크 τ = -p × F 도 생긴다
+    → 공중 스핀과 구르는 공의 추진력에 그대로 반영. 선속도/각속도는 성분별로 ±100에서 잘림
+  - 자유 비행: PyBullet 한 스텝(스텝 시작 속도로 a → v += a dt → x += v dt)을 따라가는 연속 방정식
+    v̇ = a(v - ½dt·a(v)), ẋ = v + ½dt·v̇ 를 큰 간격(최대 MAX_MACRO_STEP)의 RK4로 적분한다.
+    스텝을 하나씩 밟지 않고도 PyBullet 궤적과 mm 단위로 맞고, 바닥(z = r)에 닿는 시각은
+    간격 양 끝의 위치/속도로 만든 3차 Hermite 보간에서 찾는다
+  - 충돌: 수직 속도를 반발 계수로 뒤집고(너무 느리면 착지), 접선 충격량은 쿨롱 한계(μ·법선 충격량)
+    안에서 미끄러짐을 줄이고, 구름 마찰도 법선 충격량만큼 한 번에 작용
+  - 바닥: 미끄러지는 동안과 멈추기 직전만 기본 스텝(dt)으로 적분하고 (접촉 상태가 바뀌는 구간),
+    구르는 동안은 수평 힘의 5/7 (구의 관성) + 구름 마찰/감쇠 감속을 다시 큰 간격 RK4로 적분
+  - 공끼리 근접은 적분이 끝난 뒤 모든 공의 궤적을 공통 시각 격자에서 한꺼번에 보간해 검사
+
+대상 조건(qualifies): 공(ball)과 바닥(plane)만 있고, 난류(풍향 0 + 풍속 > 0)가 없고,
+질량이 모두 양수. 공끼리 반지름 합 + margin 보다 가까워지면 PreviewFallback을 올려
+호출한 쪽이 PyBullet으로 다시 돌리게 한다.
+접촉 상수(GROUND_*, REST_BOUNCE_SPEED)는 scene.py의 바닥/공 설정과 PyBullet 실측으로 맞춘 값이다.
+PyBullet의 접촉 풀이(침투 보정)는 충돌이 스텝 안 어디서 일어났는지에 따라 달라서, 튄 뒤의 위치는
+비행 구간만큼 정확하지 않다 (verify_preview로 장면별 오차를 확인).
+"""
+import math
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from .types import World
+
+GROUND_BOUNCE = 0.33          # 바닥 반발: 물체 반발 계수 × 약 0.33 (plane 0.3과의 조합, PyBullet 실측)
+GROUND_FRICTION = 0.8         # scene의 plane lateralFriction (공 마찰과 곱으로 조합)
+REST_BOUNCE_SPEED = 0.2       # 튀어 오를 속도가 이보다 작으면 착지로 처리 [m/s]
+GROUND_TOL = 1e-3             # 시작 높이가 바닥에서 이 안이면 바닥에 놓인 것으로 봄 [m]
+DEFAULT_ROLLING_FRICTION = 0.01
+DAMPING = 0.04                # PyBullet 기본 linearDamping = angularDamping (btMultiBody: 1차 + 2차 항)
+MAX_SPEED = 100.0             # btMultiBody maxCoordinateVelocity: 선속도/각속도 성분별 상한
+MAX_MACRO_STEP = 0.25         # 매끄러운 구간(비행/구름)을 한 번에 적분하는 최대 시간 [s]
+STIFF_STEP = 0.5              # 간격 × (감속의 속도 미분) 상한 — RK4가 정확한 범위
+PAIR_CHECK_HORIZON = 25       # 근접 검사 격자의 최대 간격 [스텝]
+
+
+class PreviewFallback(Exception):
+    """미리보기 모델로 다룰 수 없는 상황 (공끼리 근접 등) → PyBullet으로 다시 실행"""
+
+
+def qualifies(world: World) -> Tuple[bool, str]:
+    """미리보기로 돌릴 수 있는 World인지 (가능 여부, 불가 사유)"""
+    balls = 0
+    for obj in world.objects:
+        if obj.type == "plane":
+            continue
+        if obj.type != "ball":
+            return False, f"공이 아닌 객체: {obj.id} ({obj.type})"
+        if obj.initial_state.mass <= 0:
+            return False, f"정적(질량 0) 객체: {obj.id}"
+        balls += 1
+    if balls == 0:
+        return False, "움직일 공이 없음"
+    wind = world.environment.wind
+    if abs(sum(abs(d) for d in wind.direction)) < 1e-5 and wind.strength > 0:
+        return False, "난류(풍향 0 + 풍속 > 0)는 무작위라 미리보기 불가"
+    return True, ""
+
+
+def _quat_from_rotvec(theta: np.ndarray) -> np.ndarray:
+    angle = np.linalg.norm(theta, axis=-1, keepdims=True)
+    half = 0.5 * angle
+    scale = np.where(angle > 1e-12, np.sin(half) / np.maximum(angle, 1e-12), 0.5)
+    return np.concatenate([theta * scale, np.cos(half)], axis=-1)  # (x, y, z, w)
+
+
+def _quat_mul(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    ax, ay, az, aw = np.moveaxis(a, -1, 0)
+    bx, by, bz, bw = np.moveaxis(b, -1, 0)
+    return np.stack([
+        aw * bx + ax * bw + ay * bz - az * by,
+        aw * by - ax * bz + ay * bw + az * bx,
+        aw * bz + ax * by - ay * bx + az * bw,
+        aw * bw - ax * bx - ay * by - az * bz,
+    ], axis=-1)
+
+
+def _cross(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """3차원 벡터 외적 (np.cross는 작은 배열에서 축 처리 비용이 큼)"""
+    return np.array([a[1] * b[2] - a[2] * b[1], a[2] * b[0] - a[0] * b[2], a[0] * b[1] - a[1] * b[0]])
+
+
+def _roll_decel(sp: float, r: float, friction: float) -> float:
+    """구르는 공의 감속 [m/s²]: 구름 마찰 + 감쇠
+    감쇠 = [선속도 m v k(1+v) + 각속도 (I/r) ω k(1+ω)] / (7/5 m),  ω = v / r
+    """
+    return friction + DAMPING * sp * ((1.0 + sp) + 0.4 * (1.0 + sp / r)) / 1.4
+
+
+def _hermite(p0, m0, p1, m1, s, h):
+    """구간 [0, h]의 3차 Hermite 보간 (양 끝 값 p, 변화율 m), s = 구간 안 위치 비율"""
+    s2, s3 = s * s, s * s * s
+    return ((2 * s3 - 3 * s2 + 1) * p0 + (s3 - 2 * s2 + s) * h * m0
+            + (-2 * s3 + 3 * s2) * p1 + (s3 - s2) * h * m1)
+
+
+def _hermite_root(p0: float, m0: float, p1: float, m1: float, h: float) -> float:
+    """p0 > 0 ≥ p1 인 구간에서 Hermite 곡선이 처음 0이 되는 위치 비율 (이분법)"""
+    lo, hi = 0.0, 1.0
+    for _ in range(30):
+        mid = 0.5 * (lo + hi)
+        if _hermite(p0, m0, p1, m1, mid, h) > 0.0:
+            lo = mid
+        else:
+            hi = mid
+    return hi
+
+
+class _Ball:
+    """공 하나를 구간별로 적분하며 노드(시각, 위치, 위치 변화율, 속도, 각속도, 누적 회전)를 쌓는다"""
+
+    def __init__(self, obj, g: np.ndarray, wind_v: np.ndarray, k_air: float, dt: float):
+        s = obj.initial_state
+        self.r = r = max(math.sqrt(obj.cross_section / math.pi), 1e-6)
+        self.k_drag = k_air * obj.cross_section / s.mass  # 항력 가속도 계수
+        self.bounce = obj.restitution * GROUND_BOUNCE
+        self.mu = obj.friction * GROUND_FRICTION
+        # PyBullet 조합 구름 마찰: 공 구름마찰 × 바닥 마찰 (+ 공 마찰 × 바닥 구름마찰 0)
+        c_roll = (DEFAULT_ROLLING_FRICTION if obj.rolling_friction is None else obj.rolling_friction) * GROUND_FRICTION
+        self.g, self.wind_v, self.dt = g, wind_v, dt
+        self.g_n = -min(g[2], 0.0)  # 바닥을 누르는 중력 가속도
+        self.roll_k = c_roll / (1.4 * r)  # 구름 마찰: τ = c·N, I = 2/5 m r² → 감속 = c·(N/m) / (7/5 r)
+        self.roll_friction = self.roll_k * self.g_n
+        self.slide_step = 3.5 * self.mu * self.g_n * dt  # 한 스텝 운동 마찰이 줄일 수 있는 미끄러짐 속도
+        self.inv_inertia = 1.0 / (0.4 * r * r)  # 질량당 관성 모멘트의 역수 (I = 2/5 m r²)
+
+        self.x = np.array(s.position, dtype=float)
+        self.v = np.clip(np.array(s.velocity, dtype=float), -MAX_SPEED, MAX_SPEED)
+        self.w = np.zeros(3)
+        # 각속도: 지정 안 됐으면 scene과 같이 x 방향 구름 스핀 [0, vx/r, 0]
+        if s.angular_velocity is not None:
+            self.w = np.clip(np.array(s.angular_velocity, dtype=float), -MAX_SPEED, MAX_SPEED)
+        elif np.abs(self.v).sum() > 1e-6:
+            self.w[1] = self.v[0] / r
+        self.th = np.zeros(3)  # 누적 회전 벡터 (자세 계산용)
+        self.t = 0.0
+
+        self.x[2] = max(self.x[2], r)  # 바닥 아래에서 시작하면 바닥 위로 (PyBullet도 밀어 올림)
+        self.on_ground = self.x[2] <= r + GROUND_TOL and self.v[2] <= 1e-9  # 바닥에서 위로 던진 공은 공중
+        if self.on_ground:
+            self.x[2], self.v[2] = r, 0.0
+        self.first_impact = None
+        self.bounces = 0
+        self.rest_time = None
+        self.nodes: List[tuple] = []
+        self._rate = None if self.on_ground else self._air_rate(self.v)
+        self._node(self.v if self.on_ground else self._rate[0])
+
+    # --- 힘 ---
+    def _drag(self, v: np.ndarray) -> np.ndarray:
+        """공기저항 가속도 -k |v - wind| (v - wind)"""
+        u = v - self.wind_v
+        return -self.k_drag * math.sqrt(u @ u) * u
+
+    def _air_acc(self, v: np.ndarray) -> np.ndarray:
+        """PyBullet 한 스텝의 가속도 (스텝 시작 속도 기준): 중력 + 항력 + 감쇠"""
+        return self.g + self._drag(v) - DAMPING * (1.0 + math.sqrt(v @ v)) * v
+
+    def _air_rate(self, v: np.ndarray):
+        """(ẋ, v̇): 스텝 dt의 v += a dt → x += v dt 를 dt 1차까지 따라가는 연속 방정식"""
+        a = self._air_acc(v - 0.5 * self.dt * self._air_acc(v))
+        return v + 0.5 * self.dt * a, a
+
+    def _push(self, x: np.ndarray, v: np.ndarray) -> np.ndarray:
+        """바닥의 공을 미는 수평 가속도: 중력/항력의 수평 성분 + 원점에 가한 항력의 토크 / r"""
+        a_drag = self._drag(v)
+        tau = _cross(a_drag, x)  # 질량당 토크 -p × a
+        return np.array([self.g[0] + a_drag[0] + tau[1] / self.r,
+                         self.g[1] + a_drag[1] - tau[0] / self.r, 0.0])
+
+    def _roll_rate(self, x: np.ndarray, v: np.ndarray):
+        """구르는 공의 (ẋ, v̇): 미는 힘의 5/7 + 구름 마찰/감쇠 감속 (속도 반대 방향)"""
+        sp = math.sqrt(v @ v)
+        return v, self._push(x, v) * (5.0 / 7.0) - v * (_roll_decel(sp, self.r, self.roll_friction) / max(sp, 1e-12))
+
+    def _slip(self) -> np.ndarray:
+        """바닥 접촉점의 수평 미끄러짐 속도 v + ω × (-r z)"""
+        return np.array([self.v[0] - self.r * self.w[1], self.v[1] + self.r * self.w[0]])
+
+    def _apply_friction(self, slip: np.ndarray, dv: float):
+        """미끄러짐 반대 방향 접선 충격량(질량당 dv)을 주고 그만큼 스핀을 더함"""
+        d = slip * (dv / max(math.sqrt(slip @ slip), 1e-12))
+        self.v[:2] -= d
+        spin = 2.5 / self.r  # 접선 충격량이 만드는 각속도 변화: J r / I = 5/2 · dv / r
+        self.w[1] += spin * d[0]
+        self.w[0] -= spin * d[1]
+
+    def _node(self, xdot: np.ndarray):
+        self.nodes.append((self.t, self.x.copy(), np.array(xdot, dtype=float), self.v.copy(),
+                           self.w.copy(), self.th.copy()))
+
+    # --- 구간별 적분 ---
+    def run(self, t_end: float):
+        while self.t < t_end - 1e-9 and self.rest_time is None:
+            if self.on_ground:
+                self._ground(t_end)
+            else:
+                self._fly(t_end)
+        if self.rest_time is not None:
+            self.t = t_end
+            self._node(np.zeros(3))
+
+    def _fly(self, t_end: float):
+        """비행 RK4 한 간격. 간격 안에서 바닥에 닿으면 그 시각까지만 진행하고 충돌 처리"""
+        x0, v0, w0 = self.x, self.v, self.w
+        k1x, k1v = self._rate
+        u = v0 - self.wind_v
+        stiff = 2.0 * self.k_drag * math.sqrt(u @ u) + DAMPING * (1.0 + 2.0 * math.sqrt(v0 @ v0))
+        h = min(MAX_MACRO_STEP, STIFF_STEP / stiff, t_end - self.t)
+        k2x, k2v = self._air_rate(v0 + 0.5 * h * k1v)
+        k3x, k3v = self._air_rate(v0 + 0.5 * h * k2v)
+        k4x, k4v = self._air_rate(v0 + h * k3v)
+        x1 = x0 + (h / 6.0) * (k1x + 2.0 * (k2x + k3x) + k4x)
+        v1 = np.clip(v0 + (h / 6.0) * (k1v + 2.0 * (k2v + k3v) + k4v), -MAX_SPEED, MAX_SPEED)
+        rate1 = self._air_rate(v1)
+        hit = x1[2] < self.r
+        if hit:
+            s = _hermite_root(x0[2] - self.r, k1x[2], x1[2] - self.r, rate1[0][2], h)
+            x1 = _hermite(x0, k1x, x1, rate1[0], s, h)
+            v1 = _hermite(v0, k1v, v1, rate1[1], s, h)
+            h *= s
+            rate1 = self._air_rate(v1)
+
+        # 스핀 (자세와 착지 미끄러짐에만 쓰임): 구간 중간의 항력 토크 + 감쇠 (큰 간격에서도 안정하게 암시적으로)
+        alpha = _cross(self._drag(0.5 * (v0 + v1)), 0.5 * (x0 + x1)) * self.inv_inertia
+        w1 = (w0 + h * alpha) / (1.0 + h * DAMPING * (1.0 + math.sqrt(w0 @ w0)))
+        self.w = np.clip(w1, -MAX_SPEED, MAX_SPEED)
+        self.th = self.th + (0.5 * h) * (w0 + self.w)
+        self.x, self.v, self._rate = x1, v1, rate1
+        self.t += h
+        self._node(rate1[0])
+        if hit:
+            self._impact()
+
+    def _impact(self):
+        """바닥 충돌 충격량 (z = r에 맞추고 튀거나 착지)"""
+        if self.first_impact is None:
+            self.first_impact = self.t
+        v = self.v = self.v.copy()
+        self.w = self.w.copy()
+        self.x = self.x.copy()
+        self.x[2] = self.r
+        vz_in = max(-v[2], 0.0)
+        vz_out = vz_in * self.bounce
+        landed = vz_out < REST_BOUNCE_SPEED
+        if landed:
+            vz_out = 0.0
+        jn = vz_in + vz_out  # 질량당 법선 충격량
+
+        # 접선: 쿨롱 한계 안에서 미끄러짐 제거 (완전히 구르게 하는 데 필요한 양은 2/7 · 미끄러짐)
+        slip = self._slip()
+        self._apply_friction(slip, min(2.0 / 7.0 * math.sqrt(slip @ slip), self.mu * jn))
+        # 구름 마찰 충격량: 수평 속도와 스핀을 같은 비율로 줄임
+        keep = min(max(1.0 - self.roll_k * jn / max(math.hypot(v[0], v[1]), 1e-12), 0.0), 1.0)
+        v[:2] *= keep
+        self.w *= keep
+
+        v[2] = vz_out
+        if landed:
+            self.on_ground = True
+            self._node(v)
+        else:
+            self.bounces += 1
+            self._rate = self._air_rate(v)
+            self._node(self._rate[0])
+
+    def _ground(self, t_end: float):
+        """바닥 구간: 미끄러지거나 멈추기 직전이면 기본 스텝 하나, 아니면 구름 RK4 한 간격"""
+        slip = self._slip()
+        if math.sqrt(slip @ slip) > self.slide_step:
+            self._ground_step(slip)
+            return
+        x0, v0 = self.x, self.v
+        sp = math.sqrt(v0 @ v0)
+        push = self._push(x0, v0)
+        decel = max(_roll_decel(sp, self.r, self.roll_friction), math.sqrt(push @ push))
+        u = v0 - self.wind_v
+        stiff = 2.0 * self.k_drag * math.sqrt(u @ u) + DAMPING * (1.0 + 2.0 * sp) * (1.0 + 0.4 / self.r)
+        h = min(MAX_MACRO_STEP, STIFF_STEP / stiff, 0.5 * sp / max(decel, 1e-12), t_end - self.t)
+        if h < 2.0 * self.dt:
+            self._ground_step(None)
+            return
+        k1x, k1v = self._roll_rate(x0, v0)
+        k2x, k2v = self._roll_rate(x0 + 0.5 * h * k1x, v0 + 0.5 * h * k1v)
+        k3x, k3v = self._roll_rate(x0 + 0.5 * h * k2x, v0 + 0.5 * h * k2v)
+        k4x, k4v = self._roll_rate(x0 + h * k3x, v0 + h * k3v)
+        self.x = x0 + (h / 6.0) * (k1x + 2.0 * (k2x + k3x) + k4x)
+        self.v = v1 = v0 + (h / 6.0) * (k1v + 2.0 * (k2v + k3v) + k4v)
+        self._roll_spin(h)
+        self.t += h
+        self._node(v1)
+
+    def _roll_spin(self, h: float):
+        """구르는 공의 스핀: ω = v / r (접촉점 미끄러짐 0) + 수직축 스핀 감쇠"""
+        w0 = self.w
+        self.w = np.array([-self.v[1] / self.r, self.v[0] / self.r, w0[2] * (1.0 - DAMPING * self.dt) ** (h / self.dt)])
+        self.th = self.th + (0.5 * h) * (w0 + self.w)
+
+    def _ground_step(self, slip):
+        """바닥의 공 기본 스텝 하나 (slip이 있으면 미끄러짐, 없으면 구름). 멈췄으면 정지 처리"""
+        dt, r = self.dt, self.r
+        v = self.v = self.v.copy()
+        if slip is not None:
+            # 미끄러지는 공: 수평 힘 그대로 + 운동 마찰 μ g (미끄러짐 반대) → 스핀 증가, 감쇠는 스텝 시작 속도로
+            a_drag = self._drag(v)
+            alpha = _cross(a_drag, self.x) * self.inv_inertia
+            damp_v = 1.0 - dt * DAMPING * (1.0 + math.sqrt(v @ v))
+            damp_w = 1.0 - dt * DAMPING * (1.0 + math.sqrt(self.w @ self.w))
+            v[:2] = v[:2] * damp_v + (self.g[:2] + a_drag[:2]) * dt
+            self.w = self.w * damp_w + alpha * dt
+            self._apply_friction(slip, self.mu * self.g_n * dt)
+        else:
+            # 구르는 공: (수평 힘 + 토크/r)의 5/7 + 구름 마찰 + 감쇠 (속도를 넘어서 반대로 가지는 않음)
+            v_h = v[:2] + self._push(self.x, v)[:2] * (5.0 / 7.0) * dt
+            sp = math.hypot(v_h[0], v_h[1])
+            dec = _roll_decel(sp, r, self.roll_friction) * dt
+            v[:2] = v_h * (1.0 - dec / sp) if sp > dec else 0.0
+            self.w = np.array([-v[1] / r, v[0] / r, self.w[2] * (1.0 - DAMPING * dt)])
+        v[2] = 0.0
+        self.x = self.x + v * dt
+        self.th = self.th + self.w * dt
+        self.t += dt
+        self._node(v)
+
+        # 멈췄고 제자리에서 미는 힘이 구름 마찰을 못 넘으면 끝까지 정지
+        if slip is None and not v.any():
+            push = self._push(self.x, v)
+            if math.sqrt(push @ push) * (5.0 / 7.0) <= self.roll_friction:
+                self.w = np.zeros(3)
+                self.rest_time = self.t
+                self.nodes[-1] = self.nodes[-1][:4] + (self.w.copy(), self.th.copy())
+
+    def arrays(self):
+        """노드 배열 (t, x, ẋ, v, ω, θ)"""
+        return [np.array(col) for col in zip(*self.nodes)]
+
+
+def _sample(paths, times: np.ndarray):
+    """모든 공의 궤적을 시각 배열에서 보간 → 위치, 속도, 누적 회전 (시각, 공, 3)"""
+    pos, vel, rot = [], [], []
+    for t, x, xd, v, w, th in paths:
+        i = np.clip(np.searchsorted(t, times, side="right") - 1, 0, len(t) - 2)
+        h = t[i + 1] - t[i]
+        s = np.clip(np.where(h > 0, (times - t[i]) / np.where(h > 0, h, 1.0), 1.0), 0.0, 1.0)[:, None]
+        pos.append(_hermite(x[i], xd[i], x[i + 1], xd[i + 1], s, h[:, None]))
+        vel.append(v[i] + (v[i + 1] - v[i]) * s)
+        rot.append(_hermite(th[i], w[i], th[i + 1], w[i + 1], s, h[:, None]))
+    return np.stack(pos, axis=1), np.stack(vel, axis=1), np.stack(rot, axis=1)
+
+
+def run_preview(world: World, trajectory_decimation: int = 0, trajectory_path=None,
+                proximity_margin: float = 0.05) -> Dict[str, Any]:
+    """World를 미리보기로 적분하고 run_simulation_pybullet과 같은 모양의 결과를 반환
+
+    world의 객체 상태(위치/자세/속도/각속도)는 결과로 제자리에서 갱신된다.
+    공끼리 가까워지면 PreviewFallback (world는 건드리지 않은 상태).
+    """
+    env = world.environment
+    objs = [o for o in world.objects if o.type == "ball"]
+
+    dt = env.time_step
+    steps = int(env.duration / dt)
+    end_time = steps * dt
+
+    g = np.asarray(env.gravity, dtype=float)
+    wind_v = np.asarray(env.wind.direction, dtype=float) * env.wind.strength
+    k_air = 0.5 * env.air_density * env.drag_coefficient
+    pushes_on_ground = bool(np.abs(g[:2]).max() > 1e-9 or (k_air > 0 and np.abs(wind_v[:2]).max() > 1e-9))
+
+    balls = [_Ball(o, g, wind_v, k_air, dt) for o in objs]
+    for b in balls:
+        b.run(end_time)
+    paths = [b.arrays() for b in balls]
+
+    # --- 공끼리 근접 → PyBullet으로 ---
+    # 가장 빠른 두 공이 마주 달려도 격자 한 칸 동안 margin의 절반 이상 못 좁히는 간격으로 한꺼번에 검사
+    if len(balls) > 1:
+        v_max = max(float(np.abs(p[3]).max()) for p in paths) * math.sqrt(3.0)
+        every = int(np.clip(proximity_margin / (4.0 * v_max * dt + 1e-12), 1, PAIR_CHECK_HORIZON))
+        grid = np.arange(0, steps + 1, every) * dt
+        pos, _, _ = _sample(paths, grid)
+        r = np.array([b.r for b in balls])
+        d = pos[:, :, None, :] - pos[:, None, :, :]
+        gap = np.sqrt(np.einsum("tijk,tijk->tij", d, d)) - (r[:, None] + r[None, :] + proximity_margin)
+        gap[:, np.arange(len(balls)), np.arange(len(balls))] = np.inf
+        close = np.flatnonzero((gap < 0).any(axis=(1, 2)))
+        if len(close):
+            raise PreviewFallback(f"공끼리 근접 (t={grid[close[0]]:.2f}s)")
+
+    # --- 모두 멈췄고 밀어 줄 힘이 없으면 그 뒤 스텝은 생략한 것으로 ---
+    steps_simulated = steps
+    if not pushes_on_ground and all(b.rest_time is not None for b in balls):
+        steps_simulated = min(steps, int(math.ceil(max(b.rest_time for b in balls) / dt - 1e-9)))
+
+    q0 = np.array([o.initial_state.orientation for o in objs], dtype=float)
+    trajectory = None
+    if trajectory_decimation and trajectory_decimation > 0:
+        from .trajectory import TrajectoryRecorder
+        recorder = TrajectoryRecorder([o.id for o in objs], [b.r for b in balls], decimation=trajectory_decimation)
+        rec_steps = np.arange(0, steps_simulated + 1, recorder.decimation)
+        if rec_steps[-1] != steps_simulated:
+            rec_steps = np.append(rec_steps, steps_simulated)
+        pos, vel, rot = _sample(paths, rec_steps * dt)
+        orn = _quat_mul(_quat_from_rotvec(rot), q0[None])
+        for k, step in enumerate(rec_steps[:-1]):
+            if recorder.due(int(step)):
+                recorder.record(int(step), float(step * dt), pos[k], orn[k], vel[k])
+        recorder.finish(steps_simulated, steps_simulated * dt, pos[-1], orn[-1], vel[-1])
+        if trajectory_path:
+            recorder.save(trajectory_path)
+        trajectory = recorder.to_dict()
+
+    # ✅ 최종 상태 저장 (run_simulation_pybullet과 같이 World를 제자리에서 갱신)
+    orn = _quat_mul(_quat_from_rotvec(np.array([b.th for b in balls])), q0)
+    for i, (obj, b) in enumerate(zip(objs, balls)):
+        state = obj.initial_state
+        state.position, state.orientation = b.x.tolist(), orn[i].tolist()
+        state.velocity, state.angular_velocity = b.v.tolist(), b.w.tolist()
+
+    return {
+        "final_state": world.to_state(),
+        "world": world,
+        "scene_stats": None,
+        "steps_simulated": steps_simulated,
+        "sim_time": end_time,  # 일찍 멈췄어도 상태는 끝까지 그대로
+        "stopped_at_rest": False,
+        "trajectory": trajectory,
+        "contacts": None,
+        "physics_client": None,
+        "engine": "preview",
+        "preview": {
+            "first_impact": {o.id: b.first_impact for o, b in zip(objs, balls)},
+            "bounces": {o.id: b.bounces for o, b in zip(objs, balls)},
+        },
+    }
@@ -0,0 +1,124 @@
+# src/llm_cache.py
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional
+
+
+class CacheMiss(LookupError):
+    """replay(읽기 전용) 모드에서 캐시에 없는 요청이 들어온 경우"""
+
+
+def canonical_world(world_state: Optional[Dict]) -> str:
+    """actions를 뺀 world_state를 키 순서/공백에 무관한 문자열로 정규화"""
+    if not world_state:
+        return ""
+    state = {k: v for k, v in world_state.items() if k != "actions"}
+    return json.dumps(state, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+
+
+class LLMResponseCache:
+    """LLM 응답을 디스크에 저장하는 내용 주소(content-addressed) 캐시
+
+    키는 (SYSTEM_PROMPT, 정규화된 world_state, 사용자 입력, 모델, temperature)의 SHA-256.
+    - 항목마다 <cache_dir>/<키 앞 2글자>/<키>.json 파일 하나
+    - max_entries / max_bytes를 넘으면 가장 오래 안 쓴 항목부터 삭제 (LRU, 파일 mtime 기준)
+    - replay=True면 읽기 전용: 디스크를 건드리지 않고, 없는 항목은 CacheMiss
+    """
+
+    def __init__(self, cache_dir="data/llm_cache", max_entries: int = 5000,
+                 max_bytes: int = 100 * 1024 * 1024, replay: bool = False):
+        self.dir = Path(cache_dir)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.replay = replay
+        self.hits = 0
+        self.misses = 0
+
+        # 키 → 파일 크기 (오래 안 쓴 것부터)
+        self._index = OrderedDict()
+        self._bytes = 0
+        if self.dir.exists():
+            entries = []
+            for f in self.dir.glob("*/*.json"):
+                st = f.stat()
+                entries.append((st.st_mtime, f.stem, st.st_size))
+            for _, key, size in sorted(entries):
+                self._index[key] = size
+                self._bytes += size
+
+    @staticmethod
+    def make_key(system_prompt: str, world_state: Optional[Dict], user_text: str,
+                 model: str, temperature: float, extra: str = "") -> str:
+        h = hashlib.sha256()
+        for part in (system_prompt, canonical_world(world_state), user_text, model,
+                     repr(float(temperature)), extra):
+            h.update(part.encode("utf-8"))
+            h.update(b"\0")  # 구분자: 필드 경계가 섞여도 같은 키가 되지 않도록
+        return h.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.dir / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[str]:
+        """캐시된 원본 응답 문자열 (없으면 None, replay 모드면 CacheMiss)"""
+        path = self._path(key)
+        try:
+            raw = json.loads(path.read_text(encoding="utf-8"))["response"]
+        except (OSError, ValueError, KeyError):
+            self.misses += 1
+            if self.replay:
+                raise CacheMiss(f"replay 캐시에 없는 요청입니다: {key[:12]}…")
+            return None
+
+        self.hits += 1
+        if not self.replay:
+            try:
+                os.utime(path)  # LRU 갱신
+                size = path.stat().st_size
+            except OSError:  # 그 사이 다른 프로세스가 지움 → 응답은 이미 읽었으므로 그대로 사용
+                return raw
+            # 같은 디렉터리를 쓰는 다른 인스턴스가 나중에 쓴 항목일 수 있으므로 색인에 다시 넣음
+            self._bytes += size - self._index.pop(key, 0)
+            self._index[key] = size
+            self._evict()
+        return raw
+
+    def put(self, key: str, response: str, model: str = ""):
+        if self.replay:
+            return
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        body = json.dumps({"response": response, "model": model, "created": time.time()},
+                          ensure_ascii=False)
+
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(body, encoding="utf-8")
+        os.replace(tmp, path)  # 중간에 죽어도 반쯤 쓴 파일이 남지 않도록
+
+        size = path.stat().st_size
+        self._bytes += size - self._index.pop(key, 0)
+        self._index[key] = size
+        self._evict()
+
+    def _evict(self):
+        while self._index and (len(self._index) > self.max_entries or self._bytes > self.max_bytes):
+            key, size = self._index.popitem(last=False)
+            self._bytes -= size
+            try:
+                self._path(key).unlink()
+            except OSError:
+                pass
+
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / total) if total else 0.0,
+            "entries": len(self._index),
+            "bytes": self._bytes,
+        }
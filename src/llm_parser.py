@@ -1,9 +1,15 @@
 import os
 import json
 import re
-from typing import Dict, Any
+import sys
+from typing import Dict, Any, Optional
 from pathlib import Path
-from openai import OpenAI
+from .llm_cache import LLMResponseCache
+from .context_encoder import ContextEncoder
+from .fast_path import FastPathMatcher
+from .startup import timed
+from .tracing import get_tracer
+from .types import World
 
 # --- 설정 및 초기화 ---
 ROOT = Path(__file__).resolve().parents[1]
@@ -17,111 +23,198 @@ def _load_api_key() -> str:
             return json.load(f).get("OPENAI_API_KEY", "").strip()
     return os.getenv("OPENAI_API_KEY", "").strip()
 
-api_key = _load_api_key()
-if not api_key:
-    raise RuntimeError("OPENAI_API_KEY가 설정되지 않았습니다. config/openai_key.json 또는 환경변수를 확인하세요.")
+MODEL = "gpt-4o"  # gpt-4o 모델 사용
+TEMPERATURE = 0.1
 
-client = OpenAI(api_key=api_key)
-SYSTEM_PROMPT = PROMPT_PATH.read_text(encoding="utf-8")
+# 키/클라이언트/프롬프트는 처음 쓸 때 만든다 (sanitize_world_state 등만 쓰는 도구는 비용 없음)
+_lazy: Dict[str, Any] = {}
+
+
+def _get_api_key() -> str:
+    if "api_key" not in _lazy:
+        api_key = _load_api_key()
+        if not api_key:
+            raise RuntimeError("OPENAI_API_KEY가 설정되지 않았습니다. config/openai_key.json 또는 환경변수를 확인하세요.")
+        _lazy["api_key"] = api_key
+    return _lazy["api_key"]
+
+
+def get_client():
+    """동기 OpenAI 클라이언트 (첫 호출 때 SDK import + 생성)"""
+    if "client" not in _lazy:
+        with timed("openai client"):
+            from openai import OpenAI
+            _lazy["client"] = OpenAI(api_key=_get_api_key())
+    return _lazy["client"]
+
+
+def get_async_client():
+    """비동기 OpenAI 클라이언트 (첫 호출 때 SDK import + 생성)"""
+    if "async_client" not in _lazy:
+        with timed("openai async client"):
+            from openai import AsyncOpenAI
+            _lazy["async_client"] = AsyncOpenAI(api_key=_get_api_key())
+    return _lazy["async_client"]
+
+
+def get_system_prompt() -> str:
+    if "system_prompt" not in _lazy:
+        with timed("system prompt"):
+            _lazy["system_prompt"] = PROMPT_PATH.read_text(encoding="utf-8")
+    return _lazy["system_prompt"]
+
+
+def __getattr__(name: str):
+    """예전 모듈 전역(client, async_client, SYSTEM_PROMPT, api_key) 접근 호환"""
+    getters = {"client": get_client, "async_client": get_async_client,
+               "SYSTEM_PROMPT": get_system_prompt, "api_key": _get_api_key}
+    if name in getters:
+        return getters[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # --- 핵심 함수 ---
-def natural_language_to_world(user_text: str, world_state: Dict = None) -> Dict:
-    """
-    LLM을 호출하여 사용자의 자연어 명령을 3D 시뮬레이션용 JSON으로 변환합니다.
-    이전 월드 상태(world_state)를 대화의 문맥으로 함께 제공할 수 있습니다.
-    """
-    messages = [{"role": "system", "content": SYSTEM_PROMPT}]
+def _build_messages(user_text: str, world_state: Optional[Dict],
+                    encoder: Optional[ContextEncoder] = None) -> list:
+    messages = [{"role": "system", "content": get_system_prompt()}]
 
     # 이전 상태가 있다면, LLM에게 현재 상태를 알려주어 대화의 연속성을 유지합니다.
-    if world_state:
+    if world_state and encoder is not None:
+        # 압축 인코더: 반올림 + 기본값 생략 + 관련 객체만 + 토큰 예산
+        context_message, _ = encoder.encode(world_state, user_text)
+        messages.append({"role": "system", "content": context_message})
+    elif world_state:
         state_for_context = world_state.copy()
         state_for_context.pop("actions", None)  # 이전 액션은 제외하고 전달
         context_message = f"현재 월드 상태는 다음과 같습니다:\n{json.dumps(state_for_context, ensure_ascii=False, indent=2)}\n\n이 상태를 바탕으로 다음 명령을 처리해주세요:"
         messages.append({"role": "system", "content": context_message})
 
     messages.append({"role": "user", "content": user_text})
+    return messages
 
-    # OpenAI API 호출
-    comp = client.chat.completions.create(
-        model="gpt-4o",  # gpt-4o 모델 사용
-        messages=messages,
-        temperature=0.1,
-        response_format={"type": "json_object"}  # JSON 강제
-    )
-
-    raw_response = comp.choices[0].message.content or "{}"
-
-    try:
-        world_draft = json.loads(raw_response)
-    except json.JSONDecodeError as e:
-        print(f"[ERROR] LLM의 응답이 유효한 JSON이 아닙니다: {e}")
-        print(f"LLM 원본 응답: {raw_response}")
-        return {}
-
-    # 기본값 채우기
-    world_draft.setdefault("environment", {
-        "gravity": [0.0, 0.0, -9.81],
-        "time_step": 0.01,
-        "duration": 5.0
-    })
 
-    # 정제 및 보정
-    return sanitize_world_state(world_draft)
+def _cached_response(cache: Optional[LLMResponseCache], user_text: str, world_state: Optional[Dict],
+                     encoder: Optional[ContextEncoder] = None):
+    """캐시 조회 (replay 모드에서 없으면 CacheMiss로 중단). (키, 응답 또는 None) 반환"""
+    if cache is None:
+        return None, None
+    extra = encoder.signature if encoder is not None else ""
+    key = cache.make_key(get_system_prompt(), world_state, user_text, MODEL, TEMPERATURE, extra=extra)
+    return key, cache.get(key)
 
 
+def _record_usage(comp):
+    """토큰 사용량을 tracer 카운터에 기록"""
+    tracer = get_tracer()
+    tracer.count("llm.calls")
+    usage = getattr(comp, "usage", None)
+    if usage is not None:
+        tracer.count("llm.prompt_tokens", getattr(usage, "prompt_tokens", 0) or 0)
+        tracer.count("llm.completion_tokens", getattr(usage, "completion_tokens", 0) or 0)
 
-# --- 환경 및 객체 정제 함수 ---
-def sanitize_world_state(world: dict) -> dict:
-    """LLM이 만든 world JSON을 정제하고 물리 시뮬레이션 기본값을 보정"""
-    
-    def fix_vector3(v, default=[0.0, 0.0, 0.0]):
-        if not isinstance(v, list) or len(v) != 3:
-            return list(default)
-        return [float(x) if x is not None else 0.0 for x in v]
-
-    # --- 객체 정제 ---
-    for obj in world.get("objects", []):
-        init = obj.get("initial_state", {})
-        init["position"] = fix_vector3(init.get("position", [0, 0, 0]))
-        init["velocity"] = fix_vector3(init.get("velocity", [0, 0, 0]))
 
-        if "angular_velocity" in init:
-            init["angular_velocity"] = fix_vector3(init["angular_velocity"])
+def _try_fast_path(fast_path: Optional[FastPathMatcher], user_text: str, world_state: Optional[Dict]):
+    if fast_path is None:
+        return None
+    draft = fast_path.match(user_text, world_state)
+    if draft is None:
+        return None
+    get_tracer().count("fast_path.hits")
+    return World.model_validate(draft)
 
-        if init.get("mass") is None:
-            init["mass"] = 1.0
 
-        obj["initial_state"] = init
+def _response_to_world(raw_response: str) -> World:
+    try:
+        world_draft = json.loads(raw_response)
+    except json.JSONDecodeError as e:
+        print(f"[ERROR] LLM의 응답이 유효한 JSON이 아닙니다: {e}", file=sys.stderr)
+        print(f"LLM 원본 응답: {raw_response}", file=sys.stderr)
+        return World()  # 아무 필드도 지정되지 않음 → 메모리 병합 시 변경 없음
 
-    # --- 환경 정제 ---
-    env = world.get("environment", {}) or {}
-    env["gravity"] = fix_vector3(env.get("gravity", [0, 0, -9.81]))
+    # 검증 + 정제 + 기본값 채우기를 한 번에 (environment를 빼먹으면 누적 환경 유지)
+    return World.model_validate(world_draft)
 
-    # 바람
-    wind = env.get("wind", {})
-    wind["direction"] = fix_vector3(wind.get("direction", [0, 0, 0]))
-    wind["strength"] = float(wind.get("strength", 0.0))
-    env["wind"] = wind
 
-    # 공기 관련 물리값 보정
-    env.setdefault("temperature", 298.0)        # K
-    env.setdefault("pressure", 101325.0)        # Pa
-    env.setdefault("air_density", 1.225)        # kg/m³
-    env.setdefault("drag_coefficient", 0.47)
-    env.setdefault("humidity", 0.5)
+def natural_language_to_world(user_text: str, world_state: Dict = None,
+                              cache: Optional[LLMResponseCache] = None,
+                              encoder: Optional[ContextEncoder] = None,
+                              fast_path: Optional[FastPathMatcher] = None) -> World:
+    """
+    LLM을 호출하여 사용자의 자연어 명령을 3D 시뮬레이션용 World 모델로 변환합니다 (검증/정제 1회).
+    이전 월드 상태(world_state)를 대화의 문맥으로 함께 제공할 수 있습니다.
+    cache가 주어지면 같은 (프롬프트, 월드 상태, 명령, 모델) 요청은 디스크 캐시에서 바로 응답합니다.
+    encoder가 주어지면 월드 상태를 압축해서 보냅니다 (절약한 토큰은 encoder.last_report).
+    fast_path가 주어지면 단순 명령은 LLM 없이 규칙으로 바로 처리합니다 (확신이 없을 때만 LLM 호출).
+    """
+    if encoder is not None:
+        encoder.last_report = None  # 캐시 적중/fast path면 이번 턴엔 인코딩하지 않으므로 보고도 없음
+    world = _try_fast_path(fast_path, user_text, world_state)
+    if world is not None:
+        return world
+
+    tracer = get_tracer()
+    key, raw_response = _cached_response(cache, user_text, world_state, encoder)
+
+    if raw_response is None:
+        messages = _build_messages(user_text, world_state, encoder)
+        # OpenAI API 호출
+        with tracer.span("llm.request"):
+            comp = get_client().chat.completions.create(
+                model=MODEL,
+                messages=messages,
+                temperature=TEMPERATURE,
+                response_format={"type": "json_object"}  # JSON 강제
+            )
+        _record_usage(comp)
+        raw_response = comp.choices[0].message.content or "{}"
+        if cache is not None:
+            cache.put(key, raw_response, model=MODEL)
+    else:
+        tracer.count("llm.cache_hits")
+
+    with tracer.span("llm.parse_response"):
+        return _response_to_world(raw_response)
+
+
+async def natural_language_to_world_async(user_text: str, world_state: Dict = None,
+                                          cache: Optional[LLMResponseCache] = None,
+                                          encoder: Optional[ContextEncoder] = None,
+                                          fast_path: Optional[FastPathMatcher] = None) -> World:
+    """natural_language_to_world의 비동기 버전 (AsyncOpenAI 사용, 이벤트 루프를 막지 않음)"""
+    if encoder is not None:
+        encoder.last_report = None  # 캐시 적중/fast path면 이번 턴엔 인코딩하지 않으므로 보고도 없음
+    world = _try_fast_path(fast_path, user_text, world_state)
+    if world is not None:
+        return world
+
+    key, raw_response = _cached_response(cache, user_text, world_state, encoder)
+
+    if raw_response is None:
+        comp = await get_async_client().chat.completions.create(
+            model=MODEL,
+            messages=_build_messages(user_text, world_state, encoder),
+            temperature=TEMPERATURE,
+            response_format={"type": "json_object"}  # JSON 강제
+        )
+        _record_usage(comp)
+        raw_response = comp.choices[0].message.content or "{}"
+        if cache is not None:
+            cache.put(key, raw_response, model=MODEL)
+    else:
+        get_tracer().count("llm.cache_hits")
+
+    return _response_to_world(raw_response)
 
-    # 시간 관련
-    env.setdefault("time_step", 0.01)
-    env.setdefault("duration", 5.0)
 
-    world["environment"] = env
 
-    # 액션 누락 보정
-    if "actions" not in world:
-        world["actions"] = []
+# --- 환경 및 객체 정제 함수 ---
+def sanitize_world_state(world: dict) -> dict:
+    """LLM이 만든 world JSON을 정제하고 물리 시뮬레이션 기본값을 보정
 
-    return world
+    정제 규칙은 types.World 검증기에 있으며, 이 함수는 dict를 쓰는 도구를 위한 래퍼다.
+    턴 파이프라인은 World.model_validate 한 번으로 같은 일을 한다.
+    """
+    return World.model_validate(world).to_state()
 
 #motion action을 물리 파라미터로 매핑(통합)
 
@@ -155,6 +248,18 @@ def map_action_to_physics(action: dict, obj: dict) -> dict:
             }
     }
     
+    if t == "push": # 밀기: 힘 × 시간 = 충격량 → 현재 속도에 더함 (params.force/duration, 없으면 direction × magnitude)
+        params = action.get("params") or {}
+        force = [float(f) for f in (params.get("force") or [dx*mag, dy*mag, dz*mag])]
+        duration = float(params.get("duration", 0.1))
+        mass = float(obj.get("mass", 1.0))
+        if mass <= 0:
+            return {}
+        vel = list(obj.get("velocity") or [])
+        if len(vel) != len(force):
+            vel = [0.0] * len(force)
+        return {"velocity": [v + f*duration/mass for v, f in zip(vel, force)]}
+
     if t == "drop": #낙하
         return {
             "velocity": [0.0, 0.0, -0.1],  # 살짝만 음수, 중력에 의해 가속됨
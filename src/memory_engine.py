@@ -1,44 +1,312 @@
 # src/memory_engine.py
+import copy
 import json
 import os
+import sys
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
+
+from .types import Environment, World, conform_environment, conform_object
+
+
+def _atomic_write(path: Path, text: str):
+    """Write to a temp file, fsync, then rename over the target (never leaves a torn file)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def diff_states(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """Compact delta from old to new: only changed objects (by id) and changed top-level keys.
+
+    {"o": {id: obj}, "r": [removed ids], "n": [id order if reordered],
+     "k": {key: value}, "x": [removed keys]}  -- empty parts are omitted.
+    """
+    delta: Dict[str, Any] = {}
+
+    old_objs = {o["id"]: o for o in old.get("objects", []) if "id" in o}
+    new_objs = {o["id"]: o for o in new.get("objects", []) if "id" in o}
+    changed = {oid: o for oid, o in new_objs.items() if old_objs.get(oid) != o}
+    removed = [oid for oid in old_objs if oid not in new_objs]
+    if changed:
+        delta["o"] = changed
+    if removed:
+        delta["r"] = removed
+    # apply_delta keeps surviving ids in place and appends new ones; record the order otherwise
+    expected = [oid for oid in old_objs if oid in new_objs] + [oid for oid in new_objs if oid not in old_objs]
+    if list(new_objs) != expected:
+        delta["n"] = list(new_objs)
+
+    keys = {k: v for k, v in new.items() if k != "objects" and old.get(k) != v}
+    gone = [k for k in old if k != "objects" and k not in new]
+    if keys:
+        delta["k"] = keys
+    if gone:
+        delta["x"] = gone
+    return delta
+
+
+def apply_delta(state: Dict[str, Any], delta: Dict[str, Any]) -> Dict[str, Any]:
+    """Apply a diff_states() delta to state (in place) and return it."""
+    if "o" in delta or "r" in delta or "n" in delta:
+        objs = {o["id"]: o for o in state.get("objects", []) if "id" in o}
+        for oid in delta.get("r", []):
+            objs.pop(oid, None)
+        objs.update(copy.deepcopy(delta.get("o", {})))
+        order = delta.get("n") or list(objs)
+        state["objects"] = [objs[oid] for oid in order if oid in objs]
+    for k, v in delta.get("k", {}).items():
+        state[k] = copy.deepcopy(v)
+    for k in delta.get("x", []):
+        state.pop(k, None)
+    return state
+
+
+def _read_journal(path: Path) -> Tuple[List[Dict[str, Any]], int]:
+    """Parse journal records; returns (records, byte offset of the last complete record)."""
+    records, good = [], 0
+    if not path.exists():
+        return records, good
+    with open(path, "rb") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break  # torn write from a crash
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                break
+            good += len(line)
+    return records, good
+
+
+def load_world_state(memory_path: str = "data/world_state.json") -> Dict[str, Any]:
+    """Read-only view of the latest state (snapshot file + journal replay)."""
+    path = Path(memory_path)
+    records, _ = _read_journal(WorldMemory.journal_path_for(path))
+    state = json.loads(path.read_text(encoding="utf-8")) if path.exists() else {"objects": [], "environment": {}}
+    return WorldMemory._replay(state, records)[0]
+
 
 class WorldMemory:
-    """LWM-style memory system: keeps and updates a persistent world state."""
-    
-    def __init__(self, memory_path: str = "data/world_state.json"):
+    """LWM-style memory system: keeps and updates a persistent world state.
+
+    Persistence is an append-only journal next to the state file
+    (world_state.journal.jsonl), one compact JSON line per version:
+      {"v": version, "t": turn, "d": delta}   -- only what changed
+      {"v": version, "t": turn, "s": state}   -- full snapshot every `snapshot_every` versions
+    Each line is fsync'd. At every snapshot the state file is also rewritten atomically,
+    so it stays a valid (possibly slightly older) world for other readers; the current
+    state is always snapshot + journal replay. A turn is one apply_update() plus the
+    following commit() of the simulation result; state_at(turn) reads back any earlier turn
+    still in the journal (once it grows past max_journal_bytes, history before the latest
+    snapshot is compacted away).
+    """
+
+    def __init__(self, memory_path: str = "data/world_state.json", snapshot_every: int = 20,
+                 max_journal_bytes: int = 64 * 1024 * 1024):
         self.path = Path(memory_path)
-        if not self.path.exists():
-            self.state = {"objects": [], "environment": {}}
-            self.save()
+        self.journal_path = self.journal_path_for(self.path)
+        self.snapshot_every = max(1, int(snapshot_every))
+        self.max_journal_bytes = max_journal_bytes
+        self.last_delta: Dict[str, Any] = {}
+        self._world: Optional[World] = None  # state의 검증된 모델 (필요할 때 한 번만 만듦)
+
+        records, good = _read_journal(self.journal_path)
+        if self.journal_path.exists() and good < self.journal_path.stat().st_size:
+            with open(self.journal_path, "r+b") as f:  # drop the torn tail before appending
+                f.truncate(good)
+            print("[WARN] memory journal had an incomplete record; truncated.", file=sys.stderr)
+
+        if self.path.exists():
+            base = json.loads(self.path.read_text(encoding="utf-8"))
         else:
-            self.state = json.loads(self.path.read_text(encoding="utf-8"))
-    
+            base = {"objects": [], "environment": {}}
+        self.state, self.version, self.turn = self._replay(base, records)
+        self._since_snapshot = sum(1 for _ in self._after_last_snapshot(records))
+
+        if not records:
+            self._append({"v": self.version, "t": self.turn, "s": self.state}, snapshot=True)
+
+    @property
+    def state(self) -> Dict[str, Any]:
+        return self._state
+
+    @state.setter
+    def state(self, value: Dict[str, Any]):
+        self._state = value
+        self._world = None  # dict가 바뀌면 모델은 다시 만들어야 함
+
+    @property
+    def world(self) -> World:
+        """현재 상태의 World 모델 (dict 경로로 바뀐 뒤 처음 접근할 때만 검증)"""
+        if self._world is None:
+            self._world = World.model_validate(self._state)
+        return self._world
+
+    @staticmethod
+    def journal_path_for(path: Path) -> Path:
+        return path.with_name(path.stem + ".journal.jsonl")
+
+    @staticmethod
+    def _after_last_snapshot(records: List[Dict[str, Any]]):
+        start = 0
+        for i, rec in enumerate(records):
+            if "s" in rec:
+                start = i
+        return records[start + 1:]
+
+    @staticmethod
+    def _replay(base: Dict[str, Any], records: List[Dict[str, Any]],
+                until_turn: Optional[int] = None) -> Tuple[Dict[str, Any], int, int]:
+        state, version, turn = copy.deepcopy(base), 0, 0
+        for rec in records:
+            if until_turn is not None and rec.get("t", 0) > until_turn:
+                break
+            if "s" in rec:
+                state = copy.deepcopy(rec["s"])
+            else:
+                apply_delta(state, rec.get("d", {}))
+            version, turn = rec.get("v", version), rec.get("t", turn)
+        return state, version, turn
+
+    def _append(self, record: Dict[str, Any], snapshot: bool = False):
+        self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+        with open(self.journal_path, "a", encoding="utf-8") as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+        if snapshot:
+            _atomic_write(self.path, json.dumps(self.state, ensure_ascii=False, indent=2))
+            self._since_snapshot = 0
+            if self.journal_path.stat().st_size > self.max_journal_bytes:
+                _atomic_write(self.journal_path, line)  # keep only the snapshot just written
+
+    def _record(self, new_state: Dict[str, Any]):
+        """Journal the change from the current state to new_state and adopt it."""
+        delta = diff_states(self.state, new_state)
+        self.last_delta = delta
+        self.state = new_state
+        if not delta:
+            return
+        self.version += 1
+        self._since_snapshot += 1
+        if self._since_snapshot >= self.snapshot_every:
+            self._append({"v": self.version, "t": self.turn, "s": self.state}, snapshot=True)
+        else:
+            self._append({"v": self.version, "t": self.turn, "d": delta})
+
     def save(self):
-        self.path.parent.mkdir(parents=True, exist_ok=True)
-        self.path.write_text(json.dumps(self.state, ensure_ascii=False, indent=2), encoding="utf-8")
-    
+        """Force a full snapshot (journal record + atomic rewrite of the state file)."""
+        self.version += 1
+        self._append({"v": self.version, "t": self.turn, "s": self.state}, snapshot=True)
+
     def apply_update(self, new_state: Dict[str, Any]):
-        """Merge new state into memory (object add/modify/remove)."""
+        """Merge new state into memory (object add/modify/remove). Starts a new turn."""
+        merged = copy.deepcopy(self.state)
         if "objects" in new_state:
-            existing = {obj["id"]: obj for obj in self.state.get("objects", [])}
+            existing = {obj["id"]: obj for obj in merged.get("objects", [])}
             for obj in new_state["objects"]:
                 existing[obj["id"]] = obj
-            self.state["objects"] = list(existing.values())
-        
+            merged["objects"] = list(existing.values())
+
         if "environment" in new_state:
-            self.state["environment"] = new_state["environment"]
-        
-        self.save()
+            merged["environment"] = new_state["environment"]
+
+        self.turn += 1
+        self._record(merged)
+        return self.state
+
+    def apply_world(self, draft: World) -> World:
+        """Typed merge of a validated draft (object add/modify by id). Starts a new turn.
+
+        Only fields the draft actually set are merged; draft objects are adopted as-is
+        (no re-validation) and only they are converted to dicts for the journal.
+        Environment changes from actions (draft._env_update) are applied on top.
+        """
+        base = self.world
+        env = base.environment
+        if "environment" in draft.model_fields_set:
+            env = draft.environment
+            if "dimensions" not in env.model_fields_set and env.dimensions != base.environment.dimensions:
+                # 차원을 명시하지 않은 초안 환경(LLM은 3D로 답함)은 누적 월드의 차원을 유지
+                env = conform_environment(env.model_copy(update={"dimensions": base.environment.dimensions}))
+        if draft._env_update:
+            env = conform_environment(Environment.model_validate({**env.model_dump(), **draft._env_update}))
+
+        objects = {o.id: o for o in base.objects}
+        state_objs = {o["id"]: o for o in self.state.get("objects", []) if "id" in o}
+        if "objects" in draft.model_fields_set:
+            for obj in draft.objects:
+                conform_object(obj, env.ndim)  # 초안 벡터를 누적 월드의 차원(2D/3D)에 맞춤
+                objects[obj.id] = obj
+                state_objs[obj.id] = obj.model_dump(exclude_none=True)
+
+        merged = World.model_construct(objects=list(objects.values()), environment=env,
+                                       actions=draft.actions)
+        new_state = dict(self.state)
+        new_state["objects"] = list(state_objs.values())
+        if env is not base.environment:
+            new_state["environment"] = env.model_dump(exclude_none=True)
+
+        self.turn += 1
+        self._record(new_state)
+        self._world = merged
+        return merged
+
+    def commit(self, final_state: Dict[str, Any], world: Optional[World] = None):
+        """Adopt the simulation result as the end state of the current turn.
+
+        world: the model final_state was dumped from, kept so the next turn skips validation.
+        """
+        self._record(final_state)
+        if world is not None:
+            self._world = world
+        return self.state
+
+    def state_at(self, turn: int) -> Dict[str, Any]:
+        """World state at the end of an earlier turn (0 = before the first update).
+
+        Raises ValueError if that turn was compacted out of the journal.
+        """
+        records, _ = _read_journal(self.journal_path)
+        # start from the last snapshot at or before that turn
+        start = None
+        for i, rec in enumerate(records):
+            if rec.get("t", 0) > turn:
+                break
+            if "s" in rec:
+                start = i
+        if start is None:
+            raise ValueError(f"turn {turn} is no longer in the memory journal (compacted)")
+        return self._replay(records[start]["s"], records[start + 1:], until_turn=turn)[0]
+
+    def undo(self, turns: int = 1) -> Dict[str, Any]:
+        """Return to the state `turns` turns back. Recorded as a new turn, so it can be undone too.
+
+        Raises ValueError (memory unchanged) if that turn is no longer in the journal.
+        """
+        return self.restore(self.state_at(max(0, self.turn - turns)))
+
+    def restore(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Adopt an earlier state (e.g. from a snapshot) as a new turn."""
+        self.turn += 1
+        self._record(state)
         return self.state
 
     def reset(self):
-        """Reset memory and delete saved file."""
+        """Reset memory and delete saved file and journal."""
         self.state = {"objects": [], "environment": {}}
-        if self.path.exists():
-            try:
-                os.remove(self.path)
-                print("[INFO] memory file removed successfully.")
-            except Exception as e:
-                print(f"[WARN] memory file could not be removed: {e}")
+        self.version = self.turn = self._since_snapshot = 0
+        self.last_delta = {}
+        for path in (self.path, self.journal_path):
+            if path.exists():
+                try:
+                    os.remove(path)
+                    print(f"[INFO] memory file removed successfully: {path.name}", file=sys.stderr)
+                except Exception as e:
+                    print(f"[WARN] memory file could not be removed: {e}", file=sys.stderr)
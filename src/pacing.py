@@ -0,0 +1,102 @@
+# src/pacing.py
+"""GUI 표시 속도 제어 (물리 스텝과 화면 표시 분리)
+
+- Pacer: 실시간 배율(real_time_factor)에 맞춰 스텝을 늦춤
+  고정 sleep(time_step)이 아니라 "시작 시각 + sim_time / 배율" 절대 일정에 맞춰 자므로
+  계산 시간만큼 느려지는 누적 지연(drift)이 없다. 배율 0 이하는 제한 없음(최대 속도).
+- frame_due(): 카메라/시각 갱신을 목표 fps로 제한 (매 스텝 resetDebugVisualizerCamera 방지)
+- play_trajectory(): "먼저 계산, 나중에 재생" 모드에서 기록된 궤적을 GUI로 재생
+  재생 길이는 max_seconds로 제한 (긴 장면이면 배율을 올려서 그 안에 끝냄)
+"""
+import time
+
+import numpy as np
+import pybullet as p
+
+
+def follow_camera(cid: int, target):
+    """카메라가 대상 위치를 따라가도록 갱신"""
+    p.resetDebugVisualizerCamera(
+        cameraDistance=2.0,
+        cameraYaw=45,
+        cameraPitch=-30,
+        cameraTargetPosition=list(target),
+        physicsClientId=cid
+    )
+
+
+class Pacer:
+    def __init__(self, real_time_factor: float = 1.0, fps: float = 30.0, max_lag: float = 0.25):
+        self.real_time_factor = real_time_factor
+        self.frame_interval = 1.0 / fps if fps and fps > 0 else 0.0
+        self.max_lag = max_lag  # 이보다 더 밀리면 따라잡지 않고 일정을 재설정 (몰아서 빨리 감기 방지)
+        self._t0 = None
+        self._sim0 = 0.0
+        self._last_frame = None
+
+    def start(self, sim_time: float = 0.0):
+        self._t0 = time.perf_counter()
+        self._sim0 = sim_time
+        self._last_frame = None
+
+    def wait(self, sim_time: float):
+        """sim_time이 화면상 도달해야 할 벽시계 시각까지 대기"""
+        if self.real_time_factor <= 0:
+            return
+        if self._t0 is None:
+            self.start(sim_time)
+            return
+        target = self._t0 + (sim_time - self._sim0) / self.real_time_factor
+        now = time.perf_counter()
+        if target > now:
+            time.sleep(target - now)
+        elif now - target > self.max_lag:
+            self.start(sim_time)  # 계산이 실시간보다 느림 → 밀린 만큼은 포기하고 여기서부터 다시
+
+    def frame_due(self) -> bool:
+        """마지막 화면 갱신 후 프레임 간격이 지났는지 (지났으면 갱신한 것으로 기록)"""
+        now = time.perf_counter()
+        if self._last_frame is not None and now - self._last_frame < self.frame_interval:
+            return False
+        self._last_frame = now
+        return True
+
+
+def play_trajectory(trajectory, bodies, cid: int, real_time_factor: float = 1.0, fps: float = 30.0,
+                    max_seconds=None, follow=None) -> float:
+    """기록된 궤적을 GUI에 재생하고 재생에 걸린 시간(초)을 반환
+
+    bodies: trajectory["object_ids"] 순서의 body id 목록
+    follow: 카메라가 따라갈 바디의 인덱스 (None이면 카메라 고정)
+    max_seconds: 재생 시간 상한 — 넘으면 배율을 올려서 그 안에 끝냄
+    재생은 자세만 덮어쓰므로, 호출한 쪽이 재생 전후로 물리 상태를 저장/복원해야 한다.
+    """
+    t = np.asarray(trajectory["t"], dtype=float)
+    if len(t) == 0:
+        return 0.0
+    rate = real_time_factor if real_time_factor > 0 else 0.0
+    span = t[-1] - t[0]
+    if max_seconds is not None and max_seconds > 0 and span > 0:
+        if rate <= 0 or span / rate > max_seconds:
+            rate = span / max_seconds
+
+    pos, orn = trajectory["position"], trajectory["orientation"]
+    if rate <= 0:
+        t = t[-1:]  # 배율 제한 없음 + 상한 없음 → 마지막 모습만 표시
+        pos, orn = pos[-1:], orn[-1:]
+    pacer = Pacer(rate, fps)
+    frame = pacer.frame_interval
+    started = time.perf_counter()
+    pacer.start(t[0])
+    last_shown = -1
+    for i in range(len(t)):
+        # 프레임 간격보다 촘촘한 샘플은 건너뜀 (마지막 샘플은 항상 표시)
+        if i != len(t) - 1 and last_shown >= 0 and rate > 0 and (t[i] - t[last_shown]) / rate < frame:
+            continue
+        pacer.wait(t[i])
+        for j, body in enumerate(bodies):
+            p.resetBasePositionAndOrientation(body, pos[i, j].tolist(), orn[i, j].tolist(), physicsClientId=cid)
+        if follow is not None:
+            follow_camera(cid, pos[i, follow].tolist())
+        last_shown = i
+    return time.perf_counter() - started
@@ -1,190 +1,269 @@
 # src/physics_pybullet.py
 import pybullet as p
-import pybullet_data
-import time, math, random
+import numpy as np
 from .types import World  # 네가 쓰는 World 모델
+from .aerodynamics import AeroStage
+from .contacts import ContactLog
+from .pacing import Pacer, follow_camera, play_trajectory
+from .scene import PersistentScene
+from .stepping import RestDetector, AdaptiveTimeStep
+from .trajectory import TrajectoryRecorder
+from .tracing import get_tracer
 
 _GUI_CID = None  # GUI 연결 재사용용 전역 변수
+_SCENES = {}     # 연결 id → PersistentScene (턴 사이 장면 유지)
 
 
-def _get_connection(show_gui: bool):
-    """GUI 모드면 하나의 창을 재사용하고, DIRECT면 매번 새로 연결"""
+def _get_connection(show_gui: bool, physics_client=None):
+    """GUI 모드면 하나의 창을 재사용하고, DIRECT면 매번 새로 연결
+
+    physics_client가 주어지면 (앙상블 워커 등) 그 연결을 그대로 재사용한다.
+    장면 초기화는 여기서 하지 않고 _get_scene이 담당한다.
+    """
     global _GUI_CID
 
-    if show_gui:
+    if physics_client is not None:
+        cid = physics_client
+    elif show_gui:
         if _GUI_CID is None or not p.isConnected(_GUI_CID):  # GUI가 없으면 새로 연결
             _GUI_CID = p.connect(p.GUI)
+            _SCENES.pop(_GUI_CID, None)  # 새 창이면 이전 장면 정보는 무효
         cid = _GUI_CID
     else:
         cid = p.connect(p.DIRECT)
+        _SCENES.pop(cid, None)
 
-    p.resetSimulation()  # 이전 장면 초기화
     return cid
 
 
-def run_simulation_pybullet(world: World, show_gui: bool = True):
-    """물리 기반 PyBullet 시뮬레이션 (공기저항, 진공, 바람, 마찰, 각속도 포함)"""
-    cid = _get_connection(show_gui)  # ✅ 연결/리셋
-    p.setAdditionalSearchPath(pybullet_data.getDataPath())
-    p.setGravity(*world.environment.gravity)
-
-    # ✅ GUI 설정 (좌측 프리뷰 끄기)
-    if show_gui:
-        p.configureDebugVisualizer(p.COV_ENABLE_RGB_BUFFER_PREVIEW, 0)
-        p.configureDebugVisualizer(p.COV_ENABLE_DEPTH_BUFFER_PREVIEW, 0)
-        p.configureDebugVisualizer(p.COV_ENABLE_SEGMENTATION_MARK_PREVIEW, 0)
-
-    # ✅ 환경 변수 설정
-    R = 287.05
-    temperature = getattr(world.environment, "temperature", 298.0)
-    pressure = getattr(world.environment, "pressure", 101325.0)
-    air_density = getattr(world.environment, "air_density", pressure / (R * temperature))
-    drag_coefficient = getattr(world.environment, "drag_coefficient", 0.47)
-
-    wind = getattr(world.environment, "wind", {"direction": [0, 0, 0], "strength": 0.0})
-    wind_dir = wind.get("direction", [0, 0, 0])
-    wind_strength = wind.get("strength", 0.0)
-    use_turbulence = (sum(abs(d) for d in wind_dir) < 1e-5 and wind_strength > 0)
-
-    time_step = world.environment.time_step
-    steps = int(world.environment.duration / time_step)
-
-    # ✅ 항상 기본 바닥 plane 생성
-    ground_id = p.loadURDF("plane.urdf")
-    p.changeDynamics(ground_id, -1, restitution=0.3, lateralFriction=0.8)
-
-    id_map = {}
-    follow_body = None  # 카메라가 따라갈 대상(첫 번째 동적 객체)
-
-    # ✅ 객체 생성
-    for obj in world.objects:
-        pos = obj.initial_state.position
-        lin_v = obj.initial_state.velocity
-        mass = obj.initial_state.mass
-        ori = getattr(obj.initial_state, "orientation", [0, 0, 0, 1])
-        cross_section = getattr(obj, "cross_section", 0.0314)
-        friction = getattr(obj, "friction", 0.6)
-        restitution = getattr(obj, "restitution", 0.3)
-
-        # plane은 이미 있음 → 중복 생성 방지
-        if obj.type == "plane":
-            print(f"[INFO] plane 객체 감지됨 — 기본 바닥이 이미 활성화되어 생략함.")
-            continue
-
-        # 구체(ball)
-        if obj.type == "ball":
-            r = math.sqrt(cross_section / math.pi)
-            col_id = p.createCollisionShape(p.GEOM_SPHERE, radius=r)
-            vis_id = p.createVisualShape(p.GEOM_SPHERE, radius=r, rgbaColor=[1, 0, 0, 1])
-
-        # 박스(box, table)
-        elif obj.type in ["box", "table"]:
-            side = (cross_section ** 0.5) * 2
-            col_id = p.createCollisionShape(p.GEOM_BOX, halfExtents=[side / 2] * 3)
-            vis_id = p.createVisualShape(p.GEOM_BOX, halfExtents=[side / 2] * 3)
-
-        # 미지원 타입
-        else:
-            print(f"[WARN] 지원되지 않는 객체: {obj.type}")
-            continue
-
-        # ✅ 객체 생성
-        body = p.createMultiBody(
-            baseMass=mass,
-            baseCollisionShapeIndex=col_id,
-            baseVisualShapeIndex=vis_id,
-            basePosition=pos,
-            baseOrientation=ori
-        )
-
-        # ✅ 마찰 및 반발 계수 적용
-        p.changeDynamics(
-            body, -1,
-            restitution=restitution,
-            lateralFriction=friction,
-            rollingFriction=0.01,
-            spinningFriction=0.01
-        )
-
-        # ✅ 초기 속도 및 각속도 적용
-        ang_v = getattr(obj.initial_state, "angular_velocity", None)
-        if ang_v is not None:
-            p.resetBaseVelocity(body, linearVelocity=lin_v, angularVelocity=ang_v)
-        else:
-            if obj.type == "ball":
-                if abs(lin_v[0]) + abs(lin_v[1]) + abs(lin_v[2]) > 1e-6:
-                    omega = [0.0, (lin_v[0] / r) if r > 0 else 0.0, 0.0]
-                    p.resetBaseVelocity(body, linearVelocity=lin_v, angularVelocity=omega)
-                else:
-                    p.resetBaseVelocity(body, linearVelocity=lin_v)
-            else:
-                p.resetBaseVelocity(body, linearVelocity=lin_v)
-
-        id_map[obj.id] = {"body": body, "area": cross_section}
-
-        # ✅ 첫 번째 동적 객체(plane 제외)를 카메라 추적 대상으로 설정
-        if follow_body is None and mass > 0:
-            follow_body = body
+def _read_states(metas, cid):
+    """모든 바디의 위치/자세/선속도를 배열로 읽기"""
+    n = len(metas)
+    pos, orn, vel = np.empty((n, 3)), np.empty((n, 4)), np.empty((n, 3))
+    for i, m in enumerate(metas):
+        pos[i], orn[i] = p.getBasePositionAndOrientation(m["body"], physicsClientId=cid)
+        vel[i] = p.getBaseVelocity(m["body"], physicsClientId=cid)[0]
+    return pos, orn, vel
+
+
+def _get_scene(cid: int, show_gui: bool, persistent: bool) -> PersistentScene:
+    """연결별 장면을 재사용 (persistent=False면 매번 resetSimulation 후 새로 구성)"""
+    scene = _SCENES.get(cid)
+    if scene is None or not persistent:
+        scene = PersistentScene(cid, show_gui=show_gui)
+        _SCENES[cid] = scene
+    return scene
+
+
+def scene_for(cid: int):
+    """연결에 살아 있는 장면 (없으면 None). 스냅샷 복원 시 장면이 그대로인지 확인용"""
+    return _SCENES.get(cid)
+
+
+def forget_scene(cid: int):
+    """빌려준 연결을 끊기 전에 호출 (같은 id가 재사용될 때 예전 장면을 쓰지 않도록)"""
+    _SCENES.pop(cid, None)
+
+
+def run_simulation_pybullet(world: World, show_gui: bool = True, seed=None, physics_client=None,
+                            persistent_scene: bool = True, stop_at_rest: bool = False,
+                            rest_linear_tol: float = 0.01, rest_angular_tol: float = 0.05,
+                            settle_time: float = 0.5, adaptive_step: bool = False,
+                            coarse_factor: float = 4.0, trajectory_decimation: int = 0,
+                            trajectory_path=None, real_time_factor: float = 1.0, render_fps: float = 30.0,
+                            playback: bool = False, max_playback=None, contacts: bool = False):
+    """물리 기반 PyBullet 시뮬레이션 (공기저항, 진공, 바람, 마찰, 각속도 포함)
+
+    world의 객체 상태(위치/자세/속도/각속도)는 시뮬레이션 결과로 제자리에서 갱신된다.
+
+    seed: 난류 지터용 난수 시드 (None이면 매번 다른 난류)
+    physics_client: 이미 열려 있는 연결 id (주면 재사용하고 끊지 않음)
+    persistent_scene: 연결이 유지되는 동안 장면을 턴 사이에 재사용하고 바뀐 객체만 반영
+    stop_at_rest: 모든 동적 바디가 settle_time(초) 동안 멈춰 있으면 duration 전에 종료
+      (rest_linear_tol [m/s], rest_angular_tol [rad/s] 미만을 정지로 봄)
+    adaptive_step: 접촉이 없는 자유 비행 구간은 time_step * coarse_factor 로 크게 진행
+    trajectory_decimation: N > 0 이면 N 스텝마다 궤적을 기록해 sim_out["trajectory"]로 반환
+    trajectory_path: 주어지면 기록한 궤적을 .npz로 저장
+    real_time_factor: GUI 표시 배율 (1 = 실시간, 2 = 두 배속, 0 이하 = 제한 없음)
+    render_fps: GUI 카메라 갱신 최대 fps
+    playback: GUI에서 먼저 최대 속도로 계산한 뒤 기록한 궤적을 재생 (max_playback초로 재생 길이 제한)
+    contacts: 접촉 시작(충돌) 이벤트를 기록해 sim_out["contacts"]로 반환 (시각, 쌍, 충격량, 위치)
+
+    반환값의 steps_simulated / sim_time 에 실제로 계산한 스텝 수와 시뮬 시간이 담긴다.
+    physics_client 에는 턴 뒤에도 장면이 남아 있는 연결 id가 담긴다 (직접 연 DIRECT면 None).
+    """
+    tracer = get_tracer()
+    setup_span = tracer.start("sim.setup")
+    cid = _get_connection(show_gui, physics_client)  # ✅ 연결
+    scene = _get_scene(cid, show_gui, persistent_scene)  # ✅ 장면 재사용/초기화
+
+    # ✅ 환경 변수 설정 (World 모델이 검증/기본값을 이미 채움)
+    env = world.environment
+    air_density = env.air_density
+    drag_coefficient = env.drag_coefficient
+    wind_dir = env.wind.direction
+    wind_strength = env.wind.strength
+
+    time_step = env.time_step
+    steps = int(env.duration / time_step)
+    end_time = steps * time_step
+
+    # ✅ 객체 diff 반영 (바뀐 객체만 생성/삭제, 나머지는 제자리 리셋)
+    with tracer.span("sim.scene_sync"):
+        id_map, scene_stats = scene.sync(world)
+
+    # ✅ 첫 번째 동적 객체(plane 제외)를 카메라 추적 대상으로 설정
+    follow_body = next((m["body"] for m in id_map.values() if m["mass"] > 0), None)
+
+    # ✅ 공기역학 단계 (면적/질량 배열 고정, 매 스텝 배치 계산)
+    metas = list(id_map.values())
+    aero = AeroStage(
+        bodies=[m["body"] for m in metas],
+        areas=[m["area"] for m in metas],
+        masses=[m["mass"] for m in metas],
+        air_density=air_density,
+        drag_coefficient=drag_coefficient,
+        wind_dir=wind_dir,
+        wind_strength=wind_strength,
+        seed=seed,
+        physics_client=cid,
+    )
+
+    # ✅ 정지 감지 / 적응형 스텝 (옵션)
+    rest = RestDetector(rest_linear_tol, rest_angular_tol, settle_time) if stop_at_rest else None
+    stepper = AdaptiveTimeStep(time_step, coarse_factor, world.environment.gravity[2]) if adaptive_step else None
+    half_extents = np.array([m["half_extent"] for m in metas])
+    need_velocities = aero.active or rest is not None or stepper is not None
+
+    # ✅ 궤적 기록 (옵션, 재생 모드는 fps에 맞춘 간격으로 항상 기록)
+    playback = playback and show_gui
+    record_requested = bool(trajectory_decimation and trajectory_decimation > 0)
+    decimation = trajectory_decimation if record_requested else 0
+    if playback and not decimation:
+        decimation = max(1, int(round(1.0 / (max(render_fps, 1.0) * time_step))))
+    recorder = None
+    if decimation:
+        recorder = TrajectoryRecorder(list(id_map), [m["rest_height"] for m in metas], decimation=decimation,
+                                      static=[m["mass"] <= 0 for m in metas])
+        recorder.record(0, 0.0, *_read_states(metas, cid))
+
+    # ✅ 접촉 이벤트 기록 (옵션)
+    contact_log = None
+    if contacts:
+        contact_log = ContactLog([m["body"] for m in metas], list(id_map), ground_id=scene.ground_id,
+                                 physics_client=cid)
+
+    # ✅ 표시 속도 (GUI 실시간 모드만: 절대 일정 기준 대기 + 카메라 fps 제한)
+    pacer = Pacer(real_time_factor, render_fps) if show_gui and not playback else None
+    if pacer is not None:
+        pacer.start()
+    if playback:
+        p.configureDebugVisualizer(p.COV_ENABLE_RENDERING, 0, physicsClientId=cid)  # 계산 중엔 그리지 않음
 
     # ✅ 시뮬레이션 루프
-    for _ in range(steps):
-        for meta in id_map.values():
-            body = meta["body"]
-            A = meta["area"]
-            try:
-                vel, _ = p.getBaseVelocity(body)
-                wind_v = [wind_strength * d for d in wind_dir]
-                rel_v = [vel[i] - wind_v[i] for i in range(3)]
-                speed = math.sqrt(sum(v ** 2 for v in rel_v))
-
-                # --- 공기저항 ---
-                if speed > 1e-6 and air_density > 0:
-                    unit_v = [v / speed for v in rel_v]
-                    drag_mag = 0.5 * air_density * drag_coefficient * A * (speed ** 2)
-                    drag_force = [-drag_mag * u for u in unit_v]
-                    p.applyExternalForce(body, -1, drag_force, [0, 0, 0], p.WORLD_FRAME)
-
-                # --- 난류 효과 ---
-                if use_turbulence:
-                    jitter = (random.random() - 0.5) * 2.0
-                    turb = [wind_strength * 0.2 * jitter, 0.0, 0.0]
-                    p.applyExternalForce(body, -1, turb, [0, 0, 0], p.WORLD_FRAME)
-
-            except Exception:
-                pass
-
-        p.stepSimulation()
-
-        # ✅ 카메라가 추적 대상 객체를 따라다니도록 갱신
-        if show_gui and follow_body is not None:
-            try:
-                pos, _ = p.getBasePositionAndOrientation(follow_body)
-                cam_target = list(pos)
-                p.resetDebugVisualizerCamera(
-                    cameraDistance=2.0,
-                    cameraYaw=45,
-                    cameraPitch=-30,
-                    cameraTargetPosition=cam_target
-                )
-            except Exception:
-                pass
-
-        if show_gui:
-            time.sleep(time_step)
-
-    # ✅ 최종 상태 저장
-    final = world.model_copy(deep=True)
-    for obj in final.objects:
+    tracer.stop(setup_span)
+    loop_span = tracer.start("sim.step_loop")
+    p.setTimeStep(time_step, physicsClientId=cid)
+    dt = time_step
+    sim_time = 0.0
+    steps_simulated = 0
+    stopped_at_rest = False
+    while sim_time < end_time - 1e-9:
+        if need_velocities:
+            aero.read_velocities()
+        aero.apply(refresh=False)
+
+        if stepper is not None:
+            heights = np.array([p.getBasePositionAndOrientation(m["body"], physicsClientId=cid)[0][2]
+                                for m in metas]) - half_extents
+            n_contacts = len(p.getContactPoints(physicsClientId=cid))
+            new_dt = min(stepper.choose(n_contacts, heights, aero.lin_vel[:, 2]), end_time - sim_time)
+            if abs(new_dt - dt) > 1e-12:
+                dt = new_dt
+                p.setTimeStep(dt, physicsClientId=cid)
+
+        p.stepSimulation(physicsClientId=cid)
+        sim_time += dt
+        steps_simulated += 1
+
+        if contact_log is not None:
+            if need_velocities:  # 이미 읽은 속도가 있으면 움직이는 바디만 조회
+                contact_log.step(sim_time, dt, aero.lin_vel, aero.ang_vel)
+            else:
+                contact_log.step(sim_time, dt)
+
+        if recorder is not None and recorder.due(steps_simulated):
+            recorder.record(steps_simulated, sim_time, *_read_states(metas, cid))
+
+        # ✅ 카메라가 추적 대상 객체를 따라다니도록 갱신 (render_fps로 제한)
+        if pacer is not None:
+            if follow_body is not None and pacer.frame_due():
+                try:
+                    pos, _ = p.getBasePositionAndOrientation(follow_body, physicsClientId=cid)
+                    follow_camera(cid, pos)
+                except Exception:
+                    pass
+            pacer.wait(sim_time)
+
+        if rest is not None and rest.update(aero.lin_vel, aero.ang_vel, aero.dynamic, dt):
+            stopped_at_rest = True
+            break
+
+    tracer.stop(loop_span)
+    tracer.count("sim.steps", steps_simulated)
+    if contact_log is not None:
+        tracer.count("sim.contact_events", contact_log.count)
+    final_span = tracer.start("sim.final_state")
+
+    # ✅ 궤적 마무리 (마지막 스텝이 기록 주기와 어긋나도 최종 상태는 포함)
+    trajectory = None
+    if recorder is not None:
+        recorder.finish(steps_simulated, sim_time, *_read_states(metas, cid))
+        if record_requested:
+            if trajectory_path:
+                recorder.save(trajectory_path)
+            trajectory = recorder.to_dict()
+
+    # ✅ 최종 상태 저장 (복사 없이 World 모델을 제자리에서 갱신 → 다음 턴 입력으로 그대로 사용)
+    for obj in world.objects:
         if obj.id in id_map:
             b = id_map[obj.id]["body"]
-            pos, orn = p.getBasePositionAndOrientation(b)
-            vel, ang = p.getBaseVelocity(b)
-            obj.initial_state.position = list(pos)
-            obj.initial_state.orientation = list(orn)
-            obj.initial_state.velocity = list(vel)
-
-    # GUI 모드는 창 유지, DIRECT 모드만 끊기
-    if not show_gui:
+            pos, orn = p.getBasePositionAndOrientation(b, physicsClientId=cid)
+            vel, ang = p.getBaseVelocity(b, physicsClientId=cid)
+            state = obj.initial_state
+            state.position, state.orientation = list(pos), list(orn)
+            state.velocity, state.angular_velocity = list(vel), list(ang)
+            scene.remember(obj.id, state.position, state.orientation, state.velocity, state.angular_velocity)
+
+    # ✅ 먼저 계산한 궤적 재생 (재생은 자세만 덮어쓰므로 끝나면 계산 결과 상태로 복원)
+    if playback and recorder is not None:
+        with tracer.span("sim.playback"):
+            p.configureDebugVisualizer(p.COV_ENABLE_RENDERING, 1, physicsClientId=cid)
+            saved = p.saveState(physicsClientId=cid)
+            follow = next((i for i, m in enumerate(metas) if m["body"] == follow_body), None)
+            play_trajectory(recorder.to_dict(), [m["body"] for m in metas], cid,
+                            real_time_factor=real_time_factor, fps=render_fps,
+                            max_seconds=max_playback, follow=follow)
+            p.restoreState(stateId=saved, physicsClientId=cid)
+            p.removeState(saved, physicsClientId=cid)
+
+    # GUI 모드는 창 유지, 직접 연 DIRECT 모드만 끊기 (빌려온 연결은 유지)
+    alive_cid = cid
+    if not show_gui and physics_client is None:
+        _SCENES.pop(cid, None)
         p.disconnect(cid)
-
-    return {"final_state": final.model_dump(), "world": world}
+        alive_cid = None
+
+    final_state = world.to_state()
+    tracer.stop(final_span)
+    return {
+        "final_state": final_state,
+        "world": world,
+        "scene_stats": scene_stats,
+        "steps_simulated": steps_simulated,
+        "sim_time": sim_time,
+        "stopped_at_rest": stopped_at_rest,
+        "trajectory": trajectory,
+        "contacts": contact_log.to_dict() if contact_log is not None else None,
+        "physics_client": alive_cid,  # 턴 뒤에도 살아 있는 연결 (스냅샷용), 끊었으면 None
+    }
@@ -0,0 +1,327 @@
+# src/physics_pymunk.py
+"""2D 월드(environment.dimensions == "2D")용 pymunk 물리 엔진
+
+run_simulation_pybullet과 같은 인자와 같은 모양의 결과(final_state, 요약용 trajectory/contacts)를
+평면 장면에 맞는 훨씬 가벼운 2D 솔버로 계산한다.
+
+좌표: 위치/속도/중력/풍향은 2D 벡터 [x, y] (y가 위). 3D 벡터가 섞여 오면 x–z 평면으로 투영한다.
+자세(쿼터니언)와 각속도는 3D 상태와 같은 모양으로 주고받고, 평면의 법선(y축) 회전으로 해석한다
+(반시계 θ ↔ y축 -θ 회전, ω ↔ [0, -ω, 0]). 궤적/접촉 위치는 [x, 0, y]로 기록해 3D와 같은 통계를 쓴다.
+  - 바닥: y = 0 정적 선분 (scene.py의 plane과 같은 반발 0.3 / 마찰 0.8, pymunk도 곱으로 조합)
+  - plane 객체는 생략, 질량 0 객체는 정적 바디
+  - ball: 원 (반지름 √(cross_section/π)), box/table: size([폭, 높이]) 또는 cross_section 기준 정사각형
+  - 공기저항/난류: AeroStage와 같은 식으로 계산해 질량 중심에 월드 좌표 힘으로 가함 (바디 회전과 무관)
+  - 구름 마찰: 무언가에 닿아 있는 공의 각속도를 rolling_friction × m|g| 토크만큼 줄임
+화면 표시(show_gui), 연결/장면 재사용, 적응형 스텝, 실시간 배율/재생 옵션은 PyBullet 전용이라 무시한다.
+"""
+import math
+import sys
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pymunk
+
+from .stepping import RestDetector
+from .tracing import get_tracer
+from .trajectory import TrajectoryRecorder
+from .types import World
+
+GROUND_RESTITUTION = 0.3      # scene.py의 plane 설정과 동일
+GROUND_FRICTION = 0.8
+GROUND_EXTENT = 1.0e4         # 바닥 선분 반길이 [m] (PyBullet plane처럼 사실상 무한)
+DEFAULT_ROLLING_FRICTION = 0.01
+SPEED_EPS = 1e-6              # AeroStage와 같은 항력 적용 기준 속도
+
+
+def _planar(v):
+    """2D 벡터 (x, y)로 (3D 벡터면 x–z 평면으로 투영)"""
+    return (float(v[0]), float(v[2])) if len(v) == 3 else (float(v[0]), float(v[1]))
+
+
+def _angle(orn) -> float:
+    """쿼터니언의 y축 회전 → 2D 각도 (반시계가 +)"""
+    return -2.0 * math.atan2(orn[1], orn[3])
+
+
+def _quat(angle: float):
+    half = -0.5 * angle
+    return [0.0, math.sin(half), 0.0, math.cos(half)]
+
+
+def _make_body(obj):
+    """World 객체 → (body, shape, 반지름 또는 None, 바닥에 놓였을 때 중심 높이). 지원하지 않는 타입은 None"""
+    state = obj.initial_state
+    mass = state.mass
+    static = mass <= 0
+    body = pymunk.Body(body_type=pymunk.Body.STATIC) if static else None
+
+    if obj.type == "ball":
+        r = math.sqrt(obj.cross_section / math.pi)
+        if body is None:
+            body = pymunk.Body(mass, pymunk.moment_for_circle(mass, 0, r))
+        shape = pymunk.Circle(body, r)
+        rest_height = r
+    elif obj.type in ["box", "table"]:
+        r = None
+        if obj.size and len(obj.size) >= 2:
+            w, h = _planar(obj.size)
+        else:
+            w = h = (obj.cross_section ** 0.5) * 2  # scene.py와 같은 한 변 길이
+        if body is None:
+            body = pymunk.Body(mass, pymunk.moment_for_box(mass, (w, h)))
+        shape = pymunk.Poly.create_box(body, (w, h))
+        rest_height = h / 2
+    else:
+        return None
+
+    body.position = _planar(state.position)
+    body.angle = _angle(state.orientation)
+    if not static:
+        vx, vy = _planar(state.velocity)
+        body.velocity = (vx, vy)
+        if state.angular_velocity is not None:
+            body.angular_velocity = -float(state.angular_velocity[1])
+        elif r and abs(vx) + abs(vy) > 1e-6:
+            body.angular_velocity = -vx / r  # scene.py처럼 구르기 각속도 자동 (오른쪽 이동 = 시계 방향)
+    shape.friction = obj.friction
+    shape.elasticity = obj.restitution
+    return body, shape, r, rest_height
+
+
+class _ContactEvents:
+    """접촉 시작 이벤트를 ContactLog.to_dict()와 같은 모양으로 모음 (충격량은 접촉 중 최대값)"""
+
+    def __init__(self, names):
+        self.names = ["ground"] + list(names)
+        self.t, self.pair, self.impulse, self.position = [], [], [], []
+        self._open = {}  # (a, b) → 이벤트 인덱스
+
+    def begin(self, t: float, key, position):
+        if key not in self._open:
+            self._open[key] = len(self.t)
+            self.t.append(t)
+            self.pair.append(key)
+            self.impulse.append(0.0)
+            self.position.append((position[0], 0.0, position[1]))
+
+    def solve(self, key, impulse: float):
+        ev = self._open.get(key)
+        if ev is not None and impulse > self.impulse[ev]:
+            self.impulse[ev] = impulse
+
+    def end(self, key):
+        self._open.pop(key, None)
+
+    def to_dict(self):
+        return {
+            "names": self.names,
+            "t": np.asarray(self.t, dtype=float),
+            "pair": np.asarray(self.pair, dtype=np.int32).reshape(-1, 2),
+            "impulse": np.asarray(self.impulse, dtype=np.float32),
+            "position": np.asarray(self.position, dtype=np.float32).reshape(-1, 3),
+            "dropped": 0,
+        }
+
+
+def run_simulation_pymunk(world: World, show_gui: bool = True, seed=None, stop_at_rest: bool = False,
+                          rest_linear_tol: float = 0.01, rest_angular_tol: float = 0.05,
+                          settle_time: float = 0.5, trajectory_decimation: int = 0,
+                          trajectory_path=None, contacts: bool = False, **_pybullet_only) -> Dict[str, Any]:
+    """2D pymunk 시뮬레이션 (공기저항, 바람, 마찰, 반발, 구름 마찰 포함)
+
+    인자와 반환값은 run_simulation_pybullet과 같다 (PyBullet 전용 옵션은 받아서 무시).
+    world의 객체 상태(위치/자세/속도/각속도)는 시뮬레이션 결과로 제자리에서 갱신된다.
+    pymunk 공간은 턴마다 새로 만든다 (장면 구성 비용이 스텝 몇 번 수준이라 유지할 이유가 없음).
+    """
+    tracer = get_tracer()
+    setup_span = tracer.start("sim.setup")
+    env = world.environment
+    time_step = env.time_step
+    steps = int(env.duration / time_step)
+    end_time = steps * time_step
+
+    # ✅ 공간 + 기본 바닥
+    space = pymunk.Space()
+    space.gravity = _planar(env.gravity)
+    ground = pymunk.Segment(space.static_body, (-GROUND_EXTENT, 0.0), (GROUND_EXTENT, 0.0), 0.0)
+    ground.friction, ground.elasticity = GROUND_FRICTION, GROUND_RESTITUTION
+    space.add(ground)
+
+    # ✅ 객체 생성 (plane은 기본 바닥으로 대체)
+    metas = []  # (obj, body, 반지름, 중심 높이)
+    index: Dict[Any, int] = {ground: 0}
+    with tracer.span("sim.scene_sync"):
+        for obj in world.objects:
+            if obj.type == "plane":
+                continue
+            made = _make_body(obj)
+            if made is None:
+                print(f"[WARN] 지원되지 않는 객체: {obj.type}", file=sys.stderr)
+                continue
+            body, shape, r, rest_height = made
+            space.add(body, shape)
+            index[shape] = len(metas) + 1
+            metas.append((obj, body, r, rest_height))
+    scene_stats = {"created": len(metas), "removed": 0, "reset": 0, "kept": 0}
+
+    bodies = [m[1] for m in metas]
+    n = len(bodies)
+    masses = np.array([m[0].initial_state.mass for m in metas], dtype=float)
+    dynamic = masses > 0
+
+    # ✅ 공기역학 (AeroStage와 같은 항력/난류 식, 힘은 질량 중심에)
+    #    pymunk는 바디마다 힘을 따로 주므로 바디 수가 적은 2D 장면에선 배열보다 스칼라 루프가 빠름
+    drag_scale = 0.5 * env.air_density * env.drag_coefficient
+    drag = [(b, drag_scale * m[0].cross_section) for m, b in zip(metas, bodies)
+            if b.body_type == pymunk.Body.DYNAMIC and drag_scale * m[0].cross_section > 0]
+    wind_x, wind_y = _planar(env.wind.direction)
+    turbulence = abs(wind_x) + abs(wind_y) < 1e-5 and env.wind.strength > 0
+    wind_x, wind_y = env.wind.strength * wind_x, env.wind.strength * wind_y
+    jitter_bodies = [b for b in bodies if b.body_type == pymunk.Body.DYNAMIC] if turbulence else []
+    rng = np.random.default_rng(seed)
+
+    # ✅ 구름 마찰 (닿아 있는 동적 공만): 스텝당 각속도 감소량 = μr m |g| dt / I
+    g = math.hypot(*space.gravity)
+    rolling = {}
+    for obj, body, r, _ in metas:
+        if r and body.body_type == pymunk.Body.DYNAMIC:
+            mu = DEFAULT_ROLLING_FRICTION if obj.rolling_friction is None else obj.rolling_friction
+            if mu > 0:
+                rolling[body] = mu * body.mass * g * time_step / body.moment
+    touching: Dict[Any, int] = {}  # body → 접촉 중인 상대 수
+
+    # ✅ 접촉 추적 (구름 마찰 판정 + 옵션인 접촉 이벤트 기록)
+    contact_log = _ContactEvents([m[0].id for m in metas]) if contacts else None
+    clock = [0.0]  # 콜백에서 볼 현재 스텝 종료 시각
+
+    def _key(arbiter):
+        a, b = (index.get(s) for s in arbiter.shapes)
+        if a is None or b is None:
+            return None
+        return (a, b) if a < b else (b, a)
+
+    def _begin(arbiter, _space, _data):
+        for body in arbiter.bodies:
+            touching[body] = touching.get(body, 0) + 1
+        if contact_log is not None:
+            key = _key(arbiter)
+            points = arbiter.contact_point_set.points
+            if key is not None and points:
+                contact_log.begin(clock[0], key, points[0].point_a)
+
+    def _post_solve(arbiter, _space, _data):
+        key = _key(arbiter)
+        if key is not None:
+            contact_log.solve(key, abs(arbiter.total_impulse))
+
+    def _separate(arbiter, _space, _data):
+        if arbiter.is_removal:
+            return  # 공간 해제/바디 제거 때의 호출 (이미 계산은 끝남)
+        for body in arbiter.bodies:
+            touching[body] = touching.get(body, 1) - 1
+        if contact_log is not None:
+            key = _key(arbiter)
+            if key is not None:
+                contact_log.end(key)
+
+    space.on_collision(begin=_begin, separate=_separate,
+                       post_solve=_post_solve if contact_log is not None else None)
+
+    # ✅ 정지 감지 (옵션)
+    rest = RestDetector(rest_linear_tol, rest_angular_tol, settle_time) if stop_at_rest else None
+    lin_vel = np.zeros((n, 2))
+    ang_vel = np.zeros((n, 1))
+
+    def read_velocities():
+        for i, b in enumerate(bodies):
+            lin_vel[i] = b.velocity
+            ang_vel[i, 0] = b.angular_velocity
+
+    # ✅ 궤적 기록 (옵션, 3D와 같은 통계를 쓰도록 [x, 0, y]로)
+    def read_states():
+        pos = np.array([(b.position.x, 0.0, b.position.y) for b in bodies]).reshape(-1, 3)
+        orn = np.array([_quat(b.angle) for b in bodies]).reshape(-1, 4)
+        vel = np.array([(b.velocity.x, 0.0, b.velocity.y) for b in bodies]).reshape(-1, 3)
+        return pos, orn, vel
+
+    recorder = None
+    if trajectory_decimation and trajectory_decimation > 0:
+        recorder = TrajectoryRecorder([m[0].id for m in metas], [m[3] for m in metas],
+                                      decimation=trajectory_decimation, static=~dynamic)
+        recorder.record(0, 0.0, *read_states())
+
+    # ✅ 시뮬레이션 루프
+    tracer.stop(setup_span)
+    loop_span = tracer.start("sim.step_loop")
+    sim_time = 0.0
+    steps_simulated = 0
+    stopped_at_rest = False
+    while sim_time < end_time - 1e-9:
+        for body, k in drag:
+            vx, vy = body.velocity
+            rx, ry = vx - wind_x, vy - wind_y
+            speed = math.hypot(rx, ry)
+            if speed > SPEED_EPS:
+                body.apply_force_at_world_point((-k * speed * rx, -k * speed * ry), body.position)
+        if jitter_bodies:
+            jitter = (rng.random(len(jitter_bodies)) - 0.5) * 2.0
+            for body, j in zip(jitter_bodies, jitter):
+                body.apply_force_at_world_point((env.wind.strength * 0.2 * float(j), 0.0), body.position)
+
+        for body, dw in rolling.items():
+            w = body.angular_velocity
+            if touching.get(body, 0) > 0 and w != 0.0:
+                body.angular_velocity = w - math.copysign(min(dw, abs(w)), w)
+
+        clock[0] = sim_time + time_step
+        space.step(time_step)
+        sim_time += time_step
+        steps_simulated += 1
+
+        if recorder is not None and recorder.due(steps_simulated):
+            recorder.record(steps_simulated, sim_time, *read_states())
+
+        if rest is not None:
+            read_velocities()
+            if rest.update(lin_vel, ang_vel, dynamic, time_step):
+                stopped_at_rest = True
+                break
+
+    tracer.stop(loop_span)
+    tracer.count("sim.steps", steps_simulated)
+    contact_dict: Optional[Dict[str, Any]] = None
+    if contact_log is not None:
+        contact_dict = contact_log.to_dict()
+        tracer.count("sim.contact_events", len(contact_dict["t"]))
+    final_span = tracer.start("sim.final_state")
+
+    # ✅ 궤적 마무리 (마지막 스텝이 기록 주기와 어긋나도 최종 상태는 포함)
+    trajectory = None
+    if recorder is not None:
+        recorder.finish(steps_simulated, sim_time, *read_states())
+        if trajectory_path:
+            recorder.save(trajectory_path)
+        trajectory = recorder.to_dict()
+
+    # ✅ 최종 상태 저장 (World 모델을 제자리에서 갱신 → 다음 턴 입력으로 그대로 사용)
+    for obj, body, _, _ in metas:
+        state = obj.initial_state
+        state.position = [body.position.x, body.position.y]
+        state.orientation = _quat(body.angle)
+        state.velocity = [body.velocity.x, body.velocity.y]
+        state.angular_velocity = [0.0, 0.0 - body.angular_velocity, 0.0]
+
+    final_state = world.to_state()
+    tracer.stop(final_span)
+    return {
+        "final_state": final_state,
+        "world": world,
+        "scene_stats": scene_stats,
+        "steps_simulated": steps_simulated,
+        "sim_time": sim_time,
+        "stopped_at_rest": stopped_at_rest,
+        "trajectory": trajectory,
+        "contacts": contact_dict,
+        "physics_client": None,
+        "engine": "pymunk",
+    }
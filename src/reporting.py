@@ -2,21 +2,62 @@
 import math
 from typing import Dict, Any
 
+
 def summarize(sim_result: Dict[str, Any]) -> Dict[str, str]:
-    """시뮬레이션 결과 요약"""
+    """시뮬레이션 결과 요약
+
+    sim_result["trajectory"]가 있으면 (궤적 dict 또는 저장된 .npz 경로)
+    다시 시뮬레이션하지 않고 최고 높이 / 이동 거리 / 체공 시간 / 바운스 횟수도 함께 보고한다.
+    sim_result["contacts"]가 있으면 바닥 충돌과 객체 간 충돌을 각각의 첫 충돌 시각 / 최대 충격량과 함께 보고한다.
+    """
     world = sim_result["world"]
     final_state = sim_result["final_state"]
     summaries = {}
 
+    motion = {}
+    traj = sim_result.get("trajectory")
+    if traj is not None:
+        from .trajectory import load_trajectory, trajectory_stats  # numpy는 궤적이 있을 때만
+        if not isinstance(traj, dict):
+            traj = load_trajectory(traj)
+        motion = trajectory_stats(traj)
+
+    impacts = {}
+    if sim_result.get("contacts") is not None:
+        from .contacts import contact_stats
+        impacts = contact_stats(sim_result["contacts"])
+
     for obj in world.objects:
         obj_id = obj.id
         final_obj = next((o for o in final_state["objects"] if o["id"] == obj_id), None)
         if not final_obj:
             continue
         pos = final_obj["initial_state"]["position"]
+        where = f"x={pos[0]:.2f}, y={pos[1]:.2f}" + (f", z={pos[2]:.2f}" if len(pos) > 2 else "")  # 2D는 (x, y)
         summaries[obj_id] = (
             f"'{obj_id}'(default)에 대한 시뮬레이션 결과:\n"
-            f"  - 최종 위치: (x={pos[0]:.2f}, y={pos[1]:.2f}, z={pos[2]:.2f})"
+            f"  - 최종 위치: ({where})"
         )
 
+        m = motion.get(obj_id)
+        if m is not None:
+            summaries[obj_id] += (
+                f"\n  - 최고 높이: {m['max_height']:.2f} m"
+                f"\n  - 이동 거리: {m['distance']:.2f} m"
+                f"\n  - 체공 시간: {m['time_aloft']:.2f} s"
+                f"\n  - 바운스: {m['bounces']}회"
+            )
+
+        c = impacts.get(obj_id)
+        if c is not None:
+            summaries[obj_id] += f"\n  - 바닥 충돌: {c['ground_hits']}회"
+            if c["ground_hits"]:
+                summaries[obj_id] += (f" (첫 충돌 {c['ground_first_impact']:.2f} s, "
+                                      f"최대 충격량 {c['ground_max_impulse']:.2f} N·s)")
+            if c["collisions"]:
+                summaries[obj_id] += (
+                    f"\n  - 충돌한 객체: {', '.join(c['collisions'])} "
+                    f"(첫 충돌 {c['collision_first_impact']:.2f} s, 최대 충격량 {c['collision_max_impulse']:.2f} N·s)"
+                )
+
     return summaries
@@ -0,0 +1,238 @@
+# src/scene.py
+import math
+import sys
+
+import pybullet as p
+import pybullet_data
+
+
+def _body_spec(obj):
+    """World 객체에서 바디 생성/갱신에 필요한 값 추출 (기본값은 types.World가 채움)"""
+    state = obj.initial_state
+    return {
+        "type": obj.type,
+        "pos": state.position,
+        "vel": state.velocity,
+        "mass": state.mass,
+        "ori": state.orientation,
+        "ang_vel": state.angular_velocity,
+        "cross_section": obj.cross_section,
+        "friction": obj.friction,
+        "restitution": obj.restitution,
+        "rolling_friction": 0.01 if obj.rolling_friction is None else obj.rolling_friction,
+    }
+
+
+class PersistentScene:
+    """턴 사이에 PyBullet 월드를 유지하고, 바뀐 객체만 생성/삭제/갱신하는 장면 관리자
+
+    - 객체 id 기준으로 들어온 World와 살아 있는 바디를 비교(diff)
+    - (type, cross_section, mass)가 달라진 객체만 다시 만들고, 사라진 객체는 제거
+    - 유지되는 바디는 자세/속도를 제자리에서 리셋 (직전 시뮬 결과와 같으면 생략)
+    - 충돌/시각 형상은 (type, cross_section) 단위로 캐시해서 재사용
+    - 새 바디는 (형상, 질량, 자세)가 같은 것끼리 묶어 createMultiBody(batchPositions)로 한 번에 생성
+    """
+
+    def __init__(self, cid: int, show_gui: bool = False):
+        self.cid = cid
+        self.show_gui = show_gui
+        self.bodies = {}   # obj_id -> {"body", "sig", "area", "mass", "radius", "half_extent", "rest_height", "dyn", "last"}
+        self._shapes = {}  # (type, cross_section) -> (col_id, vis_id, radius, half_extent, rest_height)
+
+        p.resetSimulation(physicsClientId=cid)  # 장면을 처음 만들 때만 초기화
+        p.setAdditionalSearchPath(pybullet_data.getDataPath(), physicsClientId=cid)
+
+        # ✅ GUI 설정 (좌측 프리뷰 끄기)
+        if show_gui:
+            p.configureDebugVisualizer(p.COV_ENABLE_RGB_BUFFER_PREVIEW, 0, physicsClientId=cid)
+            p.configureDebugVisualizer(p.COV_ENABLE_DEPTH_BUFFER_PREVIEW, 0, physicsClientId=cid)
+            p.configureDebugVisualizer(p.COV_ENABLE_SEGMENTATION_MARK_PREVIEW, 0, physicsClientId=cid)
+
+        # ✅ 항상 기본 바닥 plane 생성 (장면 수명 동안 한 번)
+        self.ground_id = p.loadURDF("plane.urdf", physicsClientId=cid)
+        p.changeDynamics(self.ground_id, -1, restitution=0.3, lateralFriction=0.8, physicsClientId=cid)
+
+    # --- 형상 캐시 (DIRECT 모드는 렌더링하지 않으므로 시각 형상 생략: 바디 생성 비용 절반) ---
+    def _shape(self, obj_type: str, cross_section: float):
+        key = (obj_type, cross_section)
+        cached = self._shapes.get(key)
+        if cached is not None:
+            return cached
+
+        cid = self.cid
+        # 구체(ball)
+        if obj_type == "ball":
+            r = math.sqrt(cross_section / math.pi)
+            col_id = p.createCollisionShape(p.GEOM_SPHERE, radius=r, physicsClientId=cid)
+            vis_id = p.createVisualShape(p.GEOM_SPHERE, radius=r, rgbaColor=[1, 0, 0, 1],
+                                         physicsClientId=cid) if self.show_gui else -1
+            half_extent = rest_height = r
+        # 박스(box, table)
+        elif obj_type in ["box", "table"]:
+            r = None
+            side = (cross_section ** 0.5) * 2
+            col_id = p.createCollisionShape(p.GEOM_BOX, halfExtents=[side / 2] * 3, physicsClientId=cid)
+            vis_id = p.createVisualShape(p.GEOM_BOX, halfExtents=[side / 2] * 3,
+                                         physicsClientId=cid) if self.show_gui else -1
+            half_extent = math.sqrt(3) * side / 2  # 회전해도 바닥까지 닿을 수 있는 최대 거리
+            rest_height = side / 2                 # 바닥에 평평하게 놓였을 때 중심 높이
+        else:
+            return None
+
+        self._shapes[key] = (col_id, vis_id, r, half_extent, rest_height)
+        return self._shapes[key]
+
+    # --- 바디 갱신 ---
+    def _apply_dynamics(self, body: int, spec: dict):
+        # ✅ 마찰 및 반발 계수 적용
+        p.changeDynamics(
+            body, -1,
+            restitution=spec["restitution"],
+            lateralFriction=spec["friction"],
+            rollingFriction=spec["rolling_friction"],
+            spinningFriction=0.01,
+            physicsClientId=self.cid
+        )
+
+    def _apply_velocity(self, body: int, spec: dict, r):
+        # ✅ 초기 속도 및 각속도 적용
+        cid = self.cid
+        lin_v, ang_v = spec["vel"], spec["ang_vel"]
+        if ang_v is not None:
+            p.resetBaseVelocity(body, linearVelocity=lin_v, angularVelocity=ang_v, physicsClientId=cid)
+        elif spec["type"] == "ball" and abs(lin_v[0]) + abs(lin_v[1]) + abs(lin_v[2]) > 1e-6:
+            omega = [0.0, (lin_v[0] / r) if r > 0 else 0.0, 0.0]
+            p.resetBaseVelocity(body, linearVelocity=lin_v, angularVelocity=omega, physicsClientId=cid)
+        else:
+            # 구르기 각속도가 없으면 각속도도 0으로 (재사용 바디에 남은 회전 제거)
+            p.resetBaseVelocity(body, linearVelocity=lin_v, angularVelocity=[0, 0, 0], physicsClientId=cid)
+
+    def _create_many(self, items):
+        """[(obj_id, spec)] 를 형상/질량/자세별로 묶어 일괄 생성하고 {obj_id: 메타} 반환"""
+        groups = {}
+        for obj_id, spec in items:
+            shape = self._shape(spec["type"], spec["cross_section"])
+            if shape is None:
+                print(f"[WARN] 지원되지 않는 객체: {spec['type']}", file=sys.stderr)
+                continue
+            key = (spec["type"], spec["cross_section"], spec["mass"], tuple(spec["ori"]))
+            groups.setdefault(key, (shape, []))[1].append((obj_id, spec))
+
+        created = {}
+        for (_, _, mass, ori), (shape, members) in groups.items():
+            col_id, vis_id, r, half_extent, rest_height = shape
+
+            # ✅ 객체 생성 (같은 그룹은 batchPositions 한 번으로)
+            if len(members) == 1:
+                bodies = [p.createMultiBody(
+                    baseMass=mass,
+                    baseCollisionShapeIndex=col_id,
+                    baseVisualShapeIndex=vis_id,
+                    basePosition=members[0][1]["pos"],
+                    baseOrientation=list(ori),
+                    physicsClientId=self.cid
+                )]
+            else:
+                bodies = p.createMultiBody(
+                    baseMass=mass,
+                    baseCollisionShapeIndex=col_id,
+                    baseVisualShapeIndex=vis_id,
+                    baseOrientation=list(ori),
+                    batchPositions=[spec["pos"] for _, spec in members],
+                    physicsClientId=self.cid
+                )
+
+            for body, (obj_id, spec) in zip(bodies, members):
+                self._apply_dynamics(body, spec)
+                # 새 바디는 정지 상태로 생성되므로 속도가 0이면 리셋 생략
+                if any(spec["vel"]) or any(spec["ang_vel"] or ()):
+                    self._apply_velocity(body, spec, r)
+                created[obj_id] = {"body": body, "radius": r, "half_extent": half_extent,
+                                   "rest_height": rest_height}
+        return created
+
+    def _remove(self, obj_id: str):
+        meta = self.bodies.pop(obj_id)
+        p.removeBody(meta["body"], physicsClientId=self.cid)
+
+    def sync(self, world):
+        """World와 살아 있는 바디를 맞추고 id_map과 변경 통계를 반환"""
+        cid = self.cid
+        p.setGravity(*world.environment.gravity, physicsClientId=cid)
+
+        stats = {"created": 0, "removed": 0, "reset": 0, "kept": 0}
+        wanted = {}
+        for obj in world.objects:
+            # plane은 이미 있음 → 중복 생성 방지
+            if obj.type == "plane":
+                print(f"[INFO] plane 객체 감지됨 — 기본 바닥이 이미 활성화되어 생략함.", file=sys.stderr)
+                continue
+            wanted[obj.id] = obj
+
+        # ✅ 사라졌거나 형상/질량이 바뀐 바디 제거
+        for obj_id in list(self.bodies):
+            obj = wanted.get(obj_id)
+            if obj is None or self.bodies[obj_id]["sig"] != self._signature(_body_spec(obj)):
+                self._remove(obj_id)
+                stats["removed"] += 1
+
+        # ✅ 기존 바디 제자리 갱신 (새 바디는 모아서 아래에서 일괄 생성)
+        pending = []
+        for obj_id, obj in wanted.items():
+            spec = _body_spec(obj)
+            meta = self.bodies.get(obj_id)
+
+            if meta is None:
+                pending.append((obj_id, spec))
+                continue
+
+            body = meta["body"]
+            dyn = (spec["friction"], spec["restitution"], spec["rolling_friction"])
+            if dyn != meta["dyn"]:
+                self._apply_dynamics(body, spec)
+                meta["dyn"] = dyn
+
+            # 직전 시뮬 결과 그대로 넘어온 경우엔 리셋 생략 (내부 접촉 상태 유지)
+            pose = (spec["pos"], spec["ori"], spec["vel"], spec["ang_vel"])
+            if meta["last"] == pose:
+                stats["kept"] += 1
+                continue
+
+            p.resetBasePositionAndOrientation(body, spec["pos"], spec["ori"], physicsClientId=cid)
+            self._apply_velocity(body, spec, meta["radius"])
+            stats["reset"] += 1
+
+        # ✅ 새 바디 일괄 생성 (GUI는 생성 중 렌더링을 꺼서 바디마다 다시 그리지 않도록)
+        if pending:
+            if self.show_gui:
+                p.configureDebugVisualizer(p.COV_ENABLE_RENDERING, 0, physicsClientId=cid)
+            try:
+                created = self._create_many(pending)
+            finally:
+                if self.show_gui:
+                    p.configureDebugVisualizer(p.COV_ENABLE_RENDERING, 1, physicsClientId=cid)
+            for obj_id, spec in pending:
+                if obj_id not in created:
+                    continue
+                self.bodies[obj_id] = {
+                    **created[obj_id],
+                    "sig": self._signature(spec),
+                    "area": spec["cross_section"],
+                    "mass": spec["mass"],
+                    "dyn": (spec["friction"], spec["restitution"], spec["rolling_friction"]),
+                    "last": None,
+                }
+                stats["created"] += 1
+
+        id_map = {obj_id: self.bodies[obj_id] for obj_id in wanted if obj_id in self.bodies}
+        return id_map, stats
+
+    def remember(self, obj_id: str, pos, orn, vel, ang=None):
+        """시뮬 후 최종 상태를 기록 (다음 턴 diff 기준)"""
+        meta = self.bodies.get(obj_id)
+        if meta is not None:
+            meta["last"] = (list(pos), list(orn), list(vel), None if ang is None else list(ang))
+
+    @staticmethod
+    def _signature(spec: dict):
+        return (spec["type"], spec["cross_section"], spec["mass"])
@@ -0,0 +1,446 @@
+# src/service.py
+"""여러 사용자를 동시에 받는 asyncio HTTP 시뮬레이션 서비스 (표준 라이브러리만 사용)
+
+- 세션마다 독립된 WorldMemory (<data_dir>/<session_id>/world_state.json) + fast path 매처
+  → 전역 _GUI_CID / 하나뿐인 data/world_state.json 에 묶이지 않음
+- 물리는 DIRECT 연결만 쓰는 워커 프로세스 풀에서 실행
+  - 세션 id 해시로 항상 같은 워커에 보냄 (affinity) → 워커가 세션별 연결/장면을 유지해서
+    다음 턴은 바뀐 객체만 반영 (PersistentScene diff)
+  - 워커마다 대기 턴 수 상한(queue_limit): 넘으면 503 (backpressure)
+  - 턴마다 시간 제한(timeout): 넘으면 504. 실행 중이던 작업은 워커 프로세스를 다시 띄워서 끊고,
+    그 다음에 메모리를 턴 이전 상태로 되돌림 (버려진 작업이 뒤에서 계속 도는 일이 없도록)
+- 파서는 교체 가능: LLMParser(OpenAI, 기본) / StubParser(fast path 규칙만, 오프라인 테스트용)
+  파서는 parser(prompt, world_state, session) → World | dict (또는 그 awaitable)
+
+API (JSON):
+  POST   /sessions                  {"session_id"?}   → 201 {"session_id"}
+  GET    /sessions/<id>                                → {"session_id", "turn", "state"}
+  POST   /sessions/<id>/turns       {"prompt"}        → 턴 레코드 (run_cli 배치 모드와 같은 형식)
+  DELETE /sessions/<id>                                → 세션 메모리/워커 장면 삭제
+  GET    /health                                       → 세션 수, 워커별 대기 턴 수
+"""
+import asyncio
+import atexit
+import inspect
+import json
+import multiprocessing as mp
+import re
+import sys
+import uuid
+import zlib
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from pydantic import ValidationError
+
+from .fast_path import FastPathMatcher
+from .memory_engine import WorldMemory, diff_states
+from .reporting import summarize
+from .turn_pipeline import prepare_world, merge_into_memory, commit_result
+from .types import World
+
+SESSION_ID = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+MAX_BODY_BYTES = 1024 * 1024
+REASONS = {200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           409: "Conflict", 413: "Payload Too Large", 422: "Unprocessable Entity",
+           500: "Internal Server Error", 503: "Service Unavailable", 504: "Gateway Timeout"}
+
+
+class Overloaded(RuntimeError):
+    """워커 대기열이 가득 참 (→ 503)"""
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+# --- 워커 프로세스 ---
+_WORKER_SCENES = OrderedDict()  # 워커 프로세스 안: session_id → DIRECT 연결 (LRU)
+
+
+def _close_worker_scenes():
+    import pybullet as p
+    from .physics_pybullet import forget_scene
+
+    while _WORKER_SCENES:
+        _, cid = _WORKER_SCENES.popitem(last=False)
+        forget_scene(cid)
+        if p.isConnected(cid):
+            p.disconnect(cid)
+
+
+def _init_worker():
+    atexit.register(_close_worker_scenes)
+
+
+def _worker_connection(session_id: str, max_scenes: int) -> int:
+    import pybullet as p
+    from .physics_pybullet import forget_scene
+
+    cid = _WORKER_SCENES.pop(session_id, None)
+    if cid is None or not p.isConnected(cid):
+        cid = p.connect(p.DIRECT)
+        forget_scene(cid)  # 같은 id를 쓰던 예전 세션의 장면 정보 무효화
+    _WORKER_SCENES[session_id] = cid
+    while len(_WORKER_SCENES) > max_scenes:  # 오래 안 쓴 세션의 장면부터 닫기
+        _, old = _WORKER_SCENES.popitem(last=False)
+        forget_scene(old)
+        p.disconnect(old)
+    return cid
+
+
+def _worker_simulate(session_id: str, world_state: Dict[str, Any], seed: Optional[int],
+                     sim_kwargs: Dict[str, Any], max_scenes: int) -> Dict[str, Any]:
+    from .simulation import backend_for, try_preview
+
+    world = World.model_validate(world_state)
+    # 미리보기로 끝나는 턴이나 2D 월드(pymunk)는 세션 장면(PyBullet 연결)을 만들지 않음
+    sim_out = try_preview(world, show_gui=False, seed=seed, **sim_kwargs)
+    if sim_out is None and world.environment.dimensions != "3D":
+        sim_out = backend_for(world)(world, show_gui=False, seed=seed, **sim_kwargs)
+    if sim_out is None:
+        from .physics_pybullet import run_simulation_pybullet
+
+        cid = _worker_connection(session_id, max_scenes)
+        sim_kwargs = {k: v for k, v in sim_kwargs.items() if k not in ("preview", "verify_preview")}
+        sim_out = run_simulation_pybullet(world, show_gui=False, seed=seed, physics_client=cid, **sim_kwargs)
+        sim_out["engine"] = "pybullet"
+    # World 모델은 부모에서 final_state로 다시 만듦 (프로세스 간에는 dict만)
+    return {k: sim_out.get(k) for k in ("final_state", "scene_stats", "steps_simulated", "sim_time",
+                                        "stopped_at_rest", "trajectory", "contacts", "engine", "verify")}
+
+
+def _worker_drop(session_id: str):
+    import pybullet as p
+    from .physics_pybullet import forget_scene
+
+    cid = _WORKER_SCENES.pop(session_id, None)
+    if cid is not None:
+        forget_scene(cid)
+        if p.isConnected(cid):
+            p.disconnect(cid)
+
+
+class WorkerPool:
+    """워커마다 프로세스 1개짜리 풀을 두고 세션 해시로 고정 배정 (affinity + 워커별 backpressure)"""
+
+    def __init__(self, workers: int = 2, queue_limit: int = 8, max_scenes: int = 64):
+        self.queue_limit = max(1, int(queue_limit))
+        self.max_scenes = max(1, int(max_scenes))
+        self._ctx = mp.get_context("spawn")  # 부모의 PyBullet 상태를 물려받지 않도록 (ensemble과 동일)
+        self._pools = [self._spawn() for _ in range(max(1, int(workers)))]
+        self.pending = [0] * len(self._pools)
+        self.restarts = 0
+
+    def _spawn(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(max_workers=1, mp_context=self._ctx, initializer=_init_worker)
+
+    def worker_for(self, session_id: str) -> int:
+        return zlib.crc32(session_id.encode("utf-8")) % len(self._pools)
+
+    def acquire(self, session_id: str) -> int:
+        """대기열 자리 하나 확보 (가득 차면 Overloaded). 반환한 워커 번호로 run/release"""
+        i = self.worker_for(session_id)
+        if self.pending[i] >= self.queue_limit:
+            raise Overloaded(f"worker {i} 대기열이 가득 찼습니다 ({self.pending[i]}/{self.queue_limit})")
+        self.pending[i] += 1
+        return i
+
+    def release(self, i: int):
+        self.pending[i] -= 1
+
+    def run(self, i: int, session_id: str, world_state: Dict[str, Any], seed: Optional[int],
+            sim_kwargs: Dict[str, Any]) -> Future:
+        """확보한 자리에서 시뮬레이션 실행. 끝나면 (취소/워커 재시작 포함) 자리를 반납"""
+        job = self._pools[i].submit(_worker_simulate, session_id, world_state, seed, sim_kwargs,
+                                    self.max_scenes)
+        loop = asyncio.get_running_loop()
+        job.add_done_callback(lambda _: loop.call_soon_threadsafe(self.release, i))
+        return job
+
+    async def cancel(self, i: int, job: Future):
+        """시간 초과한 작업 중단. 아직 대기 중이면 취소만, 이미 실행 중이면 워커 프로세스를 죽이고
+        새 프로세스로 교체 (죽은 프로세스가 정리될 때까지 기다림)
+
+        같은 워커에 줄 서 있던 다른 턴들은 BrokenProcessPool로 끝남 → run_turn에서 503
+        """
+        if job.cancel() or job.done():
+            return
+        old, self._pools[i] = self._pools[i], self._spawn()
+        procs = list((getattr(old, "_processes", None) or {}).values())
+        for proc in procs:
+            proc.kill()
+        await asyncio.get_running_loop().run_in_executor(None, self._reap, old, procs)
+        self.restarts += 1
+        print(f"[WARN] worker {i}: 시간 초과한 작업을 끊기 위해 워커 프로세스를 다시 시작했습니다",
+              file=sys.stderr)
+
+    @staticmethod
+    def _reap(pool: ProcessPoolExecutor, procs):
+        for proc in procs:
+            proc.join()
+        pool.shutdown(wait=True)
+
+    def drop(self, session_id: str):
+        self._pools[self.worker_for(session_id)].submit(_worker_drop, session_id)
+
+    def shutdown(self):
+        for pool in self._pools:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+
+# --- 파서 ---
+class LLMParser:
+    """OpenAI 파서 (세션별 fast path 먼저, 확신이 없을 때만 LLM 호출)"""
+
+    def __init__(self, cache=None, encoder=None):
+        self.cache = cache
+        self.encoder = encoder
+
+    async def __call__(self, prompt: str, world_state: Dict[str, Any], session: "Session"):
+        from .llm_parser import natural_language_to_world_async
+
+        return await natural_language_to_world_async(prompt, world_state=world_state, cache=self.cache,
+                                                     encoder=self.encoder, fast_path=session.fast_path)
+
+
+class StubParser:
+    """LLM 없이 fast path 규칙만으로 해석하는 파서 (오프라인 테스트 / 부하 테스트용)"""
+
+    def __call__(self, prompt: str, world_state: Dict[str, Any], session: "Session"):
+        draft = session.fast_path.match(prompt, world_state)
+        if draft is None:
+            raise HTTPError(422, f"stub 파서가 해석할 수 없는 명령입니다: {prompt}")
+        return World.model_validate(draft)
+
+
+# --- 세션 ---
+class Session:
+    def __init__(self, session_id: str, memory: WorldMemory):
+        self.id = session_id
+        self.memory = memory
+        self.fast_path = FastPathMatcher()  # 세션마다 따로 ("그거" 같은 직전 대상 추적이 섞이지 않도록)
+        self.lock = asyncio.Lock()          # 한 세션의 턴은 순서대로
+
+
+class SimulationService:
+    def __init__(self, data_dir: str = "data/sessions", workers: int = 2, queue_limit: int = 8,
+                 timeout: float = 30.0, parser=None, sim_kwargs: Optional[Dict[str, Any]] = None,
+                 max_scenes: int = 64, initial_world: Optional[Dict[str, Any]] = None):
+        self.data_dir = Path(data_dir)
+        self.timeout = timeout
+        self.parser = parser or LLMParser()
+        self.sim_kwargs = sim_kwargs or {}
+        self.initial_world = initial_world  # 새 세션의 시작 월드 (None이면 빈 월드)
+        self.pool = WorkerPool(workers, queue_limit, max_scenes)
+        self.sessions: Dict[str, Session] = {}
+        self.stats = {"turns": 0, "failed": 0, "overloaded": 0, "timeouts": 0}
+
+    # --- 세션 관리 ---
+    def _memory_path(self, session_id: str) -> Path:
+        return self.data_dir / session_id / "world_state.json"
+
+    def get_session(self, session_id: str) -> Session:
+        """메모리에 없으면 디스크에서 다시 연다 (서비스 재시작 후에도 세션 유지)"""
+        session = self.sessions.get(session_id)
+        if session is not None:
+            return session
+        if not SESSION_ID.match(session_id) or not self._memory_path(session_id).exists():
+            raise HTTPError(404, f"없는 세션입니다: {session_id}")
+        session = self.sessions[session_id] = Session(session_id, WorldMemory(str(self._memory_path(session_id))))
+        return session
+
+    def create_session(self, session_id: Optional[str] = None) -> Session:
+        session_id = session_id or uuid.uuid4().hex[:16]
+        if not SESSION_ID.match(session_id):
+            raise HTTPError(400, "session_id는 영문/숫자/_/- 64자 이내여야 합니다")
+        if session_id in self.sessions or self._memory_path(session_id).exists():
+            raise HTTPError(409, f"이미 있는 세션입니다: {session_id}")
+        memory = WorldMemory(str(self._memory_path(session_id)))
+        if self.initial_world is not None:
+            memory.state = json.loads(json.dumps(self.initial_world))
+            memory.save()
+        session = self.sessions[session_id] = Session(session_id, memory)
+        return session
+
+    def delete_session(self, session_id: str):
+        session = self.get_session(session_id)
+        session.memory.reset()
+        self.sessions.pop(session_id, None)
+        self.pool.drop(session_id)
+        try:
+            (self.data_dir / session_id).rmdir()
+        except OSError:
+            pass
+
+    # --- 턴 ---
+    async def run_turn(self, session_id: str, prompt: str) -> Dict[str, Any]:
+        session = self.get_session(session_id)
+        async with session.lock:
+            memory = session.memory
+            before = memory.state
+            record = {"turn": memory.turn + 1, "prompt": prompt, "ok": False}
+            hits_before = session.fast_path.hits
+
+            draft = self.parser(prompt, before, session)
+            if inspect.isawaitable(draft):
+                draft = await draft
+            record["fast_path"] = session.fast_path.hits > hits_before
+
+            # 대기열 자리를 먼저 확보 (가득 찼으면 메모리를 건드리기 전에 503)
+            try:
+                slot = self.pool.acquire(session_id)
+            except Overloaded:
+                self.stats["overloaded"] += 1
+                raise
+            try:
+                world, _ = merge_into_memory(memory, prepare_world(draft))
+                job = self.pool.run(slot, session_id, world.to_state(), memory.turn, self.sim_kwargs)
+            except BaseException:
+                self.pool.release(slot)
+                raise
+
+            try:
+                out = await asyncio.wait_for(asyncio.wrap_future(job), self.timeout)
+            except BaseException as e:
+                if isinstance(e, asyncio.TimeoutError):
+                    # 작업이 확실히 멈춘 뒤에 되돌림 (워커가 끝까지 돌아서 장면을 바꾸는 일이 없도록)
+                    await self.pool.cancel(slot, job)
+                memory.restore(before)  # 반쯤 진행된 턴은 되돌림 (다음 턴이 깨끗한 상태에서 시작)
+                if isinstance(e, asyncio.TimeoutError):
+                    self.stats["timeouts"] += 1
+                    raise HTTPError(504, f"시뮬레이션 시간 초과 ({self.timeout:.1f}s)") from None
+                self.stats["failed"] += 1
+                if isinstance(e, BrokenProcessPool):
+                    # 다른 세션의 시간 초과로 워커가 다시 시작됨 → 이 턴은 다시 보내면 됨
+                    raise Overloaded(f"worker {slot}가 다시 시작되었습니다. 다시 시도하세요") from None
+                raise
+
+            sim_out = dict(out, world=World.model_validate(out["final_state"]))
+            commit_result(memory, sim_out)
+            self.stats["turns"] += 1
+            record.update({
+                "ok": True,
+                "delta": diff_states(before, memory.state),
+                "summary": summarize(sim_out),
+                "steps": sim_out["steps_simulated"],
+                "sim_time": sim_out["sim_time"],
+                "engine": sim_out["engine"],
+            })
+            return record
+
+    def health(self) -> Dict[str, Any]:
+        return {"ok": True, "sessions": len(self.sessions), "pending": list(self.pool.pending),
+                "queue_limit": self.pool.queue_limit, "worker_restarts": self.pool.restarts, **self.stats}
+
+    def shutdown(self):
+        self.pool.shutdown()
+
+    # --- HTTP ---
+    async def _dispatch(self, method: str, path: str, body: Dict[str, Any]):
+        parts = [s for s in path.split("?", 1)[0].split("/") if s]
+        if parts == ["health"] and method == "GET":
+            return 200, self.health()
+        if parts == ["sessions"] and method == "POST":
+            session = self.create_session(body.get("session_id"))
+            return 201, {"session_id": session.id, "turn": session.memory.turn}
+        if len(parts) == 2 and parts[0] == "sessions":
+            if method == "GET":
+                session = self.get_session(parts[1])
+                return 200, {"session_id": session.id, "turn": session.memory.turn, "state": session.memory.state}
+            if method == "DELETE":
+                self.delete_session(parts[1])
+                return 200, {"session_id": parts[1], "deleted": True}
+            raise HTTPError(405, f"{method} {path}")
+        if len(parts) == 3 and parts[0] == "sessions" and parts[2] == "turns":
+            if method != "POST":
+                raise HTTPError(405, f"{method} {path}")
+            prompt = body.get("prompt")
+            if not isinstance(prompt, str) or not prompt.strip():
+                raise HTTPError(400, "prompt(문자열)가 필요합니다")
+            return 200, await self.run_turn(parts[1], prompt.strip())
+        raise HTTPError(404, f"{method} {path}")
+
+    async def _respond(self, writer, status: int, payload: Dict[str, Any], keep_alive: bool, headers=()):
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        head = [f"HTTP/1.1 {status} {REASONS.get(status, '')}",
+                "Content-Type: application/json; charset=utf-8",
+                f"Content-Length: {len(data)}",
+                f"Connection: {'keep-alive' if keep_alive else 'close'}", *headers]
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + data)
+        await writer.drain()
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """연결 하나 처리 (HTTP/1.1 keep-alive, Content-Length 본문만 지원)"""
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    method, path, version = line.decode("latin-1").split()
+                except ValueError:
+                    await self._respond(writer, 400, {"error": "잘못된 요청 줄"}, False)
+                    break
+                headers = {}
+                while True:
+                    h = await reader.readline()
+                    if h in (b"\r\n", b"\n", b""):
+                        break
+                    k, _, v = h.decode("latin-1").partition(":")
+                    headers[k.strip().lower()] = v.strip()
+                keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+
+                extra = ()
+                try:
+                    try:
+                        length = int(headers.get("content-length") or 0)
+                        if length < 0:
+                            raise ValueError(length)
+                    except ValueError:
+                        keep_alive = False  # 본문 길이를 모르므로 이 연결은 더 읽지 않음
+                        raise HTTPError(400, "Content-Length가 올바른 정수가 아닙니다") from None
+                    if length > MAX_BODY_BYTES:
+                        keep_alive = False
+                        raise HTTPError(413, f"본문이 너무 큽니다 ({length} bytes)")
+                    raw = await reader.readexactly(length) if length else b""
+                    try:
+                        body = json.loads(raw) if raw else {}
+                    except ValueError:
+                        raise HTTPError(400, "본문이 올바른 JSON이 아닙니다") from None
+                    if not isinstance(body, dict):
+                        raise HTTPError(400, "본문은 JSON 객체여야 합니다")
+                    status, payload = await self._dispatch(method.upper(), path, body)
+                except HTTPError as e:
+                    status, payload = e.status, {"error": str(e)}
+                except ValidationError as e:
+                    status, payload = 422, {"error": str(e)}
+                except Overloaded as e:
+                    status, payload = 503, {"error": str(e)}
+                    extra = ("Retry-After: 1",)
+                except Exception as e:
+                    print(f"[ERROR] {method} {path} 처리 중 오류: {e}", file=sys.stderr)
+                    status, payload = 500, {"error": str(e)}
+
+                await self._respond(writer, status, payload, keep_alive, extra)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8080, ready=None):
+        server = await asyncio.start_server(self.handle, host, port)
+        addrs = ", ".join(str(s.getsockname()) for s in server.sockets)
+        print(f"[INFO] 시뮬레이션 서비스 시작: {addrs} (워커 {len(self.pool.pending)}개, "
+              f"대기열 {self.pool.queue_limit}, 시간 제한 {self.timeout:.0f}s)")
+        if ready is not None:
+            ready.set()
+        async with server:
+            await server.serve_forever()
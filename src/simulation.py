@@ -0,0 +1,132 @@
+# src/simulation.py
+"""시뮬레이션 엔진 선택: 월드 차원별 물리 백엔드 + NumPy 미리보기(fast_preview)
+
+백엔드는 environment.dimensions로 고른다 (BACKENDS, register_backend로 추가/교체).
+  - "3D": run_simulation_pybullet
+  - "2D": run_simulation_pymunk
+모든 백엔드는 run_simulation_pybullet과 같은 인자를 받고 (모르는 옵션은 무시)
+같은 모양의 결과(final_state, world, steps_simulated, trajectory, contacts ...)와 sim_out["engine"]을 반환한다.
+
+preview:
+  - "auto": GUI가 아니고(헤드리스), 미리보기 조건을 만족하고, PyBullet 전용 옵션(contacts)이 없을 때만 미리보기
+  - "on":   조건만 맞으면 GUI 모드에서도 미리보기 (화면 표시 없음)
+  - "off":  항상 PyBullet
+verify_preview: 미리보기로 돌린 턴을 같은 입력으로 PyBullet에서도 돌려 최종 위치 오차와 속도 차이를
+  sim_out["verify"]에 담는다 (반환하는 결과는 미리보기 결과).
+미리보기 도중 공끼리 가까워지면(PreviewFallback) 같은 입력으로 PyBullet을 돌린다.
+"""
+import sys
+import time
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+
+from .fast_preview import PreviewFallback, qualifies, run_preview
+from .tracing import get_tracer
+from .types import World
+
+_PYBULLET_ONLY = ("contacts",)
+VERIFY_WARN_ERROR = 0.5  # 검증 시 최대 위치 오차가 이보다 크면 경고 [m]
+
+
+def _run_pybullet(world: World, **kwargs) -> Dict[str, Any]:
+    from .physics_pybullet import run_simulation_pybullet  # PyBullet은 실제로 필요할 때만 로드
+
+    out = run_simulation_pybullet(world, **kwargs)
+    out.setdefault("engine", "pybullet")
+    return out
+
+
+def _run_pymunk(world: World, **kwargs) -> Dict[str, Any]:
+    from .physics_pymunk import run_simulation_pymunk  # 2D 월드가 있을 때만 로드
+
+    return run_simulation_pymunk(world, **kwargs)
+
+
+BACKENDS: Dict[str, Callable[..., Dict[str, Any]]] = {"3D": _run_pybullet, "2D": _run_pymunk}
+
+
+def register_backend(dimensions: str, run: Callable[..., Dict[str, Any]]):
+    """dimensions("2D"/"3D") 월드를 돌릴 백엔드 함수를 등록 (같은 차원이면 교체)"""
+    BACKENDS[dimensions] = run
+
+
+def backend_for(world: World) -> Callable[..., Dict[str, Any]]:
+    """월드 차원에 맞는 백엔드 함수"""
+    dimensions = world.environment.dimensions
+    if dimensions not in BACKENDS:
+        raise ValueError(f"{dimensions} 월드를 돌릴 물리 백엔드가 없습니다 (등록: {list(BACKENDS)})")
+    return BACKENDS[dimensions]
+
+
+def use_preview(world: World, show_gui: bool, preview: str = "auto", **kwargs) -> bool:
+    """이번 시뮬레이션을 미리보기로 돌릴지 (kwargs는 run_simulation_pybullet 옵션)"""
+    if preview == "off" or (preview == "auto" and show_gui):
+        return False
+    if world.environment.dimensions != "3D":
+        return False  # 미리보기는 PyBullet 3D 장면을 흉내 냄 (2D는 pymunk가 이미 가벼움)
+    if any(kwargs.get(k) for k in _PYBULLET_ONLY):
+        return False
+    return qualifies(world)[0]
+
+
+def _verify(preview_out: Dict[str, Any], reference: World, preview_s: float, **kwargs) -> Dict[str, Any]:
+    t0 = time.perf_counter()
+    ref_out = _run_pybullet(reference, **kwargs)
+    pybullet_s = time.perf_counter() - t0
+
+    ref = {o["id"]: o["initial_state"]["position"] for o in ref_out["final_state"]["objects"]}
+    errors = {}
+    for o in preview_out["final_state"]["objects"]:
+        if o["id"] in ref:
+            errors[o["id"]] = float(np.linalg.norm(np.subtract(o["initial_state"]["position"], ref[o["id"]])))
+    return {
+        "position_error": errors,
+        "max_position_error": max(errors.values(), default=0.0),
+        "preview_ms": preview_s * 1000.0,
+        "pybullet_ms": pybullet_s * 1000.0,
+        "speedup": pybullet_s / preview_s if preview_s > 0 else float("inf"),
+    }
+
+
+def try_preview(world: World, show_gui: bool = True, preview: str = "auto",
+                verify_preview: bool = False, **kwargs) -> Optional[Dict[str, Any]]:
+    """미리보기로 계산해 결과를 반환. 대상이 아니거나 중간에 포기했으면 None (world는 그대로)"""
+    if not use_preview(world, show_gui, preview, **kwargs):
+        return None
+
+    reference = world.model_copy(deep=True) if verify_preview else None
+    tracer = get_tracer()
+    t0 = time.perf_counter()
+    try:
+        with tracer.span("sim.preview"):
+            out = run_preview(world, trajectory_decimation=kwargs.get("trajectory_decimation", 0),
+                              trajectory_path=kwargs.get("trajectory_path"))
+    except PreviewFallback as e:
+        print(f"[INFO] 미리보기 중단 → PyBullet으로 실행: {e}", file=sys.stderr)
+        tracer.count("sim.preview_fallbacks")
+        return None
+    preview_s = time.perf_counter() - t0
+    tracer.count("sim.steps", out["steps_simulated"])
+
+    if reference is not None:
+        # 비교용 PyBullet 실행은 호출한 쪽의 연결/장면을 건드리지 않도록 따로 (DIRECT 새 연결)
+        # (궤적 파일도 덮어쓰지 않도록 기록/재생 옵션은 끔)
+        verify_kwargs = dict(kwargs, physics_client=None, persistent_scene=False,
+                             trajectory_decimation=0, trajectory_path=None, playback=False)
+        out["verify"] = v = _verify(out, reference, preview_s, show_gui=False, **verify_kwargs)
+        print(f"[INFO] 미리보기 검증: 최대 위치 오차 {v['max_position_error']:.3f} m, "
+              f"{v['preview_ms']:.1f} ms vs PyBullet {v['pybullet_ms']:.1f} ms ({v['speedup']:.0f}배)",
+              file=sys.stderr)
+        if v["max_position_error"] > VERIFY_WARN_ERROR:
+            print(f"[WARN] 미리보기와 PyBullet 결과 차이가 큽니다 (> {VERIFY_WARN_ERROR} m)", file=sys.stderr)
+    return out
+
+
+def run_simulation(world: World, show_gui: bool = True, preview: str = "auto",
+                   verify_preview: bool = False, **kwargs) -> Dict[str, Any]:
+    """run_simulation_pybullet과 같은 인자/반환값. sim_out["engine"]에 실제로 쓴 엔진("preview"/"pybullet"/"pymunk")"""
+    out = try_preview(world, show_gui, preview, verify_preview, **kwargs)
+    if out is None:
+        out = backend_for(world)(world, show_gui=show_gui, **kwargs)
+    return out
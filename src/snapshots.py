@@ -0,0 +1,194 @@
+# src/snapshots.py
+"""턴별 물리 스냅샷 링 버퍼 + 되감기 / 분기(what-if)
+
+매 턴이 끝날 때 두 가지를 같이 보관한다.
+- 월드 상태 dict (WorldMemory.state 참조, 메모리는 상태를 제자리 수정하지 않으므로 복사 불필요)
+- PyBullet saveState 스냅샷 + 바디 배치(obj_id → body)와 장면 diff 기준(last)
+
+되감기/분기 시 바디 배치가 스냅샷 때와 같으면 restoreState 한 번(수 ms 미만)으로
+물리 상태를 되돌리고 장면의 diff 기준도 맞춰서, 다음 턴이 재생성/재시뮬 없이 바로 이어진다.
+배치가 달라졌으면 (restoreState는 바디 수가 같아야 함) 메모리만 되돌리고
+다음 시뮬레이션의 scene.sync가 상태 dict에서 장면을 다시 맞춘다.
+
+버퍼는 capacity개를 넘으면 가장 오래된 스냅샷부터 버리고 removeState로 해제한다.
+"""
+import copy
+import sys
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+from .memory_engine import WorldMemory
+
+
+class SnapshotRing:
+    """(branch, turn) 단위 스냅샷을 capacity개까지 보관하는 링 버퍼"""
+
+    def __init__(self, capacity: int = 16, physics: bool = True):
+        self.capacity = max(1, int(capacity))
+        self.physics = physics  # False면 saveState 없이 상태 dict만 보관
+        self._ring = deque()
+
+    def __len__(self):
+        return len(self._ring)
+
+    def capture(self, branch: str, turn: int, state: Dict[str, Any],
+                physics_client: Optional[int] = None) -> Dict[str, Any]:
+        """현재 물리 상태를 스냅샷으로 남김 (physics_client가 없거나 끊겼으면 상태 dict만)"""
+        snap = {"branch": branch, "turn": turn, "state": state,
+                "cid": None, "scene": None, "state_id": None, "bodies": {}, "last": {}}
+        if self.physics and physics_client is not None:
+            import pybullet as p
+            from .physics_pybullet import scene_for
+
+            scene = scene_for(physics_client)
+            if scene is not None and p.isConnected(physics_client):
+                snap.update(
+                    cid=physics_client,
+                    scene=scene,
+                    state_id=p.saveState(physicsClientId=physics_client),
+                    bodies={k: m["body"] for k, m in scene.bodies.items()},
+                    last={k: m["last"] for k, m in scene.bodies.items()},
+                )
+
+        # 같은 (branch, turn)을 다시 찍으면 (되감기 직후 등) 예전 것은 교체
+        old = self.find(branch, turn)
+        if old is not None:
+            self._ring.remove(old)
+            self._release(old)
+        self._ring.append(snap)
+        while len(self._ring) > self.capacity:
+            self._release(self._ring.popleft())
+        return snap
+
+    def find(self, branch: str, turn: int) -> Optional[Dict[str, Any]]:
+        for snap in self._ring:
+            if snap["branch"] == branch and snap["turn"] == turn:
+                return snap
+        return None
+
+    def latest(self, branch: str) -> Optional[Dict[str, Any]]:
+        for snap in reversed(self._ring):
+            if snap["branch"] == branch:
+                return snap
+        return None
+
+    def turns(self, branch: str) -> List[int]:
+        return [s["turn"] for s in self._ring if s["branch"] == branch]
+
+    def restore_physics(self, snap: Dict[str, Any]) -> bool:
+        """바디 배치가 그대로면 restoreState로 물리 상태를 되돌리고 True"""
+        if snap["state_id"] is None:
+            return False
+        import pybullet as p
+        from .physics_pybullet import scene_for
+
+        cid, scene = snap["cid"], snap["scene"]
+        if not p.isConnected(cid) or scene_for(cid) is not scene:
+            return False  # 연결이 끊겼거나 장면이 새로 만들어짐 → 예전 state id는 무효
+        if {k: m["body"] for k, m in scene.bodies.items()} != snap["bodies"]:
+            return False
+
+        p.restoreState(stateId=snap["state_id"], physicsClientId=cid)
+        for obj_id, meta in scene.bodies.items():
+            meta["last"] = snap["last"].get(obj_id)
+            meta["dyn"] = None  # 마찰/반발은 다음 sync에서 상태 dict 기준으로 다시 적용
+        return True
+
+    def _release(self, snap: Dict[str, Any]):
+        if snap["state_id"] is None:
+            return
+        import pybullet as p
+
+        if p.isConnected(snap["cid"]):
+            try:
+                p.removeState(snap["state_id"], physicsClientId=snap["cid"])
+            except Exception:
+                pass
+        snap["state_id"] = None
+
+    def clear(self):
+        while self._ring:
+            self._release(self._ring.popleft())
+
+
+class Timeline:
+    """활성 WorldMemory와 분기들을 묶어 되감기(rewind) / 분기(fork) / 전환(switch)을 제공
+
+    분기는 메인 메모리 파일 옆 <stem>.<name>.json (+ 저널)에 따로 저장되며,
+    분기 시점의 턴 번호를 이어받는다.
+    """
+
+    MAIN = "main"
+
+    def __init__(self, memory: WorldMemory, capacity: int = 16, physics: bool = True):
+        self.ring = SnapshotRing(capacity, physics)
+        self.branches: Dict[str, WorldMemory] = {self.MAIN: memory}
+        self.branch = self.MAIN
+
+    @property
+    def memory(self) -> WorldMemory:
+        return self.branches[self.branch]
+
+    def capture(self, physics_client: Optional[int] = None) -> Dict[str, Any]:
+        """턴이 끝난 직후 호출: 활성 분기의 현재 턴을 스냅샷"""
+        memory = self.memory
+        return self.ring.capture(self.branch, memory.turn, memory.state, physics_client)
+
+    def _snapshot(self, turn: Optional[int]) -> Dict[str, Any]:
+        turn = self.memory.turn if turn is None else turn
+        snap = self.ring.find(self.branch, turn)
+        if snap is None:
+            raise KeyError(f"turn {turn} 스냅샷이 없습니다 (보관 중: {self.ring.turns(self.branch)})")
+        return snap
+
+    def rewind(self, turn: int) -> bool:
+        """활성 분기를 turn 시점으로 되돌림 (새 턴으로 기록). 물리까지 복원했으면 True"""
+        snap = self._snapshot(turn)
+        memory = self.memory
+        memory.restore(copy.deepcopy(snap["state"]))
+        restored = self.ring.restore_physics(snap)
+        self.ring.capture(self.branch, memory.turn, memory.state, snap["cid"] if restored else None)
+        return restored
+
+    def fork(self, name: str, turn: Optional[int] = None) -> bool:
+        """turn 시점(기본: 현재)에서 새 분기를 만들고 활성화. 물리까지 복원했으면 True"""
+        if name in self.branches:
+            raise ValueError(f"이미 있는 분기입니다: {name}")
+        snap = self._snapshot(turn)
+        main = self.branches[self.MAIN]
+        path = main.path.with_name(f"{main.path.stem}.{name}{main.path.suffix}")
+        if path.exists() or WorldMemory.journal_path_for(path).exists():
+            # 이전 세션(reset 없이 종료)이 남긴 같은 이름의 분기 → 그 기록은 이어받지 않음
+            print(f"[WARN] 이전 분기 기록을 지우고 새로 시작합니다: {path.name}", file=sys.stderr)
+        # max_journal_bytes=0: 아래 save()가 저널을 분기 스냅샷 한 줄로 압축
+        # → 남아 있던 기록이나 빈 초기 스냅샷이 state_at/undo로 재생되지 않음
+        branch = WorldMemory(str(path), max_journal_bytes=0)
+        branch.state = copy.deepcopy(snap["state"])
+        branch.turn = snap["turn"]
+        branch.save()
+        branch.max_journal_bytes = main.max_journal_bytes
+
+        self.branches[name] = branch
+        self.branch = name
+        restored = self.ring.restore_physics(snap)
+        self.ring.capture(name, branch.turn, branch.state, snap["cid"] if restored else None)
+        return restored
+
+    def switch(self, name: str) -> bool:
+        """다른 분기로 전환 (그 분기의 최신 스냅샷이 있으면 물리도 복원)"""
+        if name not in self.branches:
+            raise KeyError(f"없는 분기입니다: {name} (분기: {list(self.branches)})")
+        self.branch = name
+        snap = self.ring.latest(name)
+        if snap is None or snap["turn"] != self.memory.turn:
+            return False
+        return self.ring.restore_physics(snap)
+
+    def reset(self):
+        """모든 분기 메모리 파일과 스냅샷 정리 (메인은 호출한 쪽이 reset)"""
+        self.ring.clear()
+        for name, memory in list(self.branches.items()):
+            if name != self.MAIN:
+                memory.reset()
+                del self.branches[name]
+        self.branch = self.MAIN
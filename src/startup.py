@@ -0,0 +1,39 @@
+# src/startup.py
+"""시작 시간 측정 (--profile-startup)
+
+무거운 하위 시스템(OpenAI SDK, PyBullet 등)은 처음 쓸 때 초기화되므로,
+각 초기화 구간을 timed()로 감싸 두면 언제 얼마나 걸렸는지 report()로 볼 수 있다.
+"""
+import sys
+import time
+from contextlib import contextmanager
+from typing import List, Tuple
+
+_T0 = time.perf_counter()  # 이 모듈이 처음 import된 시점 (CLI에서는 가장 먼저 import)
+_EVENTS: List[Tuple[str, float, float]] = []  # (이름, 시작 시점, 소요 시간)
+
+# 로드 여부를 보고할 무거운 모듈
+HEAVY_MODULES = ("openai", "pybullet", "numpy", "pydantic", "tiktoken")
+
+
+@contextmanager
+def timed(name: str):
+    """구간 소요 시간을 기록"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _EVENTS.append((name, start - _T0, time.perf_counter() - start))
+
+
+def elapsed_ms() -> float:
+    return (time.perf_counter() - _T0) * 1000.0
+
+
+def report() -> str:
+    lines = [f"[INFO] 시작 시간 프로파일 (기준 시점부터 {elapsed_ms():.1f} ms)"]
+    for name, at, dur in _EVENTS:
+        lines.append(f"  +{at * 1000.0:8.1f} ms  {name:<24} {dur * 1000.0:8.1f} ms")
+    loaded = [m for m in HEAVY_MODULES if m in sys.modules]
+    lines.append(f"  로드된 무거운 모듈: {', '.join(loaded) if loaded else '(없음)'}")
+    return "\n".join(lines)
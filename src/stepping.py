@@ -0,0 +1,54 @@
+# src/stepping.py
+import numpy as np
+
+
+class RestDetector:
+    """모든 동적 바디가 일정 시간(settle_time) 동안 멈춰 있으면 정지로 판정
+
+    선속도 크기 < linear_tol 그리고 각속도 크기 < angular_tol 인 상태가
+    settle_time(초) 이상 연속되면 True.
+    """
+
+    def __init__(self, linear_tol: float = 0.01, angular_tol: float = 0.05, settle_time: float = 0.5):
+        self.linear_tol = linear_tol
+        self.angular_tol = angular_tol
+        self.settle_time = settle_time
+        self.quiet_for = 0.0  # 연속으로 정지 상태였던 시간
+
+    def update(self, lin_vel: np.ndarray, ang_vel: np.ndarray, dynamic: np.ndarray, dt: float) -> bool:
+        if not dynamic.any():
+            return True  # 움직일 수 있는 바디가 없음
+        lin = np.sqrt(np.einsum("ij,ij->i", lin_vel[dynamic], lin_vel[dynamic]))
+        ang = np.sqrt(np.einsum("ij,ij->i", ang_vel[dynamic], ang_vel[dynamic]))
+        if (lin < self.linear_tol).all() and (ang < self.angular_tol).all():
+            self.quiet_for += dt
+        else:
+            self.quiet_for = 0.0
+        return self.quiet_for >= self.settle_time
+
+
+class AdaptiveTimeStep:
+    """충돌 없는 탄도 비행 구간은 큰 스텝, 접촉 근처에서는 기본 스텝
+
+    - 직전 스텝에 접촉점이 있으면 → 기본 스텝(base_dt)
+    - 어떤 바디든 큰 스텝 두 번 안에 바닥(z=0)에 닿을 수 있으면 → 기본 스텝
+    - 그 외(모두 공중에서 자유 비행) → base_dt * coarse_factor
+    바디끼리의 근접은 접촉점이 생긴 다음 스텝부터 반영된다.
+    """
+
+    def __init__(self, base_dt: float, coarse_factor: float = 4.0, gravity_z: float = -9.81):
+        self.base_dt = base_dt
+        self.coarse_dt = base_dt * coarse_factor
+        horizon = 2.0 * self.coarse_dt
+        self.horizon = horizon
+        self.fall_margin = 0.5 * max(-gravity_z, 0.0) * horizon ** 2  # 중력으로 더 떨어지는 거리
+
+    def choose(self, contact_count: int, heights: np.ndarray, vz: np.ndarray) -> float:
+        if contact_count > 0 or not len(heights):
+            return self.base_dt
+        # 큰 스텝 두 번 동안 떨어질 수 있는 거리보다 바닥이 가까우면 기본 스텝
+        falling = np.maximum(-vz, 0.0)
+        reach = heights - falling * self.horizon - self.fall_margin
+        if (reach <= 0.0).any():
+            return self.base_dt
+        return self.coarse_dt
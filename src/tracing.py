@@ -0,0 +1,147 @@
+# src/tracing.py
+"""턴 단계별 지연 측정 (이름 붙은 span) + 메트릭 내보내기
+
+- tracer.span("llm") 으로 구간을 감싸거나, 긴 구간은 start()/stop()으로 측정
+- tracer.count("llm.prompt_tokens", n) 으로 토큰 수 / 스텝 수 같은 카운터 누적
+- end_turn()이 한 턴의 기록을 JSON lines 파일에 한 줄로 추가하고 누적 합계를 갱신
+- write_prometheus()가 누적 합계를 Prometheus 텍스트 형식으로 저장 (스크레이프용)
+
+모듈 전역 tracer(get_tracer)는 기본으로 꺼져 있으며, 꺼진 상태에서는
+span()이 공유 nullcontext를 돌려주고 count()/start()는 바로 반환하므로 비용이 거의 없다.
+"""
+import json
+import os
+import re
+import time
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+_NULL = nullcontext()
+
+
+class Tracer:
+    def __init__(self, enabled: bool = True, jsonl_path=None, prometheus_path=None, prefix: str = "lwm"):
+        self.enabled = enabled
+        self.jsonl_path = Path(jsonl_path) if jsonl_path else None
+        self.prometheus_path = Path(prometheus_path) if prometheus_path else None
+        self.prefix = prefix
+        self.turn = 0
+        self._spans: Dict[str, float] = {}     # 현재 턴: 이름 → 초
+        self._counters: Dict[str, float] = {}  # 현재 턴: 이름 → 값
+        self._turn_start: Optional[float] = None
+        # 전체 누적 (Prometheus)
+        self.span_sum: Dict[str, float] = {}
+        self.span_count: Dict[str, int] = {}
+        self.counter_total: Dict[str, float] = {}
+
+    # --- 측정 ---
+    def start(self, name: str):
+        if not self.enabled:
+            return None
+        return name, time.perf_counter()
+
+    def stop(self, token):
+        if token is None:
+            return
+        name, t0 = token
+        self._spans[name] = self._spans.get(name, 0.0) + (time.perf_counter() - t0)
+
+    def add(self, name: str, seconds: float):
+        """다른 곳(예: 다른 턴과 겹쳐 돈 비동기 작업)에서 잰 시간을 현재 턴의 span에 더함"""
+        if self.enabled:
+            self._spans[name] = self._spans.get(name, 0.0) + seconds
+
+    def span(self, name: str):
+        if not self.enabled:
+            return _NULL
+        return self._span(name)
+
+    @contextmanager
+    def _span(self, name: str):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._spans[name] = self._spans.get(name, 0.0) + (time.perf_counter() - t0)
+
+    def count(self, name: str, value: float = 1):
+        if self.enabled and value:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    # --- 턴 단위 기록 ---
+    def begin_turn(self):
+        if not self.enabled:
+            return
+        self._spans, self._counters = {}, {}
+        self._turn_start = time.perf_counter()
+
+    def end_turn(self, **fields) -> Optional[Dict[str, Any]]:
+        """현재 턴 기록을 확정 (JSON lines 추가 + 누적 갱신). 기록 dict 반환"""
+        if not self.enabled or self._turn_start is None:
+            return None
+        self.turn += 1
+        total = time.perf_counter() - self._turn_start
+        record = {
+            "turn": self.turn,
+            "ts": time.time(),
+            "total_ms": round(total * 1000.0, 3),
+            "spans_ms": {k: round(v * 1000.0, 3) for k, v in self._spans.items()},
+            "counters": dict(self._counters),
+        }
+        record.update(fields)
+
+        spans = dict(self._spans, turn=total)
+        for k, v in spans.items():
+            self.span_sum[k] = self.span_sum.get(k, 0.0) + v
+            self.span_count[k] = self.span_count.get(k, 0) + 1
+        for k, v in self._counters.items():
+            self.counter_total[k] = self.counter_total.get(k, 0) + v
+        self._turn_start = None
+
+        if self.jsonl_path is not None:
+            self.jsonl_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.jsonl_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+        if self.prometheus_path is not None:
+            self.write_prometheus(self.prometheus_path)
+        return record
+
+    # --- 내보내기 ---
+    def _metric(self, name: str) -> str:
+        return re.sub(r"[^a-zA-Z0-9_]", "_", f"{self.prefix}_{name}")
+
+    def prometheus_text(self) -> str:
+        stage = self._metric("stage_seconds")
+        lines = [f"# HELP {stage} Time spent per turn stage.", f"# TYPE {stage} summary"]
+        for k in sorted(self.span_sum):
+            lines.append(f'{stage}_sum{{stage="{k}"}} {self.span_sum[k]:.6f}')
+            lines.append(f'{stage}_count{{stage="{k}"}} {self.span_count[k]}')
+        lines.append(f"# TYPE {self._metric('turns_total')} counter")
+        lines.append(f"{self._metric('turns_total')} {self.turn}")
+        for k in sorted(self.counter_total):
+            metric = self._metric(f"{k}_total")
+            lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric} {self.counter_total[k]}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(self.prometheus_text(), encoding="utf-8")
+        os.replace(tmp, path)  # 스크레이퍼가 반쯤 쓴 파일을 읽지 않도록
+
+
+_TRACER = Tracer(enabled=False)
+
+
+def get_tracer() -> Tracer:
+    """현재 전역 tracer (기본: 꺼짐)"""
+    return _TRACER
+
+
+def set_tracer(tracer: Tracer) -> Tracer:
+    global _TRACER
+    _TRACER = tracer
+    return tracer
@@ -0,0 +1,144 @@
+# src/trajectory.py
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+_BYTES_PER_BODY_SAMPLE = (3 + 4 + 3) * 4  # position + orientation + velocity (float32)
+
+
+class TrajectoryRecorder:
+    """스텝별 위치/자세/속도를 미리 할당한 NumPy 배열에 기록하는 궤적 기록기
+
+    - decimation 스텝마다 한 번씩 기록
+    - 버퍼가 가득 차면 샘플을 하나 걸러 하나씩 남기고 decimation을 두 배로 늘림
+      → 시뮬 길이와 상관없이 메모리 사용량은 max_samples × 바디 수로 고정
+    - max_bytes로 바디 수가 많을 때의 전체 버퍼 크기도 제한
+    - 마지막 프레임은 finish()로 기록 → 압축 주기와 어긋나도 항상 남음
+    static: 정적(질량 0) 바디 표시 (궤적 통계에서 제외)
+    """
+
+    def __init__(self, object_ids: List[str], rest_heights, decimation: int = 1,
+                 max_samples: int = 2000, max_bytes: int = 64 * 1024 * 1024, static=None):
+        n = len(object_ids)
+        by_budget = max_bytes // max(1, n * _BYTES_PER_BODY_SAMPLE)
+        capacity = int(max(2, min(max_samples, by_budget)))
+        capacity -= capacity % 2  # 반으로 압축할 수 있도록 짝수
+
+        self.object_ids = list(object_ids)
+        self.rest_height = np.asarray(rest_heights, dtype=np.float32)  # 바닥에 놓였을 때 중심 높이
+        self.static = np.zeros(n, dtype=bool) if static is None else np.asarray(static, dtype=bool)
+        self.decimation = max(1, int(decimation))
+        self.capacity = capacity
+        self.count = 0
+        self.last_step = -1
+
+        self.t = np.empty(capacity, dtype=np.float64)
+        self.position = np.empty((capacity, n, 3), dtype=np.float32)
+        self.orientation = np.empty((capacity, n, 4), dtype=np.float32)
+        self.velocity = np.empty((capacity, n, 3), dtype=np.float32)
+
+    def due(self, step: int) -> bool:
+        """이번 스텝을 기록해야 하는지"""
+        return step % self.decimation == 0
+
+    def record(self, step: int, sim_time: float, position, orientation, velocity, force: bool = False):
+        """force=True면 버퍼를 압축한 뒤 새 주기와 어긋나도 기록 (마지막 프레임용)"""
+        if self.count == self.capacity:
+            self._compact()
+            if not (force or self.due(step)):
+                return
+        i = self.count
+        self.t[i] = sim_time
+        self.position[i] = position
+        self.orientation[i] = orientation
+        self.velocity[i] = velocity
+        self.count += 1
+        self.last_step = step
+
+    def _compact(self):
+        """짝수 번째 샘플만 남기고 decimation 두 배"""
+        half = self.count // 2
+        for arr in (self.t, self.position, self.orientation, self.velocity):
+            arr[:half] = arr[0:self.count:2]
+        self.count = half
+        self.decimation *= 2
+        self.last_step = -1  # 가득 찬 버퍼(짝수 개)의 마지막 샘플은 항상 버려짐
+
+    def finish(self, step: int, sim_time: float, position, orientation, velocity):
+        """마지막 프레임 기록 (이미 기록했으면 생략)"""
+        if self.last_step != step:
+            self.record(step, sim_time, position, orientation, velocity, force=True)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """기록된 구간만 잘라서 반환 (복사 없이 view)"""
+        n = self.count
+        return {
+            "object_ids": self.object_ids,
+            "rest_height": self.rest_height,
+            "static": self.static,
+            "decimation": self.decimation,
+            "t": self.t[:n],
+            "position": self.position[:n],
+            "orientation": self.orientation[:n],
+            "velocity": self.velocity[:n],
+        }
+
+    def save(self, path) -> Path:
+        """.npz 파일로 저장"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = self.to_dict()
+        np.savez(path, **{**data, "object_ids": np.array(data["object_ids"])})
+        return path
+
+
+def load_trajectory(path) -> Dict[str, Any]:
+    """save()로 저장한 궤적을 다시 읽기"""
+    with np.load(path) as f:
+        data = {k: f[k] for k in f.files}
+    data["object_ids"] = [str(s) for s in data["object_ids"]]
+    data["decimation"] = int(data["decimation"])
+    data.setdefault("static", np.zeros(len(data["object_ids"]), dtype=bool))  # static 이전에 저장한 파일
+    return data
+
+
+def trajectory_stats(traj: Dict[str, Any], contact_margin: float = 0.02,
+                     bounce_speed: float = 0.1) -> Dict[str, Dict[str, float]]:
+    """궤적에서 객체별 최고 높이, 이동 거리, 체공 시간, 바운스 횟수를 계산
+
+    - 체공: 바닥과의 간격(z - rest_height)이 contact_margin보다 큰 구간
+    - 바운스: 바닥 근처에서 수직 속도가 -bounce_speed 이하 → +bounce_speed 이상으로 바뀐 횟수
+    - 정적(static) 바디는 움직이지 않으므로 제외
+    """
+    t = np.asarray(traj["t"], dtype=float)
+    pos = np.asarray(traj["position"], dtype=float)
+    vel = np.asarray(traj["velocity"], dtype=float)
+    rest = np.asarray(traj["rest_height"], dtype=float)
+    static = np.asarray(traj.get("static", np.zeros(len(traj["object_ids"]))), dtype=bool)
+    stats = {}
+    if len(t) == 0:
+        return stats
+
+    dt = np.diff(t)
+    z = pos[:, :, 2]
+    clearance = z - rest[None, :]
+    seg = np.linalg.norm(np.diff(pos, axis=0), axis=2)   # (샘플-1, 바디)
+    aloft = (clearance[:-1] > contact_margin) & (clearance[1:] > contact_margin)
+
+    vz = vel[:, :, 2]
+    # 샘플 간격 동안 움직일 수 있는 거리만큼 바닥 근처 판정 범위를 넓힘 (decimation 대응)
+    reach = np.maximum(np.abs(vz[:-1]), np.abs(vz[1:])) * dt[:, None]
+    near_ground = np.minimum(clearance[:-1], clearance[1:]) < contact_margin + reach
+    bounced = (vz[:-1] <= -bounce_speed) & (vz[1:] >= bounce_speed) & near_ground
+
+    for j, obj_id in enumerate(traj["object_ids"]):
+        if static[j]:
+            continue
+        stats[obj_id] = {
+            "max_height": float(z[:, j].max()),
+            "distance": float(seg[:, j].sum()),
+            "time_aloft": float(dt[aloft[:, j]].sum()),
+            "bounces": int(bounced[:, j].sum()),
+        }
+    return stats
@@ -0,0 +1,77 @@
+# src/turn_pipeline.py
+"""한 턴(명령 → 월드 → 메모리 → 시뮬 → 결과 반영)을 이루는 단계 함수들
+
+run_cli의 동기 루프와 비동기 파이프라인이 같은 단계를 공유한다.
+"""
+from typing import Any, Dict, Union
+
+from .llm_parser import map_action_to_physics
+from .memory_engine import WorldMemory
+from .tracing import get_tracer
+from .types import World
+
+
+def apply_actions(world: World) -> World:
+    """actions를 물리 파라미터(속도/각속도/마찰/반발)로 객체에 반영 (모델을 제자리에서 수정)"""
+    obj_map = {o.id: o for o in world.objects}
+
+    for act in world.actions:
+        obj = obj_map.get(act.target_id) if act.target_id else None
+        spec = {"cross_section": obj.cross_section, "mass": obj.initial_state.mass,
+                "velocity": obj.initial_state.velocity} if obj else {}
+        phys = map_action_to_physics(act.model_dump(), spec)
+
+        # 대상이 없는 환경 액션(vacuum 등)도 여기서 모아 두고 메모리 병합 때 반영
+        if "_env_update" in phys:
+            world._env_update.update(phys["_env_update"])
+        if obj is None:
+            continue
+
+        if "velocity" in phys:
+            obj.initial_state.velocity = [float(v) for v in phys["velocity"]]
+        if "angular_velocity" in phys:
+            obj.initial_state.angular_velocity = [float(v) for v in phys["angular_velocity"]]
+
+        # 마찰/반발 등은 객체 필드로 (PyBullet changeDynamics까지 전달됨)
+        for k in ("restitution", "friction", "rolling_friction"):
+            if k in phys:
+                setattr(obj, k, float(phys[k]))
+
+    return world
+
+
+def prepare_world(new_world: Union[World, Dict[str, Any]]) -> World:
+    """LLM이 만든 world를 (dict면 한 번 검증/정제해서) 모델로 만들고 액션을 반영"""
+    if not isinstance(new_world, World):
+        new_world = World.model_validate(new_world)
+    return apply_actions(new_world)
+
+
+def merge_into_memory(memory: WorldMemory, new_world: Union[World, Dict[str, Any]]):
+    """논리 월드를 메모리에 누적하고 (World 모델, 누적 상태 dict)를 반환
+
+    World 모델은 다시 검증하지 않고 객체 단위로 병합한다 (바뀐 객체만 dict로 변환해 저널 기록).
+    dict가 오면 예전처럼 병합 후 검증하며, 실패 시 pydantic ValidationError를 그대로 올린다.
+    """
+    tracer = get_tracer()
+    if isinstance(new_world, World):
+        with tracer.span("memory.write"):
+            world = memory.apply_world(new_world)
+        return world, memory.state
+
+    with tracer.span("memory.write"):
+        updated = memory.apply_update(new_world)
+    with tracer.span("validate"):
+        world = World.model_validate(updated)
+    return world, updated
+
+
+def commit_result(memory: WorldMemory, sim_out: Dict[str, Any]):
+    """물리 시뮬레이션 결과를 다음 턴의 world_state로 반영"""
+    final_state = sim_out.get("final_state")
+    if final_state is not None:
+        with get_tracer().span("memory.write"):
+            # 바뀐 부분만 저널에 추가 (전체 재저장 없음)
+            # 시뮬레이션이 제자리에서 갱신한 World 모델도 넘겨 다음 턴에 재검증 없이 재사용
+            memory.commit(final_state, world=sim_out.get("world"))
+    return final_state
@@ -1,35 +1,238 @@
-from pydantic import BaseModel, Field
+import math
+
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr, field_validator, model_validator
 from typing import List, Literal, Optional
 
 
+# ✅ 정제 규칙 (예전 sanitize_world_state와 동일): 길이가 맞지 않으면 기본값, None 원소는 0.0
+#    위치/속도/중력/풍향은 2D 월드용 2성분 벡터도 받고, World 검증 때 dimensions에 맞춤
+def _fix_vector(v, default, size=3):
+    sizes = (size,) if isinstance(size, int) else size
+    if not isinstance(v, (list, tuple)) or len(v) not in sizes:
+        return list(default)
+    return [float(x) if x is not None else 0.0 for x in v]
+
+
+def _to_dims(v, ndim: int, default):
+    """벡터를 월드 차원에 맞춤: 2D면 3D 벡터를 x–z 평면(z가 위)으로 투영, 3D면 길이가 다를 때 기본값"""
+    if v is None or len(v) == ndim:
+        return v
+    if ndim == 2 and len(v) == 3:
+        return [v[0], v[2]]
+    return list(default)
+
+
+def _fix_float(v, default):
+    return default if v is None else v
+
+
 class InitialState(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
     position: List[float] = Field(default_factory=lambda: [0.0, 0.0, 0.0])
     velocity: List[float] = Field(default_factory=lambda: [0.0, 0.0, 0.0])
+    angular_velocity: Optional[List[float]] = None  # None이면 지정 안 됨 (공은 굴림 각속도 자동)
     mass: float = 1.0
     orientation: List[float] = Field(default_factory=lambda: [0.0, 0.0, 0.0, 1.0])  # ✅ 기본 회전값 (쿼터니언)
 
+    @field_validator("position", "velocity", mode="before")
+    @classmethod
+    def _vec3(cls, v):
+        return _fix_vector(v, [0.0, 0.0, 0.0], size=(2, 3))
+
+    @field_validator("angular_velocity", mode="before")
+    @classmethod
+    def _ang(cls, v):
+        return None if v is None else _fix_vector(v, [0.0, 0.0, 0.0])
+
+    @field_validator("orientation", mode="before")
+    @classmethod
+    def _quat(cls, v):
+        return _fix_vector(v, [0.0, 0.0, 0.0, 1.0], size=4)
+
+    @field_validator("mass", mode="before")
+    @classmethod
+    def _mass(cls, v):
+        return _fix_float(v, 1.0)
+
 
 class WorldObject(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
     id: str
     type: Literal["ball", "box", "plane", "table", "sphere"] = "ball"
-    initial_state: InitialState
+    initial_state: InitialState = Field(default_factory=InitialState)
+    cross_section: float = 0.0314  # m² (공 반지름 ≈ 0.1 m)
+    friction: float = 0.6
+    restitution: float = 0.3
+    rolling_friction: Optional[float] = None  # None이면 PyBullet 기본 보정값 사용
+    size: Optional[List[float]] = None  # 박스/테이블 크기 (2D: [폭, 높이]), None이면 cross_section으로 정함
+
+    @model_validator(mode="before")
+    @classmethod
+    def _properties(cls, data):
+        """samples/initial_world.json 형식(properties / static)을 평평한 필드로 옮김
+
+        radius → cross_section(π r²), mass → initial_state.mass, static: true → 질량 0(정적).
+        이미 최상위에 있는 값이 우선이고, 모르는 properties 키는 그대로 남긴다.
+        """
+        if not isinstance(data, dict) or ("properties" not in data and "static" not in data):
+            return data
+        data = dict(data)
+        props = dict(data.pop("properties", None) or {})
+        state = dict(data.get("initial_state") or {})
+        radius = props.pop("radius", None)
+        if radius is not None:
+            data.setdefault("cross_section", math.pi * float(radius) ** 2)
+        if "mass" in props:
+            state.setdefault("mass", props.pop("mass"))
+        for k in ("friction", "restitution", "rolling_friction", "size"):
+            if k in props:
+                data.setdefault(k, props.pop(k))
+        if data.pop("static", False):
+            state["mass"] = 0.0
+        data["initial_state"] = state
+        if props:
+            data["properties"] = props
+        return data
+
+    @field_validator("initial_state", mode="before")
+    @classmethod
+    def _init(cls, v):
+        return {} if v is None else v
+
+    @field_validator("cross_section", "friction", "restitution", mode="before")
+    @classmethod
+    def _defaults(cls, v, info):
+        return _fix_float(v, cls.model_fields[info.field_name].default)
+
+
+class Wind(BaseModel):
+    direction: List[float] = Field(default_factory=lambda: [0.0, 0.0, 0.0])
+    strength: float = 0.0
+
+    @field_validator("direction", mode="before")
+    @classmethod
+    def _vec3(cls, v):
+        return _fix_vector(v, [0.0, 0.0, 0.0], size=(2, 3))
+
+    @field_validator("strength", mode="before")
+    @classmethod
+    def _strength(cls, v):
+        return float(_fix_float(v, 0.0))
+
 
 class Environment(BaseModel):
-    gravity: List[float] = [0.0, 0.0, -9.81]
-    wind: dict = Field(default_factory=lambda: {"direction": [1.0, 0.0, 0.0], "strength": 0.0})
-    time_step: float = 0.01
-    duration: float = 5.0
+    model_config = ConfigDict(extra="allow")
 
-class World(BaseModel):
-    objects: List[WorldObject]
-    environment: Environment
-    
-class WorldEnvironment(BaseModel):
+    # "3D": PyBullet (z가 위), "2D": pymunk (x–z 평면을 [x, y]로, y가 위)
+    dimensions: Literal["2D", "3D"] = "3D"
     gravity: List[float] = Field(default_factory=lambda: [0.0, 0.0, -9.81])
-    wind: dict = Field(default_factory=lambda: {"direction": [0, 0, 0], "strength": 0.0})
-    temperature: float = 25.0
+    wind: Wind = Field(default_factory=Wind)
+    temperature: float = 298.0        # K
+    pressure: float = 101325.0        # Pa
+    air_density: float = 1.225        # kg/m³
+    drag_coefficient: float = 0.47
     humidity: float = 0.5
-    air_density: float = 1.225  # kg/m³, default Earth atmosphere
-    drag_coefficient: float = 0.47  # default sphere drag coefficient
     time_step: float = 0.01
-    duration: float = 5.0
\ No newline at end of file
+    duration: float = 5.0
+
+    @field_validator("dimensions", mode="before")
+    @classmethod
+    def _dimensions(cls, v):
+        return "3D" if v is None else str(v).upper()
+
+    @field_validator("gravity", mode="before")
+    @classmethod
+    def _gravity(cls, v):
+        return _fix_vector(v, [0.0, 0.0, -9.81], size=(2, 3))
+
+    @property
+    def ndim(self) -> int:
+        return 2 if self.dimensions == "2D" else 3
+
+    @field_validator("wind", mode="before")
+    @classmethod
+    def _wind(cls, v):
+        return {} if v is None else v
+
+    @field_validator("temperature", "pressure", "air_density", "drag_coefficient", "humidity",
+                     "time_step", "duration", mode="before")
+    @classmethod
+    def _defaults(cls, v, info):
+        return _fix_float(v, cls.model_fields[info.field_name].default)
+
+
+class Action(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    type: str = ""
+    target_id: Optional[str] = None
+    direction: List[float] = Field(default_factory=lambda: [0.0, 0.0, 0.0])
+    magnitude: float = 1.0
+
+    @field_validator("direction", mode="before")
+    @classmethod
+    def _vec3(cls, v):
+        return _fix_vector(v, [0.0, 0.0, 0.0])
+
+    @field_validator("magnitude", mode="before")
+    @classmethod
+    def _magnitude(cls, v):
+        return _fix_float(v, 1.0)
+
+
+class World(BaseModel):
+    """검증과 정제를 한 번에 하는 월드 모델 (model_validate 한 번이 곧 sanitize)"""
+    model_config = ConfigDict(extra="allow")
+
+    objects: List[WorldObject] = Field(default_factory=list)
+    environment: Environment = Field(default_factory=Environment)
+    actions: List[Action] = Field(default_factory=list)
+    # 액션이 만든 환경 변경 (vacuum 등). 메모리 병합 때 누적 환경 위에 적용
+    _env_update: dict = PrivateAttr(default_factory=dict)
+
+    @field_validator("objects", "actions", mode="before")
+    @classmethod
+    def _lists(cls, v):
+        return [] if v is None else v
+
+    @field_validator("environment", mode="before")
+    @classmethod
+    def _env(cls, v):
+        return {} if v is None else v
+
+    @model_validator(mode="after")
+    def _match_dimensions(self):
+        # environment가 없는 초안(LLM/fast path)은 차원을 모르므로 그대로 두고 메모리 병합 때 맞춤
+        if "environment" in self.model_fields_set:
+            env = self.environment
+            if "dimensions" not in env.model_fields_set and len(env.gravity) == 2:
+                env.dimensions = "2D"  # 2성분 중력만 준 월드는 2D로 봄
+            conform_environment(env)
+            for obj in self.objects:
+                conform_object(obj, self.environment.ndim)
+        return self
+
+    def to_state(self) -> dict:
+        """메모리/저장용 dict (지정 안 된 선택 필드는 생략)"""
+        return self.model_dump(exclude_none=True)
+
+
+def conform_environment(env: Environment) -> Environment:
+    """중력/풍향 벡터 길이를 env.dimensions에 맞춤 (제자리 수정)"""
+    ndim = env.ndim
+    env.gravity = _to_dims(env.gravity, ndim, [0.0, -9.81] if ndim == 2 else [0.0, 0.0, -9.81])
+    env.wind.direction = _to_dims(env.wind.direction, ndim, [0.0] * ndim)
+    return env
+
+
+def conform_object(obj: WorldObject, ndim: int) -> WorldObject:
+    """위치/속도 벡터 길이를 월드 차원에 맞춤 (제자리 수정)
+
+    2D 월드의 자세(쿼터니언)와 각속도는 3D 모양 그대로 두고 평면의 법선(y축) 회전으로 해석한다.
+    """
+    state = obj.initial_state
+    state.position = _to_dims(state.position, ndim, [0.0] * ndim)
+    state.velocity = _to_dims(state.velocity, ndim, [0.0] * ndim)
+    return obj
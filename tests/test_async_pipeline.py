@@ -0,0 +1,37 @@
+import asyncio
+import json
+
+from src.async_pipeline import AsyncTurnPipeline
+from src.fast_path import FastPathMatcher
+from src.memory_engine import WorldMemory
+from src.tracing import Tracer
+
+WORLD = {"environment": {"duration": 1.0},
+         "objects": [{"id": "ball_1", "type": "ball",
+                      "initial_state": {"position": [0.0, 0.0, 0.1], "velocity": [0.0, 0.0, 0.0], "mass": 0.45}}]}
+
+
+def test_applied_turns_are_traced(tmp_path):
+    memory = WorldMemory(str(tmp_path / "world_state.json"))
+    memory.apply_update(WORLD)
+    tracer = Tracer(jsonl_path=tmp_path / "trace.jsonl", prometheus_path=tmp_path / "metrics.prom")
+    pipeline = AsyncTurnPipeline(memory, show_gui=False, fast_path=FastPathMatcher(), tracer=tracer)
+
+    async def scenario():
+        turns = asyncio.Queue()
+        for prompt in ("throw the ball forward", "stop the ball"):
+            task = asyncio.create_task(pipeline._parse(prompt, memory.state))
+            await turns.put((prompt, pipeline.version, memory.state, task))
+        await turns.put(None)
+        await pipeline._apply_loop(turns)
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        pipeline._physics.shutdown(wait=True)
+
+    lines = [json.loads(line) for line in (tmp_path / "trace.jsonl").read_text(encoding="utf-8").splitlines()]
+    assert [r["prompt"] for r in lines] == ["throw the ball forward", "stop the ball"]
+    assert all(r["ok"] for r in lines)
+    assert {"llm", "prepare", "simulate", "commit"} <= set(lines[0]["spans_ms"])
+    assert "lwm_turns_total 2" in (tmp_path / "metrics.prom").read_text(encoding="utf-8")
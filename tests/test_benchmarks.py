@@ -0,0 +1,37 @@
+import json
+
+import pytest
+
+import run_benchmarks
+from src.benchmarks import compare
+
+RESULT = {"meta": {}, "cases": {"balls-calm-1": {"objects": 1, "steps_per_sec": 1000.0, "turn_ms": 10.0}}}
+
+
+@pytest.fixture
+def fake_suite(monkeypatch):
+    monkeypatch.setattr(run_benchmarks, "run_suite", lambda *a, **k: json.loads(json.dumps(RESULT)))
+
+
+def test_missing_baseline_fails(fake_suite, tmp_path):
+    code = run_benchmarks.main(["--baseline", str(tmp_path / "baseline.json"), "--out", str(tmp_path / "out.json")])
+    assert code != 0
+
+
+def test_no_compare_only_measures(fake_suite, tmp_path):
+    code = run_benchmarks.main(["--baseline", str(tmp_path / "baseline.json"), "--out", str(tmp_path / "out.json"),
+                                "--no-compare"])
+    assert code == 0
+
+
+def test_saved_baseline_then_compare_passes(fake_suite, tmp_path):
+    baseline = str(tmp_path / "baseline.json")
+    out = str(tmp_path / "out.json")
+    assert run_benchmarks.main(["--baseline", baseline, "--out", out, "--save-baseline"]) == 0
+    assert run_benchmarks.main(["--baseline", baseline, "--out", out]) == 0
+
+
+def test_compare_flags_slowdown():
+    slower = {"cases": {"balls-calm-1": {"steps_per_sec": 500.0, "turn_ms": 30.0}}}
+    regressions = compare(slower, RESULT, tolerance=0.25, min_delta_ms=1.0)
+    assert len(regressions) == 2
@@ -0,0 +1,50 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+
+from src.contacts import contact_stats
+from src.reporting import summarize
+from src.types import World
+
+# 0번은 바닥. ball은 먼저 box에 세게 부딪힌 뒤 바닥에 약하게 떨어짐
+CONTACTS = {
+    "names": ["ground", "ball", "box"],
+    "t": np.array([0.20, 0.50, 0.90]),
+    "pair": np.array([[1, 2], [0, 1], [0, 1]]),
+    "impulse": np.array([3.0, 0.8, 0.4]),
+    "position": np.zeros((3, 3)),
+    "dropped": 0,
+}
+
+
+def test_ground_and_object_figures_are_separate():
+    c = contact_stats(CONTACTS)["ball"]
+    assert c["ground_hits"] == 2 and c["collisions"] == ["box"]
+    assert (c["first_impact"], c["max_impulse"]) == (0.20, 3.0)
+    assert (c["ground_first_impact"], c["ground_max_impulse"]) == (0.50, 0.8)
+    assert (c["collision_first_impact"], c["collision_max_impulse"]) == (0.20, 3.0)
+
+    box = contact_stats(CONTACTS)["box"]
+    assert box["ground_hits"] == 0
+    assert box["ground_first_impact"] is None and box["ground_max_impulse"] is None
+
+
+def test_summary_prints_ground_figures_on_ground_line():
+    world = World.model_validate({"objects": [
+        {"id": "ball", "type": "ball", "initial_state": {"position": [0, 0, 0.1], "mass": 0.45}},
+        {"id": "box", "type": "box", "initial_state": {"position": [1, 0, 0.5], "mass": 1.0}},
+    ]})
+    summary = summarize({"world": world, "final_state": world.to_state(), "contacts": CONTACTS})
+    lines = summary["ball"].splitlines()
+    assert "  - 바닥 충돌: 2회 (첫 충돌 0.50 s, 최대 충격량 0.80 N·s)" in lines
+    assert "  - 충돌한 객체: box (첫 충돌 0.20 s, 최대 충격량 3.00 N·s)" in lines
+    assert "  - 바닥 충돌: 0회" in summary["box"].splitlines()
+
+
+def test_summary_does_not_load_pybullet():
+    # pymunk(2D) 실행의 요약은 PyBullet을 불러오지 않아야 함 → 새 인터프리터에서 확인
+    code = ("import sys; from tests.test_contacts import CONTACTS; from src.contacts import contact_stats; "
+            "contact_stats(CONTACTS); assert 'pybullet' not in sys.modules, 'pybullet loaded'")
+    subprocess.run([sys.executable, "-c", code], check=True, cwd=Path(__file__).resolve().parents[1])
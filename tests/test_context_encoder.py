@@ -0,0 +1,45 @@
+import importlib
+import sys
+import types
+
+from src import context_encoder, llm_parser
+from src.context_encoder import ContextEncoder
+from src.llm_cache import LLMResponseCache
+
+WORLD = {"objects": [{"id": "ball_1", "type": "ball",
+                      "initial_state": {"position": [0, 0, 1], "angular_velocity": [0.0, 0.0, 0.0]}}],
+         "environment": {}}
+
+
+def test_explicit_zero_spin_is_kept():
+    # angular_velocity None은 "자동 굴림 회전"이므로 명시된 [0,0,0]을 생략하면 물리가 바뀜
+    obj = ContextEncoder()._compact_object(WORLD["objects"][0])
+    assert obj["initial_state"]["angular_velocity"] == [0.0, 0.0, 0.0]
+
+
+def test_encoding_loaded_on_first_count(monkeypatch):
+    calls = []
+    fake = types.SimpleNamespace(get_encoding=lambda name: calls.append(name) or
+                                 types.SimpleNamespace(encode=lambda text: text.split()))
+    monkeypatch.setitem(sys.modules, "tiktoken", fake)
+    try:
+        module = importlib.reload(context_encoder)
+        assert calls == []
+        assert module.estimate_tokens("a b c") == 3
+        module.estimate_tokens("d")
+        assert calls == ["o200k_base"]
+    finally:
+        monkeypatch.delitem(sys.modules, "tiktoken")
+        importlib.reload(context_encoder)
+
+
+def test_cache_hit_clears_previous_report(tmp_path):
+    encoder = ContextEncoder()
+    encoder.encode(WORLD, "throw the ball")
+    cache = LLMResponseCache(tmp_path)
+    key = cache.make_key(llm_parser.get_system_prompt(), WORLD, "drop it", llm_parser.MODEL,
+                         llm_parser.TEMPERATURE, extra=encoder.signature)
+    cache.put(key, "{}")
+
+    llm_parser.natural_language_to_world("drop it", world_state=WORLD, cache=cache, encoder=encoder)
+    assert encoder.last_report is None
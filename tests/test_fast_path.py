@@ -0,0 +1,55 @@
+import pytest
+
+from src.fast_path import FastPathMatcher
+
+WORLD = {
+    "objects": [
+        {"id": "floor", "type": "plane"},
+        {"id": "ball_1", "type": "ball"},
+        {"id": "box_1", "type": "box"},
+        {"id": "b", "type": "table"},
+    ],
+    "environment": {},
+}
+
+
+def _target(text):
+    draft = FastPathMatcher().match(text, WORLD)
+    return None if draft is None else draft["actions"][0].get("target_id")
+
+
+@pytest.mark.parametrize("text, target", [
+    ("throw the ball forward", "ball_1"),
+    ("공 앞으로 던져", "ball_1"),
+    ("ball_1을 던져", "ball_1"),
+    ("stop the box", "box_1"),
+    ("drop b", "b"),
+])
+def test_simple_commands_resolve_one_target(text, target):
+    assert _target(text) == target
+
+
+@pytest.mark.parametrize("text", [
+    "don't throw the ball",
+    "never stop the box",
+    "공을 던지지 마",
+    "상자 멈추지 말고",
+])
+def test_negated_commands_fall_back(text):
+    assert FastPathMatcher().match(text, WORLD) is None
+
+
+@pytest.mark.parametrize("text", [
+    "throw the ball at the box",
+    "drop everything",
+    "throw ball_1 at box_1",
+    "공을 상자에 던져",
+    "모두 멈춰",
+])
+def test_multiple_objects_fall_back(text):
+    assert FastPathMatcher().match(text, WORLD) is None
+
+
+def test_vacuum_still_matches():
+    draft = FastPathMatcher().match("make it a vacuum", WORLD)
+    assert draft is not None and draft["environment"]["air_density"] == 0.0
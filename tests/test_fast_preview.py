@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from src.fast_preview import PreviewFallback, run_preview
+from src.types import World
+
+
+def _world(balls, duration=2.0, **env):
+    return World.model_validate({
+        "environment": {"duration": duration, **env},
+        "objects": [{"id": "floor", "type": "plane", "initial_state": {"position": [0, 0, 0], "mass": 0}}] + [
+            {"id": f"ball_{i}", "type": "ball", "initial_state": {"position": p, "velocity": v, "mass": 0.45}}
+            for i, (p, v) in enumerate(balls)
+        ],
+    })
+
+
+@pytest.mark.parametrize("env", [
+    {"air_density": 0.0},
+    {},
+    {"wind": {"direction": [1, 0, 0], "strength": 5.0}},
+])
+def test_free_flight_matches_pybullet(env):
+    pytest.importorskip("pybullet")
+    from src.physics_pybullet import run_simulation_pybullet
+
+    balls = [([0.0, 0.0, 60.0], [20.0, 5.0, 10.0])]
+    preview, reference = _world(balls, **env), _world(balls, **env)
+    out = run_preview(preview)
+    run_simulation_pybullet(reference, show_gui=False)
+
+    assert out["preview"]["first_impact"]["ball_0"] is None  # 2초 동안 바닥에 닿지 않음
+    a, b = preview.objects[1].initial_state, reference.objects[1].initial_state
+    assert np.linalg.norm(np.subtract(a.position, b.position)) < 5e-3
+    assert np.linalg.norm(np.subtract(a.velocity, b.velocity)) < 5e-3
+
+
+def test_balls_on_collision_course_fall_back():
+    world = _world([([0.0, 0.0, 1.0], [2.0, 0.0, 0.0]), ([3.0, 0.0, 1.0], [-2.0, 0.0, 0.0])])
+    before = world.to_state()
+    with pytest.raises(PreviewFallback):
+        run_preview(world)
+    assert world.to_state() == before
+
+
+def test_ball_at_rest_stops_early():
+    out = run_preview(_world([([0.0, 0.0, 0.1], [0.0, 0.0, 0.0])]), trajectory_decimation=1)
+    assert out["steps_simulated"] == 1
+    assert out["trajectory"]["t"][-1] == pytest.approx(0.01)
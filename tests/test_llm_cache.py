@@ -0,0 +1,10 @@
+from src.llm_cache import LLMResponseCache
+
+
+def test_hit_on_entry_written_by_another_instance(tmp_path):
+    a = LLMResponseCache(tmp_path)
+    b = LLMResponseCache(tmp_path)
+    b.put("ab" * 32, '{"objects": []}')
+
+    assert a.get("ab" * 32) == '{"objects": []}'
+    assert a.stats()["entries"] == 1 and a.stats()["bytes"] > 0
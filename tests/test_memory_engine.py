@@ -0,0 +1,31 @@
+import pytest
+
+from src.memory_engine import WorldMemory
+
+
+def _ball(z):
+    return {"objects": [{"id": "ball_1", "type": "ball", "initial_state": {"position": [0, 0, z]}}]}
+
+
+def test_undo_after_compaction_refuses_lost_turns(tmp_path):
+    memory = WorldMemory(str(tmp_path / "world_state.json"), snapshot_every=2, max_journal_bytes=200)
+    for z in range(1, 7):
+        memory.apply_update(_ball(float(z)))
+    before = (memory.turn, memory.state)
+
+    with pytest.raises(ValueError):
+        memory.state_at(2)
+    with pytest.raises(ValueError):
+        memory.undo(3)
+    assert (memory.turn, memory.state) == before  # 빈 월드가 새 턴으로 기록되지 않음
+
+    assert memory.state_at(memory.turn) == memory.state
+
+
+def test_undo_replays_from_snapshot(tmp_path):
+    memory = WorldMemory(str(tmp_path / "world_state.json"), snapshot_every=2)
+    for z in range(1, 6):
+        memory.apply_update(_ball(float(z)))
+    memory.undo(2)
+    assert memory.state["objects"][0]["initial_state"]["position"] == [0, 0, 3.0]
+    assert memory.state_at(0) == {"objects": [], "environment": {}}
@@ -0,0 +1,46 @@
+import pytest
+
+pytest.importorskip("pybullet")
+
+from src.physics_pybullet import run_simulation_pybullet
+from src.types import World
+
+
+def _dropped_box(duration=5.0, wind=0.0):
+    """무풍(또는 바람) 속에서 1 m 높이에서 떨어뜨린 상자"""
+    return World.model_validate({
+        "environment": {"duration": duration, "wind": {"direction": [1, 0, 0], "strength": wind}},
+        "objects": [{"id": "box_1", "type": "box",
+                     "initial_state": {"position": [0.0, 0.0, 1.0], "velocity": [0.0, 0.0, 0.0], "mass": 5.0}}],
+    })
+
+
+def test_settled_scene_stops_early():
+    out = run_simulation_pybullet(_dropped_box(), show_gui=False, stop_at_rest=True, settle_time=0.5)
+    assert out["stopped_at_rest"]
+    assert out["steps_simulated"] < 500
+    assert out["sim_time"] < 5.0
+
+
+def test_without_stop_at_rest_runs_full_duration():
+    out = run_simulation_pybullet(_dropped_box(), show_gui=False)
+    assert not out["stopped_at_rest"]
+    assert out["steps_simulated"] == 500
+
+
+def test_blown_box_never_settles():
+    # 강풍에 계속 밀리는 상자는 멈추지 않으므로 끝까지 계산
+    out = run_simulation_pybullet(_dropped_box(duration=2.0, wind=100.0), show_gui=False, stop_at_rest=True)
+    assert not out["stopped_at_rest"]
+    assert out["steps_simulated"] == 200
+
+
+def test_adaptive_step_uses_fewer_steps_in_flight():
+    world = World.model_validate({
+        "environment": {"duration": 1.0},
+        "objects": [{"id": "ball_1", "type": "ball",
+                     "initial_state": {"position": [0.0, 0.0, 50.0], "velocity": [5.0, 0.0, 0.0], "mass": 0.45}}],
+    })
+    out = run_simulation_pybullet(world, show_gui=False, adaptive_step=True, coarse_factor=4.0)
+    assert out["steps_simulated"] == 25
+    assert out["sim_time"] == pytest.approx(1.0)
@@ -0,0 +1,34 @@
+import math
+
+import pytest
+
+pytest.importorskip("pymunk")
+
+from src.physics_pymunk import run_simulation_pymunk
+from src.types import World
+
+
+def _flying_ball(orientation, angular_velocity):
+    """무중력 공기 중에서 +x로 날아가는 공 (항력만 받음)"""
+    return World.model_validate({
+        "environment": {"dimensions": "2D", "gravity": [0.0, 0.0], "duration": 1.0},
+        "objects": [{
+            "id": "ball", "type": "ball",
+            "initial_state": {"position": [0.0, 5.0], "velocity": [10.0, 0.0], "mass": 0.15,
+                              "orientation": orientation, "angular_velocity": angular_velocity},
+        }],
+    })
+
+
+@pytest.mark.parametrize("orientation, angular_velocity", [
+    ([0.0, 0.0, 0.0, 1.0], [0.0, 0.0, 0.0]),
+    ([0.0, math.sin(-math.pi / 4), 0.0, math.cos(-math.pi / 4)], [0.0, 0.0, 0.0]),  # π/2 회전
+    ([0.0, 0.0, 0.0, 1.0], [0.0, 30.0, 0.0]),                                        # 빠르게 회전
+])
+def test_drag_opposes_velocity_regardless_of_rotation(orientation, angular_velocity):
+    world = _flying_ball(orientation, angular_velocity)
+    run_simulation_pymunk(world, show_gui=False)
+    vx, vy = world.objects[0].initial_state.velocity
+    assert 0.0 < vx < 10.0
+    assert abs(vy) < 1e-9
+    assert abs(world.objects[0].initial_state.position[1] - 5.0) < 1e-9
@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("pybullet")
+
+from src.service import HTTPError, SimulationService, StubParser
+
+# 아주 긴 장면 → 짧은 시간 제한 안에 끝나지 않음
+SLOW_WORLD = {
+    "environment": {"duration": 600.0},
+    "objects": [{"id": "ball_1", "type": "ball",
+                 "initial_state": {"position": [0.0, 0.0, 1.0], "velocity": [0.0, 0.0, 0.0], "mass": 0.45}}],
+}
+
+
+def test_timed_out_turn_restarts_worker_before_restoring(tmp_path):
+    service = SimulationService(str(tmp_path), workers=1, timeout=0.5, parser=StubParser(),
+                                sim_kwargs={"preview": "off"}, initial_world=SLOW_WORLD)
+
+    async def scenario():
+        session = service.create_session("slow")
+        before = session.memory.state
+        turn = asyncio.create_task(service.run_turn("slow", "throw the ball forward"))
+        await asyncio.sleep(0.1)
+        old = list(service.pool._pools[0]._processes.values())
+        with pytest.raises(HTTPError) as e:
+            await turn
+        assert e.value.status == 504
+        assert session.memory.state == before
+        await asyncio.sleep(0.1)  # 자리 반납 콜백
+        return old
+
+    try:
+        old = asyncio.run(scenario())
+        assert old and not any(proc.is_alive() for proc in old)  # 버려진 작업이 계속 돌지 않음
+        health = service.health()
+        assert health["worker_restarts"] == 1 and health["pending"] == [0]
+    finally:
+        service.shutdown()
+
+
+@pytest.mark.parametrize("length", ["abc", "-5"])
+def test_bad_content_length_returns_400(tmp_path, length):
+    service = SimulationService(str(tmp_path), workers=1, parser=StubParser())
+
+    async def scenario():
+        server = await asyncio.start_server(service.handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(f"POST /sessions HTTP/1.1\r\nContent-Length: {length}\r\n\r\n".encode("latin-1"))
+            await writer.drain()
+            response = await reader.read()
+            writer.close()
+        return response
+
+    try:
+        response = asyncio.run(scenario())
+    finally:
+        service.shutdown()
+    head, _, body = response.partition(b"\r\n\r\n")
+    assert head.startswith(b"HTTP/1.1 400")
+    assert b"Content-Length" in body
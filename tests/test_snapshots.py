@@ -0,0 +1,33 @@
+import pytest
+
+from src.memory_engine import WorldMemory
+from src.snapshots import Timeline
+
+
+def _ball(z):
+    return {"objects": [{"id": "ball_1", "type": "ball", "initial_state": {"position": [0, 0, z]}}]}
+
+
+def test_fork_ignores_stale_branch_files(tmp_path):
+    # 이전 세션이 reset 없이 남긴 "what" 분기 (턴 1~5 기록)
+    stale = WorldMemory(str(tmp_path / "world_state.what.json"))
+    for z in range(1, 6):
+        stale.apply_update(_ball(float(z) * 10))
+
+    memory = WorldMemory(str(tmp_path / "world_state.json"))
+    memory.apply_update(_ball(1.0))
+    memory.apply_update(_ball(2.0))
+    timeline = Timeline(memory, physics=False)
+    timeline.capture()
+
+    timeline.fork("what")
+    branch = timeline.memory
+    assert branch.turn == 2 and branch.state == memory.state
+    assert branch.state_at(2) == memory.state
+    with pytest.raises(ValueError):  # 분기 이전 턴은 분기 저널에 없음 (남은 기록/빈 월드로 되돌리지 않음)
+        branch.undo()
+    assert branch.state == memory.state
+
+    branch.apply_update(_ball(3.0))
+    branch.undo()
+    assert branch.state == memory.state
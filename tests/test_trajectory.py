@@ -0,0 +1,38 @@
+import numpy as np
+
+from src.trajectory import TrajectoryRecorder, load_trajectory, trajectory_stats
+
+
+def _frame(z):
+    return np.array([[0.0, 0.0, z]]), np.array([[0.0, 0.0, 0.0, 1.0]]), np.zeros((1, 3))
+
+
+def test_final_frame_kept_when_buffer_is_full():
+    rec = TrajectoryRecorder(["ball"], [0.1], decimation=1, max_samples=4)
+    for step in range(4):
+        rec.record(step, step * 0.01, *_frame(float(step)))
+    rec.finish(5, 0.05, *_frame(5.0))  # 가득 찬 상태 + 압축 뒤 주기(2)와 어긋난 스텝
+    traj = rec.to_dict()
+    assert traj["t"][-1] == 0.05
+    assert traj["position"][-1, 0, 2] == 5.0
+
+
+def test_finish_does_not_duplicate_recorded_frame():
+    rec = TrajectoryRecorder(["ball"], [0.1], decimation=2)
+    for step in (0, 2, 4):
+        rec.record(step, step * 0.01, *_frame(1.0))
+    rec.finish(4, 0.04, *_frame(1.0))
+    assert rec.count == 3
+
+
+def test_static_bodies_excluded_from_stats(tmp_path):
+    rec = TrajectoryRecorder(["table", "ball"], [0.0, 0.1], decimation=1, static=[True, False])
+    for step in range(3):
+        pos = np.array([[0.0, 0.0, 0.5], [0.0, 0.0, 1.0 - 0.1 * step]])
+        rec.record(step, step * 0.1, pos, np.tile([0.0, 0.0, 0.0, 1.0], (2, 1)), np.zeros((2, 3)))
+    stats = trajectory_stats(rec.to_dict())
+    assert list(stats) == ["ball"]
+    assert stats["ball"]["time_aloft"] > 0
+
+    saved = load_trajectory(rec.save(tmp_path / "trajectory.npz"))
+    assert list(trajectory_stats(saved)) == ["ball"]